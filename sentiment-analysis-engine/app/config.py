@@ -1,11 +1,36 @@
+from typing import Literal, Optional
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     API_HOST: str = "0.0.0.0"
     API_PORT: int = 8001
-    MODEL_PATH: str = "./models/sentiment_model.pkl"
+    MODEL_DIR: str = "./models/sentiment"  # Saved model: manifest plus memory-mapped arrays
+    MODEL_PATH: str = "./models/sentiment_model.pkl"  # Legacy joblib pickles, loaded if MODEL_DIR has no model
     VECTORIZER_PATH: str = "./models/vectorizer.pkl"
     MIN_SAMPLES_FOR_ANALYSIS: int = 10
+    ANALYSIS_BATCH_SIZE: int = 500  # Texts preprocessed and predicted per micro-batch
+    FETCH_PAGE_SIZE: int = 500  # `limit` sent to paginated sources that don't set one
+    FETCH_MAX_ITEMS: int = 100000  # Stop following pages after this many records
+    FETCH_MAX_BYTES: int = 100 * 1024 * 1024  # ...or after this many response bytes
+    VOCABULARY_EXACT_LIMIT: int = 100000  # Distinct tokens counted exactly in data quality reports, then estimated
+    VOCABULARY_SKETCH_PRECISION: int = 14  # log2 of the estimate's registers (16 KB, ~1% error)
+    HTTP_TIMEOUT: float = 30.0
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0  # Seconds an idle connection is kept open
+    HTTP_MAX_PER_HOST: int = 8  # Concurrent requests to any one source host
+    WORKER_PROCESSES: Optional[int] = None  # Preprocessing/prediction processes; None = one per core, 0 = in-process thread
+    WORKER_MIN_SHARD_SIZE: int = 100  # Smallest slice of a batch sent to one worker
+    PREPROCESSOR_MODE: Literal["fast", "nltk"] = "fast"  # "nltk" runs the reference word_tokenize pipeline
+    FEATURIZER: Literal["tfidf", "hashing"] = "tfidf"  # "hashing": no vocabulary, IDF from streamed document counts
+    HASHING_N_FEATURES: int = 2 ** 18  # Hashed columns for FEATURIZER=hashing
+    TRAINING_JOBS_DIR: str = "./models/jobs"  # Status files of background training jobs
+    TRAINING_CACHE_DIR: str = "./models/preprocessed"  # Preprocessed corpus shards reused by train_model.py --data
+    INCREMENTAL_CHECKPOINT_SAMPLES: int = 5000  # /train/incremental samples between saved checkpoints
+    LEMMA_CACHE_SIZE: int = 100000  # Distinct tokens whose lemmas are kept, per process
+    PREDICTION_CACHE_SIZE: int = 100000  # Predictions kept in memory; 0 disables the in-process cache
+    PREDICTION_CACHE_DB: Optional[str] = None  # SQLite file for a persistent prediction cache
+    PREDICTION_CACHE_VERSION_TTL: float = 24 * 3600  # Seconds a model version unused by any process keeps its SQLite rows
     
     class Config:
         env_file = ".env"
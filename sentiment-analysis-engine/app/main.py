@@ -1,20 +1,30 @@
+import asyncio
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
 from typing import List
 from pathlib import Path
+from sklearn.linear_model import SGDClassifier
 from .config import settings
 from .models.schemas import (
     DataSourceRequest,
+    BatchDataSourceRequest,
     SentimentAnalysisResult,
     TrainingData,
     TrainingResult,
+    TrainingJob,
+    IncrementalTrainingData,
+    IncrementalTrainingResult,
     HealthResponse
 )
 from .services.sentiment_service import SentimentAnalysisService
-from .services.sentiment_model import SentimentModel
-from .services.preprocessing import TextPreprocessor
+from .services.featurizers import HashingTfidfVectorizer
+from .services.model_registry import model_registry
+from .services.online_training import online_trainer
+from .services.training_jobs import read_job, training_jobs
+from .services.preprocessing import create_preprocessor
+from .services.worker_pool import worker_pool
 
 app = FastAPI(
     title="Universal Sentiment Analysis Engine",
@@ -33,8 +43,21 @@ app.add_middleware(
 
 # Initialize services
 sentiment_service = SentimentAnalysisService()
-model = SentimentModel()
-preprocessor = TextPreprocessor()
+preprocessor = create_preprocessor()
+
+@app.on_event("startup")
+def start_services():
+    model_registry.current()
+    worker_pool.start()
+
+@app.on_event("shutdown")
+async def shutdown_services():
+    await sentiment_service.ingestion_service.close()
+    sentiment_service.cache.close()
+    worker_pool.shutdown()
+    training_jobs.shutdown()
+    # Keep online updates made since the last checkpoint
+    await asyncio.to_thread(online_trainer.checkpoint)
 
 # Static files directory
 STATIC_DIR = Path(__file__).parent / "static"
@@ -47,10 +70,12 @@ def read_root():
 @app.get("/health", response_model=HealthResponse)
 def health_check():
     """Check service health and model status"""
+    model = model_registry.current().model
     return HealthResponse(
         status="healthy",
         model_loaded=model.is_loaded(),
-        vectorizer_loaded=model.vectorizer is not None
+        vectorizer_loaded=model.vectorizer is not None,
+        prediction_cache=sentiment_service.cache.stats()
     )
 
 @app.post("/analyze", response_model=SentimentAnalysisResult)
@@ -73,7 +98,31 @@ async def analyze_sentiment(request: DataSourceRequest):
     ```
     """
     try:
-        result = sentiment_service.analyze_from_api(request)
+        result = await sentiment_service.analyze_from_api(request)
+        return result
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/analyze/batch", response_model=SentimentAnalysisResult)
+async def analyze_sentiment_batch(request: BatchDataSourceRequest):
+    """
+    Analyze several external APIs as one dataset.
+    
+    All sources are fetched in parallel and their results merged into a
+    single analysis. `data_quality.sources` reports each source separately.
+    
+    Example request:
+    ```json
+    {
+        "sources": [
+            {"source_api": "http://localhost:8000/public/comments", "data_type": "comments"},
+            {"source_api": "http://other-host/api/reviews", "data_type": "reviews"}
+        ]
+    }
+    ```
+    """
+    try:
+        result = await sentiment_service.analyze_from_apis(request.sources)
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -86,7 +135,7 @@ async def analyze_text_list(texts: List[str]):
     Useful for testing or when you already have the text data.
     """
     try:
-        result = sentiment_service.analyze_texts(texts)
+        result = await sentiment_service.analyze_texts(texts)
         return result
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -103,24 +152,76 @@ async def train_model(training_data: TrainingData):
         "labels": ["positive", "negative", "neutral"]
     }
     ```
+    
+    Waits for training to finish; POST /train/jobs returns at once instead.
     """
     try:
-        # Preprocess texts
-        preprocessed_texts = preprocessor.preprocess_batch(training_data.texts)
-        
         # Convert labels to strings
         labels = [label.value for label in training_data.labels]
         
-        # Train model
-        result = model.train(preprocessed_texts, labels)
+        # Train as a background job, which saves the model, and wait for it
+        job = training_jobs.submit(training_data.texts, labels)
+        job = await training_jobs.wait(job["job_id"])
+        if job["state"] != "completed":
+            raise Exception(job["error"])
+        
+        return TrainingResult(**job["result"])
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/train/jobs", response_model=TrainingJob, status_code=202)
+async def submit_training_job(training_data: TrainingData):
+    """
+    Start training in the background and return the job at once.
+    
+    Poll GET /train/jobs/{job_id} for its progress. The model is saved and
+    served when the job completes; analysis keeps running meanwhile.
+    """
+    try:
+        labels = [label.value for label in training_data.labels]
+        return TrainingJob(**training_jobs.submit(training_data.texts, labels))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/train/jobs/{job_id}", response_model=TrainingJob)
+def get_training_job(job_id: str):
+    """Get the state, stage, elapsed time and progress of a training job"""
+    job = read_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Training job not found")
+    return TrainingJob(**job)
+
+@app.post("/train/incremental", response_model=IncrementalTrainingResult)
+async def train_incremental(training_data: IncrementalTrainingData):
+    """
+    Update the model with a mini-batch of newly labeled data.
+    
+    Unlike /train, only the new batch is sent: the model takes one online
+    learning step on it, starting from the saved model. Updates are saved
+    every INCREMENTAL_CHECKPOINT_SAMPLES samples, or after this batch if
+    "checkpoint" is true, and served from then on.
+    """
+    try:
+        labels = [label.value for label in training_data.labels]
+        
+        # Preprocess on the worker pool, update off the event loop
+        preprocessed_texts = await worker_pool.preprocess(training_data.texts)
+        result = await asyncio.to_thread(
+            online_trainer.partial_fit, preprocessed_texts, labels, training_data.checkpoint
+        )
+        
+        if result["checkpointed"]:
+            # Serve the checkpoint from the next request on
+            await asyncio.to_thread(model_registry.refresh)
         
-        return TrainingResult(**result)
+        return IncrementalTrainingResult(**result)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.get("/model/info")
 def get_model_info():
     """Get information about the current model"""
+    model = model_registry.current().model
     if not model.is_loaded():
         return {
             "status": "not_loaded",
@@ -129,8 +230,8 @@ def get_model_info():
     
     return {
         "status": "loaded",
-        "model_type": "Logistic Regression",
-        "vectorizer": "TF-IDF",
+        "model_type": "SGD Logistic Regression (online)" if isinstance(model.model, SGDClassifier) else "Logistic Regression",
+        "vectorizer": "Hashed TF-IDF" if isinstance(model.vectorizer, HashingTfidfVectorizer) else "TF-IDF",
         "classes": list(model.model.classes_) if model.model else [],
         "message": "Model is ready for predictions"
     }
@@ -141,6 +242,7 @@ def get_feature_importance(top_n: int = 20):
     Get most important features (words) for each sentiment class.
     Useful for understanding model behavior.
     """
+    model = model_registry.current().model
     if not model.is_loaded():
         raise HTTPException(
             status_code=400, 
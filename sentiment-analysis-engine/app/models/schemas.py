@@ -15,6 +15,11 @@ class DataSourceRequest(BaseModel):
     date_from: Optional[datetime] = None
     date_to: Optional[datetime] = None
     filters: Optional[Dict] = None
+    max_items: Optional[int] = Field(default=None, gt=0, description="Stop fetching after this many records")
+    max_bytes: Optional[int] = Field(default=None, gt=0, description="Stop fetching after this many response bytes")
+
+class BatchDataSourceRequest(BaseModel):
+    sources: List[DataSourceRequest] = Field(..., min_length=1, description="Sources analyzed together as one dataset")
 
 class TextData(BaseModel):
     id: int
@@ -49,7 +54,36 @@ class TrainingResult(BaseModel):
     samples_trained: int
     message: str
 
+class TrainingJob(BaseModel):
+    job_id: str
+    state: str  # queued, running, completed or failed
+    stage: str  # Step in progress: preprocessing, splitting, vectorizing, fitting, evaluating, saving
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    elapsed_seconds: float
+    samples_total: int
+    samples_processed: int  # Texts preprocessed so far
+    result: Optional[TrainingResult] = None
+    error: Optional[str] = None
+
+class IncrementalTrainingData(BaseModel):
+    texts: List[str]
+    labels: List[SentimentLabel]
+    checkpoint: bool = False  # Save the model after this batch
+
+class IncrementalTrainingResult(BaseModel):
+    status: str
+    samples_trained: int
+    total_samples: int
+    pending_samples: int
+    batch_accuracy: Optional[float] = None  # On this batch, before updating with it
+    checkpointed: bool
+    model_version: Optional[str] = None
+    message: str
+
 class HealthResponse(BaseModel):
     status: str
     model_loaded: bool
     vectorizer_loaded: bool
+    prediction_cache: Dict[str, Any] = {}
@@ -0,0 +1,350 @@
+"""
+Out-of-core training from labelled corpus files (CSV, NDJSON or Parquet).
+
+The corpus is never held in memory. Files are read in chunks of
+`chunk_size` rows, chunks are preprocessed on a process pool (a few chunks
+in flight at a time), and each preprocessed chunk is written to disk as a
+shard. Training then streams over the shards:
+
+1. While preprocessing, each chunk is hashed once and its n-gram counts
+   are kept in a scratch directory for the run. The hashing featurizer
+   counts document frequencies as it goes, so IDF weights are known after
+   one pass without a vocabulary.
+2. Each epoch weights the counts and feeds them, chunk by chunk in a
+   shuffled order, to SGDClassifier.partial_fit.
+3. Every `1 / validation_fraction`-th row of each chunk is held out and
+   scored at the end.
+
+Shards are keyed by a hash of their raw rows and the preprocessor
+settings. Kept in a cache directory (TRAINING_CACHE_DIR), they let a
+re-run on the same data skip preprocessing; a changed file only
+re-preprocesses the chunks that changed.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import get_context
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from ..config import settings
+from .featurizers import HashingTfidfVectorizer
+from .model_artifacts import save_artifact
+from .online_training import CLASSES, new_classifier
+from .preprocessing import TextPreprocessor, create_preprocessor
+
+CORPUS_FORMATS = {
+    ".csv": "csv",
+    ".ndjson": "ndjson",
+    ".jsonl": "ndjson",
+    ".parquet": "parquet",
+}
+
+# Bump when preprocessing output changes, so cached shards are not reused
+_SHARD_FORMAT = 1
+
+# Per-process preprocessor, set up by _init_worker
+_preprocessor: Optional[TextPreprocessor] = None
+
+
+class CorpusError(Exception):
+    """A corpus file that can't be read as labelled texts"""
+    pass
+
+
+def _init_worker():
+    global _preprocessor
+    _preprocessor = create_preprocessor()
+
+
+def _preprocess_chunk(texts: List[str]) -> List[str]:
+    return _preprocessor.preprocess_batch(texts)
+
+
+def corpus_format(path: str) -> str:
+    """The format of a corpus file, from its extension"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in CORPUS_FORMATS:
+        raise CorpusError(f"Unknown corpus format for {path}; expected one of {', '.join(CORPUS_FORMATS)}")
+    return CORPUS_FORMATS[extension]
+
+
+def read_chunks(path: str, chunk_size: int, text_column: str = "text", label_column: str = "label",
+                fmt: Optional[str] = None) -> Iterator[Tuple[List, List]]:
+    """(texts, labels) of consecutive chunks of at most chunk_size rows"""
+    fmt = fmt or corpus_format(path)
+    columns = [text_column, label_column]
+    try:
+        if fmt == "csv":
+            frames = pd.read_csv(path, usecols=columns, chunksize=chunk_size, dtype=str, keep_default_na=False)
+        elif fmt == "ndjson":
+            frames = pd.read_json(path, lines=True, chunksize=chunk_size, dtype=False)
+        elif fmt == "parquet":
+            try:
+                import pyarrow.parquet as pq
+            except ImportError:
+                raise CorpusError("Reading Parquet needs pyarrow: pip install pyarrow")
+            frames = (
+                batch.to_pandas()
+                for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size, columns=columns)
+            )
+        else:
+            raise CorpusError(f"Unknown corpus format: {fmt}")
+
+        for frame in frames:
+            missing = [column for column in columns if column not in frame.columns]
+            if missing:
+                raise CorpusError(f"{path} has no column {missing[0]!r}")
+            yield frame[text_column].tolist(), frame[label_column].tolist()
+    except (ValueError, OSError) as e:
+        raise CorpusError(f"Could not read {path}: {e}")
+
+
+def _clean_rows(texts: List, labels: List) -> Tuple[List[str], List[str]]:
+    """Rows with a non-empty text and a known label; labels are normalized"""
+    known = set(CLASSES)
+    kept_texts, kept_labels = [], []
+    for text, label in zip(texts, labels):
+        label = str(label).strip().lower()
+        if isinstance(text, str) and text.strip() and label in known:
+            kept_texts.append(text)
+            kept_labels.append(label)
+    return kept_texts, kept_labels
+
+
+class ShardStore:
+    """Preprocessed chunks on disk, one JSON file each, named by a hash of the raw chunk"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(texts: List[str], labels: List[str]) -> str:
+        digest = hashlib.blake2b(f"{_SHARD_FORMAT}:{settings.PREPROCESSOR_MODE}".encode(), digest_size=16)
+        for text, label in zip(texts, labels):
+            digest.update(label.encode())
+            digest.update(b"\0")
+            digest.update(text.encode("utf-8", "surrogatepass"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str) -> Optional[Tuple[List[str], List[str]]]:
+        try:
+            with open(self.path(key), encoding="utf-8") as f:
+                shard = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        return shard["texts"], shard["labels"]
+
+    def put(self, key: str, texts: List[str], labels: List[str]):
+        path = self.path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"texts": texts, "labels": labels}, f)
+        os.replace(tmp_path, path)
+
+
+class StageStats:
+    """Rows and seconds per pipeline stage, for throughput reports"""
+
+    def __init__(self):
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self.counts: Dict[str, int] = {}  # Rows skipped, served from cache, ...
+
+    def count(self, name: str, rows: int):
+        self.counts[name] = self.counts.get(name, 0) + rows
+
+    def add(self, stage: str, rows: int, seconds: float):
+        entry = self.stages.setdefault(stage, {"rows": 0, "seconds": 0.0})
+        entry["rows"] += rows
+        entry["seconds"] += seconds
+
+    def report(self, stage: str) -> Dict[str, float]:
+        entry = self.stages[stage]
+        seconds = entry["seconds"]
+        return {
+            "rows": int(entry["rows"]),
+            "seconds": round(seconds, 3),
+            "rows_per_second": round(entry["rows"] / seconds) if seconds else 0
+        }
+
+    def print_stage(self, stage: str):
+        report = self.report(stage)
+        print(f"  {stage:<12} {report['rows']:>10} rows  {report['seconds']:>8.2f}s  {report['rows_per_second']:>9} rows/s")
+
+
+def preprocess_corpus(paths: Sequence[str], store: ShardStore, stats: StageStats, chunk_size: int,
+                      text_column: str = "text", label_column: str = "label", fmt: Optional[str] = None,
+                      workers: Optional[int] = None) -> Iterator[Tuple[str, List[str], List[str]]]:
+    """
+    (shard key, preprocessed texts, labels) for every chunk of the corpus,
+    in file order. Chunks already in the store are not preprocessed again.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    executor = None  # Started on the first chunk that isn't cached
+
+    def chunks():
+        for path in paths:
+            reader = read_chunks(path, chunk_size, text_column, label_column, fmt)
+            while True:
+                started = time.perf_counter()
+                chunk = next(reader, None)
+                if chunk is None:
+                    break
+                texts, labels = _clean_rows(*chunk)
+                stats.add("read", len(chunk[0]), time.perf_counter() - started)
+                stats.count("skipped", len(chunk[0]) - len(texts))
+                if texts:
+                    yield texts, labels
+
+    # A few chunks in flight per worker keeps them busy with bounded memory
+    pending = deque()
+    max_pending = max(workers, 1) * 2
+    try:
+        for texts, labels in chunks():
+            key = store.key(texts, labels)
+            cached = store.get(key)
+            if cached is not None:
+                stats.count("cached", len(texts))
+                pending.append((key, labels, cached[0], True))
+            elif workers > 0:
+                if executor is None:
+                    executor = ProcessPoolExecutor(
+                        max_workers=workers, mp_context=get_context("spawn"), initializer=_init_worker
+                    )
+                pending.append((key, labels, executor.submit(_preprocess_chunk, texts), False))
+            else:
+                if _preprocessor is None:
+                    _init_worker()
+                pending.append((key, labels, _preprocess_chunk(texts), False))
+
+            while len(pending) >= max_pending:
+                yield _finish(pending.popleft(), store)
+        while pending:
+            yield _finish(pending.popleft(), store)
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+
+def _finish(entry, store: ShardStore) -> Tuple[str, List[str], List[str]]:
+    """Wait for a chunk's texts and store them, unless they came from the store"""
+    key, labels, texts, from_cache = entry
+    if isinstance(texts, Future):
+        texts = texts.result()
+    if not from_cache:
+        store.put(key, texts, labels)
+    return key, texts, labels
+
+
+def _split(n: int, validation_fraction: float) -> np.ndarray:
+    """Mask of the held-out rows of a chunk of n rows: every k-th row"""
+    if validation_fraction <= 0:
+        return np.zeros(n, dtype=bool)
+    return np.arange(n) % max(round(1 / validation_fraction), 2) == 0
+
+
+def train_from_files(paths: Sequence[str], text_column: str = "text", label_column: str = "label",
+                     fmt: Optional[str] = None, chunk_size: int = 10000, epochs: int = 5,
+                     validation_fraction: float = 0.1, workers: Optional[int] = None,
+                     cache_dir: Optional[str] = None, use_cache: bool = True) -> Dict:
+    """
+    Train a hashing featurizer and SGD classifier on corpus files and save
+    them to MODEL_DIR. Returns accuracy and per-stage throughput.
+    """
+    stats = StageStats()
+    # Hashed counts of this run's chunks, so epochs don't hash the texts again
+    scratch_dir = tempfile.mkdtemp(prefix="sentiment-training-")
+    store = ShardStore((cache_dir or settings.TRAINING_CACHE_DIR) if use_cache else os.path.join(scratch_dir, "shards"))
+
+    try:
+        # Pass 1: preprocess into shards, counting document frequencies of training rows
+        print("Preprocessing corpus...")
+        vectorizer = HashingTfidfVectorizer(n_features=settings.HASHING_N_FEATURES)
+        chunks = []  # (counts file, labels file) per chunk
+        rows = 0
+        started = time.perf_counter()
+        for key, texts, labels in preprocess_corpus(
+            paths, store, stats, chunk_size, text_column, label_column, fmt, workers
+        ):
+            hashing = time.perf_counter()
+            counts = vectorizer.count(texts)
+            vectorizer.partial_fit_counts(counts[~_split(len(texts), validation_fraction)])
+            stats.add("hash", len(texts), time.perf_counter() - hashing)
+
+            chunk_path = os.path.join(scratch_dir, f"{len(chunks)}")
+            sparse.save_npz(f"{chunk_path}.npz", counts, compressed=False)
+            np.save(f"{chunk_path}.npy", np.asarray(labels))
+            chunks.append(chunk_path)
+            rows += len(texts)
+        if not chunks:
+            raise CorpusError("No labelled rows in the corpus")
+        # Waiting on the workers: the pass, less the time spent reading and hashing
+        elapsed = time.perf_counter() - started
+        stats.add("preprocess", rows, elapsed - stats.stages["read"]["seconds"] - stats.stages["hash"]["seconds"])
+        for stage in ("read", "preprocess", "hash"):
+            stats.print_stage(stage)
+
+        def load(chunk_path: str, held_out: bool):
+            counts = sparse.load_npz(f"{chunk_path}.npz")
+            labels = np.load(f"{chunk_path}.npy")
+            mask = _split(len(labels), validation_fraction)
+            mask = mask if held_out else ~mask
+            return vectorizer.weight(counts[mask]), labels[mask]
+
+        # Epochs: stream the chunks through partial_fit, in a different order each time
+        model = new_classifier()
+        rng = np.random.default_rng(42)
+        for epoch in range(epochs):
+            started = time.perf_counter()
+            rows = 0
+            for index in rng.permutation(len(chunks)):
+                X, y = load(chunks[index], held_out=False)
+                if len(y):
+                    model.partial_fit(X, y, classes=CLASSES)
+                    rows += len(y)
+            stats.add("fit", rows, time.perf_counter() - started)
+            print(f"  epoch {epoch + 1}/{epochs}: {rows / (time.perf_counter() - started):.0f} rows/s")
+        stats.print_stage("fit")
+
+        # Score the held-out rows
+        started = time.perf_counter()
+        correct = total = 0
+        for chunk_path in chunks:
+            X, y = load(chunk_path, held_out=True)
+            if len(y):
+                correct += int((model.predict(X) == y).sum())
+                total += len(y)
+        stats.add("evaluate", total, time.perf_counter() - started)
+        stats.print_stage("evaluate")
+        accuracy = correct / total if total else None
+
+        manifest = save_artifact(settings.MODEL_DIR, vectorizer, model)
+    finally:
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+
+    samples = int(vectorizer.n_documents_)
+    return {
+        "status": "success",
+        "accuracy": round(accuracy, 4) if accuracy is not None else None,
+        "samples_trained": samples,
+        "validation_samples": total,
+        "skipped_rows": stats.counts.get("skipped", 0),
+        "cached_rows": stats.counts.get("cached", 0),
+        "model_version": manifest["version"],
+        "throughput": {stage: stats.report(stage) for stage in ("read", "preprocess", "hash", "fit", "evaluate")},
+        "message": (f"Model trained on {samples} samples"
+                    + (f" with {accuracy:.2%} held-out accuracy" if accuracy is not None else ""))
+    }
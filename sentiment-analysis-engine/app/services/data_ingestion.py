@@ -1,51 +1,261 @@
-import requests
-from typing import List, Dict, Any
+import asyncio
+import hashlib
+import json
+import math
+import time
+import httpx
+import numpy as np
+from urllib.parse import parse_qsl
+from typing import List, Dict, Any, AsyncIterator, Iterable, Optional, Tuple
+from ..config import settings
 from ..models.schemas import DataSourceRequest, TextData
 
+class DataIngestionError(Exception):
+    """A source could not be fetched or parsed"""
+
+class FetchProgress:
+    """Pages fetched by one stream_from_api call, for the data quality report"""
+    
+    def __init__(self):
+        self.page_times: List[float] = []
+        self.bytes_fetched = 0
+        self.items_fetched = 0
+        self.budget_exhausted = False
+    
+    def add_page(self, elapsed: float, size: int):
+        self.page_times.append(elapsed)
+        self.bytes_fetched += size
+    
+    def report(self) -> Dict[str, Any]:
+        return {
+            "pages_fetched": len(self.page_times),
+            "page_fetch_ms": [round(elapsed * 1000, 1) for elapsed in self.page_times],
+            "bytes_fetched": self.bytes_fetched,
+            "budget_exhausted": self.budget_exhausted
+        }
+
 class DataIngestionService:
-    """Service to fetch data from external APIs"""
+    """
+    Service to fetch data from external APIs.
+    
+    All requests go through one pooled async HTTP client, so connections are
+    kept alive between pages and calls, and at most HTTP_MAX_PER_HOST
+    requests run against any one host at a time.
+    """
     
     def __init__(self):
-        self.session = requests.Session()
+        self._client: Optional[httpx.AsyncClient] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+    
+    def _get_client(self) -> httpx.AsyncClient:
+        """The shared client, created on first use in the running event loop"""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client_loop is not loop:
+            # Connections cannot move between event loops (e.g. in tests)
+            self._client = httpx.AsyncClient(
+                timeout=settings.HTTP_TIMEOUT,
+                limits=httpx.Limits(
+                    max_connections=settings.HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY
+                ),
+                follow_redirects=True
+            )
+            self._client_loop = loop
+            self._host_limits = {}
+        return self._client
+    
+    def _host_limit(self, url: str) -> asyncio.Semaphore:
+        host = httpx.URL(url).host
+        if host not in self._host_limits:
+            self._host_limits[host] = asyncio.Semaphore(settings.HTTP_MAX_PER_HOST)
+        return self._host_limits[host]
     
-    def fetch_from_api(self, request: DataSourceRequest) -> List[TextData]:
+    async def close(self):
+        """Close pooled connections (on application shutdown)"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    async def fetch_from_api(self, request: DataSourceRequest) -> List[TextData]:
         """
         Fetch data from an external API.
         This method is platform-agnostic and works with any API that returns
-        data in a compatible JSON format.
+        data in a compatible JSON format. Pagination is followed as in
+        stream_from_api.
+        """
+        return [item async for batch in self.stream_from_api(request) for item in batch]
+    
+    async def stream_from_api(self, request: DataSourceRequest, batch_size: int = 1000,
+                              progress: Optional[FetchProgress] = None) -> AsyncIterator[List[TextData]]:
+        """
+        Fetch data from an external API and yield it in batches of parsed records.
+        
+        Paginated JSON sources are followed page by page, using in order of
+        preference an X-Next-Cursor header, a Link rel="next" header, or
+        skip/limit offsets while pages come back full. The next page is
+        fetched in the background while the caller works on the current one.
+        Newline-delimited JSON exports (e.g. /public/comments/export) are
+        parsed line by line as the response arrives.
+        
+        Fetching stops once the request's item or byte budget (defaulting to
+        settings.FETCH_MAX_ITEMS / FETCH_MAX_BYTES) is used up. Per-page
+        timings are recorded in progress, if given.
         """
+        progress = progress if progress is not None else FetchProgress()
+        max_items = request.max_items or settings.FETCH_MAX_ITEMS
+        max_bytes = request.max_bytes or settings.FETCH_MAX_BYTES
+        
+        params = self._build_params(request)
+        source_query = dict(parse_qsl(request.source_api.query or ''))
+        if 'limit' not in params and 'limit' not in source_query:
+            params['limit'] = settings.FETCH_PAGE_SIZE
+        
+        url = str(request.source_api)
+        pending = asyncio.ensure_future(self._fetch_page(url, params))
+        previous_body = None
         try:
-            # Build query parameters
-            params = {}
-            if request.language:
-                params['language'] = request.language
-            if request.date_from:
-                params['date_from'] = request.date_from.isoformat()
-            if request.date_to:
-                params['date_to'] = request.date_to.isoformat()
-            if request.filters:
-                params.update(request.filters)
-            
-            # Make API request
-            response = self.session.get(
-                str(request.source_api),
-                params=params,
-                timeout=30
-            )
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            # Parse response based on data type
-            if request.data_type == "comments":
-                return self._parse_comments(data)
-            elif request.data_type == "posts":
-                return self._parse_posts(data)
-            else:
-                return self._parse_generic(data)
+            while pending is not None:
+                response, elapsed = await pending
+                pending = None
+                
+                if 'ndjson' in response.headers.get('content-type', ''):
+                    async for batch in self._stream_ndjson(response, request.data_type, batch_size,
+                                                           max_items, max_bytes, progress, elapsed):
+                        yield batch
+                    return
+                
+                data = response.json()
+                progress.add_page(elapsed, len(response.content))
+                
+                if data == previous_body:
+                    break  # The source ignores our paging parameters
+                previous_body = data
                 
-        except requests.exceptions.RequestException as e:
-            raise Exception(f"Error fetching data from API: {str(e)}")
+                remaining = max_items - progress.items_fetched
+                if len(data) >= remaining:
+                    data = data[:remaining]
+                    progress.budget_exhausted = True
+                elif progress.bytes_fetched >= max_bytes:
+                    progress.budget_exhausted = True
+                progress.items_fetched += len(data)
+                
+                # Start on the next page before handing this one to the caller
+                next_page = None if progress.budget_exhausted else self._next_page(response, len(data))
+                if next_page:
+                    url, params = next_page
+                    pending = asyncio.ensure_future(self._fetch_page(url, params))
+                
+                for start in range(0, len(data), batch_size):
+                    yield self._parse(request.data_type, data[start:start + batch_size])
+        
+        except (httpx.HTTPError, ValueError) as e:
+            raise DataIngestionError(f"Error fetching data from API: {str(e)}")
+        finally:
+            if pending is not None:
+                pending.cancel()
+    
+    async def _fetch_page(self, url: str, params: Optional[Dict[str, Any]]) -> Tuple[httpx.Response, float]:
+        """
+        GET one page. JSON bodies are read in full. NDJSON responses are
+        returned open, still holding their host slot, for _stream_ndjson to
+        consume and close.
+        """
+        # Client first: a new client starts a new set of host limits
+        client = self._get_client()
+        host_limit = self._host_limit(url)
+        await host_limit.acquire()
+        response = None
+        streaming = False
+        try:
+            started = time.perf_counter()
+            # Merge rather than replace any query already in the URL
+            request_url = httpx.URL(url).copy_merge_params(params or {})
+            response = await client.send(client.build_request('GET', request_url), stream=True)
+            response.raise_for_status()
+            streaming = 'ndjson' in response.headers.get('content-type', '')
+            if not streaming:
+                await response.aread()
+            return response, time.perf_counter() - started
+        finally:
+            if not streaming:
+                if response is not None:
+                    await response.aclose()
+                host_limit.release()
+    
+    def _next_page(self, response: httpx.Response,
+                   page_items: int) -> Optional[Tuple[str, Optional[Dict[str, Any]]]]:
+        """URL and query parameters of the page after this one, or None on the last page"""
+        if 'next' in response.links and 'X-Next-Cursor' not in response.headers:
+            # The link already carries every query parameter
+            return response.links['next']['url'], None
+        
+        # Continue from the query this page was actually requested with
+        base_url, _, query = str(response.url).partition('?')
+        params = dict(parse_qsl(query, keep_blank_values=True))
+        
+        cursor = response.headers.get('X-Next-Cursor')
+        if cursor:
+            params.pop('skip', None)
+            params['cursor'] = cursor
+            return base_url, params
+        
+        limit = params.get('limit')
+        if limit and page_items >= int(limit):
+            params['skip'] = int(params.get('skip', 0)) + page_items
+            return base_url, params
+        return None
+    
+    async def _stream_ndjson(self, response: httpx.Response, data_type: str, batch_size: int,
+                             max_items: int, max_bytes: int, progress: FetchProgress,
+                             elapsed: float) -> AsyncIterator[List[TextData]]:
+        """Parse a newline-delimited JSON response line by line, within the budget"""
+        started = time.perf_counter()
+        page_bytes = 0
+        try:
+            records = []
+            async for line in response.aiter_lines():
+                if not line.strip():
+                    continue
+                page_bytes += len(line.encode('utf-8')) + 1  # Bytes on the wire, not characters
+                records.append(json.loads(line))
+                progress.items_fetched += 1
+                if len(records) >= batch_size:
+                    yield self._parse(data_type, records)
+                    records = []
+                if progress.items_fetched >= max_items or progress.bytes_fetched + page_bytes >= max_bytes:
+                    progress.budget_exhausted = True
+                    break
+            if records:
+                yield self._parse(data_type, records)
+        finally:
+            await response.aclose()
+            self._host_limit(str(response.url)).release()
+        # The stream is one page; its time includes reading the body
+        progress.add_page(elapsed + time.perf_counter() - started, page_bytes)
+    
+    def _build_params(self, request: DataSourceRequest) -> Dict[str, Any]:
+        """Build query parameters"""
+        params = {}
+        if request.language:
+            params['language'] = request.language
+        if request.date_from:
+            params['date_from'] = request.date_from.isoformat()
+        if request.date_to:
+            params['date_to'] = request.date_to.isoformat()
+        if request.filters:
+            params.update(request.filters)
+        return params
+    
+    def _parse(self, data_type: str, data: List[Dict]) -> List[TextData]:
+        """Parse response based on data type"""
+        if data_type == "comments":
+            return self._parse_comments(data)
+        elif data_type == "posts":
+            return self._parse_posts(data)
+        else:
+            return self._parse_generic(data)
     
     def _parse_comments(self, data: List[Dict]) -> List[TextData]:
         """Parse comment data"""
@@ -114,7 +324,104 @@ class DataIngestionService:
         """
         Validate if the fetched data is sufficient for reliable analysis
         """
-        total_samples = len(data)
+        tracker = DataQualityTracker()
+        tracker.add(data)
+        return tracker.result(min_samples)
+
+
+class VocabularyCounter:
+    """
+    Number of distinct tokens seen. Exact while there are at most
+    VOCABULARY_EXACT_LIMIT of them; past that the set is folded into a
+    HyperLogLog sketch of 2 ** VOCABULARY_SKETCH_PRECISION one-byte
+    registers (about 1% standard error), so memory stays fixed however
+    large the source is.
+    """
+    
+    def __init__(self):
+        self.tokens = set()
+        self.registers: Optional[np.ndarray] = None  # Set once the exact limit is passed
+    
+    @property
+    def approximate(self) -> bool:
+        return self.registers is not None
+    
+    def update(self, tokens: Iterable[str]):
+        if self.registers is None:
+            self.tokens.update(tokens)
+            if len(self.tokens) > settings.VOCABULARY_EXACT_LIMIT:
+                self._to_sketch()
+        else:
+            self._add_to_sketch(tokens)
+    
+    def merge(self, other: "VocabularyCounter"):
+        if other.registers is None:
+            self.update(other.tokens)
+            return
+        if self.registers is None:
+            self._to_sketch()
+        np.maximum(self.registers, other.registers, out=self.registers)
+    
+    def __len__(self) -> int:
+        if self.registers is None:
+            return len(self.tokens)
+        m = len(self.registers)
+        estimate = 0.7213 / (1 + 1.079 / m) * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)  # Linear counting is more accurate for small counts
+        return int(round(estimate))
+    
+    def _to_sketch(self):
+        self.registers = np.zeros(1 << settings.VOCABULARY_SKETCH_PRECISION, dtype=np.uint8)
+        self._add_to_sketch(self.tokens)
+        self.tokens = set()
+    
+    def _add_to_sketch(self, tokens: Iterable[str]):
+        hashes = np.fromiter(
+            (int.from_bytes(hashlib.blake2b(token.encode("utf-8", "surrogatepass"), digest_size=8).digest(), "little")
+             for token in tokens),
+            dtype=np.uint64
+        )
+        if not len(hashes):
+            return
+        precision = settings.VOCABULARY_SKETCH_PRECISION
+        width = 64 - precision
+        # High bits pick the register; the rank is the position of the first 1 in the rest
+        index = (hashes >> np.uint64(width)).astype(np.intp)
+        rest = hashes & np.uint64((1 << width) - 1)
+        rank = width + 1 - np.frexp(rest.astype(np.float64))[1]  # frexp gives the bit length, exact below 2 ** 53
+        np.maximum.at(self.registers, index, rank.astype(np.uint8))
+
+
+class DataQualityTracker:
+    """
+    Running form of DataIngestionService.validate_data_sufficiency for data
+    that arrives in batches. Only counts and a bounded distinct-token
+    counter are kept.
+    """
+    
+    def __init__(self):
+        self.total_samples = 0
+        self.empty_texts = 0
+        self.vocabulary = VocabularyCounter()
+    
+    def add(self, batch: List[TextData]):
+        self.total_samples += len(batch)
+        for item in batch:
+            if not item.text.strip():
+                self.empty_texts += 1
+            self.vocabulary.update(item.text.lower().split())
+    
+    def merge(self, other: "DataQualityTracker"):
+        self.total_samples += other.total_samples
+        self.empty_texts += other.empty_texts
+        self.vocabulary.merge(other.vocabulary)
+    
+    def result(self, min_samples: int = 10) -> Dict[str, Any]:
+        """Same report as validate_data_sufficiency over everything added so far"""
+        total_samples = self.total_samples
+        empty_texts = self.empty_texts
         
         if total_samples == 0:
             return {
@@ -133,7 +440,6 @@ class DataIngestionService:
             }
         
         # Check text quality
-        empty_texts = sum(1 for item in data if not item.text.strip())
         if empty_texts > total_samples * 0.5:
             return {
                 "sufficient": False,
@@ -144,11 +450,7 @@ class DataIngestionService:
             }
         
         # Calculate vocabulary diversity
-        all_words = set()
-        for item in data:
-            all_words.update(item.text.lower().split())
-        
-        vocab_size = len(all_words)
+        vocab_size = len(self.vocabulary)
         avg_vocab_per_text = vocab_size / total_samples if total_samples > 0 else 0
         
         return {
@@ -156,6 +458,7 @@ class DataIngestionService:
             "total_samples": total_samples,
             "empty_texts": empty_texts,
             "vocabulary_size": vocab_size,
+            "vocabulary_size_approximate": self.vocabulary.approximate,
             "avg_vocab_per_text": round(avg_vocab_per_text, 2),
             "recommendation": "Data quality is good for analysis"
         }
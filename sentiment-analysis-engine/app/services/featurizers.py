@@ -0,0 +1,117 @@
+"""
+Text featurizers for SentimentModel, selected by settings.FEATURIZER.
+
+"tfidf" is sklearn's TfidfVectorizer with a fitted vocabulary. "hashing"
+is HashingTfidfVectorizer below: n-grams are hashed straight to column
+indices, so transform needs no vocabulary and any number of processes can
+featurize independently, and IDF weights come from document frequencies
+accumulated one batch at a time, so fitting can stream over a corpus that
+doesn't fit in memory.
+"""
+
+from typing import Any, Dict, Iterable, Tuple
+import numpy as np
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfVectorizer
+from sklearn.preprocessing import normalize
+from ..config import settings
+
+
+class HashingTfidfVectorizer:
+    """
+    TF-IDF over hashed n-grams, with the weighting TfidfVectorizer uses
+    (raw counts, smoothed IDF, l2-normalized rows). Hash collisions merge
+    unrelated n-grams into one column; n_features keeps them rare.
+    """
+
+    def __init__(self, n_features: int = 2 ** 18, ngram_range: Tuple[int, int] = (1, 2),
+                 token_pattern: str = r"(?u)\b\w\w+\b", lowercase: bool = True,
+                 sublinear_tf: bool = False, norm: str = "l2"):
+        self.n_features = n_features
+        self.ngram_range = tuple(ngram_range)
+        self.token_pattern = token_pattern
+        self.lowercase = lowercase
+        self.sublinear_tf = sublinear_tf
+        self.norm = norm
+        self._hasher = HashingVectorizer(
+            n_features=n_features,
+            ngram_range=self.ngram_range,
+            token_pattern=token_pattern,
+            lowercase=lowercase,
+            alternate_sign=False,
+            norm=None
+        )
+        self.n_documents_ = 0
+        self.document_frequency_ = np.zeros(n_features, dtype=np.int64)
+        self.idf_ = np.ones(n_features)
+
+    def get_params(self) -> Dict[str, Any]:
+        return {
+            "n_features": self.n_features,
+            "ngram_range": self.ngram_range,
+            "token_pattern": self.token_pattern,
+            "lowercase": self.lowercase,
+            "sublinear_tf": self.sublinear_tf,
+            "norm": self.norm,
+        }
+
+    def partial_fit(self, texts: Iterable[str]) -> "HashingTfidfVectorizer":
+        """Add one batch of documents to the document frequencies"""
+        return self.partial_fit_counts(self.count(texts))
+
+    def partial_fit_counts(self, counts) -> "HashingTfidfVectorizer":
+        """partial_fit on documents already hashed by count()"""
+        self._count_documents(counts)
+        return self
+
+    def count(self, texts: Iterable[str]):
+        """Raw hashed n-gram counts, one row per text"""
+        return self._hasher.transform(texts)
+
+    def fit(self, texts: Iterable[str]) -> "HashingTfidfVectorizer":
+        self._reset()
+        return self.partial_fit(texts)
+
+    def transform(self, texts: Iterable[str]):
+        return self.weight(self.count(texts))
+
+    def fit_transform(self, texts: Iterable[str]):
+        """fit() then transform(), hashing the texts once"""
+        self._reset()
+        counts = self.count(texts)
+        self._count_documents(counts)
+        return self.weight(counts)
+
+    def _reset(self):
+        self.n_documents_ = 0
+        self.document_frequency_ = np.zeros(self.n_features, dtype=np.int64)
+
+    def _count_documents(self, counts):
+        # Each row's column indices are unique, so this counts documents per column
+        self.document_frequency_ = self.document_frequency_ + np.bincount(
+            counts.indices, minlength=self.n_features
+        )
+        self.n_documents_ += counts.shape[0]
+        self.idf_ = np.log((1 + self.n_documents_) / (1 + self.document_frequency_)) + 1
+
+    def weight(self, counts):
+        """TF-IDF weighting of a count() matrix, in place"""
+        if self.sublinear_tf:
+            np.log(counts.data, counts.data)
+            counts.data += 1.0
+        counts.data *= self.idf_[counts.indices]
+        if self.norm is not None:
+            counts = normalize(counts, norm=self.norm, copy=False)
+        return counts
+
+
+def create_vectorizer(**params):
+    """An unfitted featurizer of the configured kind; params override its defaults"""
+    if settings.FEATURIZER == "hashing":
+        params.setdefault("n_features", settings.HASHING_N_FEATURES)
+        return HashingTfidfVectorizer(**params)
+    return TfidfVectorizer(
+        max_features=5000,
+        ngram_range=(1, 2),  # Unigrams and bigrams
+        min_df=2,  # Ignore terms that appear in less than 2 documents
+        max_df=0.8  # Ignore terms that appear in more than 80% of documents
+    ).set_params(**params)
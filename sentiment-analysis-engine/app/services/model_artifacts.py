@@ -0,0 +1,227 @@
+"""
+On-disk format of a trained model, built for fast loading.
+
+A model is a directory (settings.MODEL_DIR) holding:
+
+    manifest.json              format, version, parameters, classes, files
+    vocabulary-<version>.txt   TF-IDF terms in feature order, one per line
+    idf-<version>.npy          IDF weights
+    coef-<version>.npy         classifier coefficients, one row per class
+    intercept-<version>.npy    classifier intercepts
+
+Models with the hashing featurizer have no vocabulary; they store their
+document frequencies (df-<version>.npy) instead, so fitting can resume.
+The classifier is LogisticRegression, or SGDClassifier for models trained
+online, whose step counter is kept in the manifest for the same reason.
+
+The arrays are raw .npy files opened with mmap_mode="r", so loading copies
+nothing and worker processes share their pages through the OS cache. Only
+the vocabulary dict is built per process, from the string table. The
+version is a hash of the contents, and every data file carries it in its
+name and a SHA-256 checksum in the manifest, next to the size and mtime it
+had when saved. Hashing every file on every load would cost a full read of
+the arrays each time a process picks up a new version, so loading only
+compares sizes and mtimes and hashes files whose stat has changed since the
+save; verify=True hashes everything.
+
+Saving writes the data files first and the manifest last, replacing the old
+one atomically; that rename is the point where readers switch versions.
+Files of older versions are removed afterwards.
+"""
+
+import hashlib
+import io
+import json
+import os
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Tuple
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression, SGDClassifier
+from .featurizers import HashingTfidfVectorizer
+
+FORMAT_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+DATA_FILES = ("vocabulary", "idf", "df", "coef", "intercept")
+CLASSIFIERS = {"logistic_regression": LogisticRegression, "sgd": SGDClassifier}
+
+
+class ArtifactError(Exception):
+    """A model directory that is incomplete, corrupt or of an unknown format"""
+    pass
+
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _json_params(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Estimator parameters in JSON form; dtypes are stored by name"""
+    result = {}
+    for name, value in params.items():
+        if name == "dtype":
+            value = np.dtype(value).name
+        elif isinstance(value, tuple):
+            value = list(value)
+        result[name] = value
+    return result
+
+
+def _vectorizer_params(params: Dict[str, Any]) -> Dict[str, Any]:
+    params = dict(params)
+    params["dtype"] = np.dtype(params["dtype"]).type
+    params["ngram_range"] = tuple(params["ngram_range"])
+    return params
+
+
+def _write_file(directory: str, name: str, data: bytes) -> Dict[str, str]:
+    """Write via a temporary file and rename, so the file appears complete or not at all"""
+    path = os.path.join(directory, name)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    stat = os.stat(path)
+    return {
+        "name": name,
+        "sha256": hashlib.sha256(data).hexdigest(),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+    }
+
+
+def _npy_bytes(array: np.ndarray) -> bytes:
+    buffer = io.BytesIO()
+    np.save(buffer, array)
+    return buffer.getvalue()
+
+
+def read_manifest(directory: str) -> Optional[Dict[str, Any]]:
+    """The manifest of the model in directory, or None if there is none"""
+    try:
+        with open(os.path.join(directory, MANIFEST_NAME), encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def save_artifact(directory: str, vectorizer, model) -> Dict[str, Any]:
+    """Write a fitted featurizer and classifier to directory. Returns the new manifest."""
+    os.makedirs(directory, exist_ok=True)
+    hashing = isinstance(vectorizer, HashingTfidfVectorizer)
+    arrays = {"idf": np.ascontiguousarray(vectorizer.idf_)}
+    if hashing:
+        vocabulary = b""
+        n_features = vectorizer.n_features
+        arrays["df"] = np.ascontiguousarray(vectorizer.document_frequency_)
+    else:
+        terms = sorted(vectorizer.vocabulary_, key=vectorizer.vocabulary_.get)
+        vocabulary = "\n".join(terms).encode("utf-8")
+        n_features = len(terms)
+    arrays["coef"] = np.ascontiguousarray(model.coef_)
+    arrays["intercept"] = np.ascontiguousarray(model.intercept_)
+    vectorizer_params = _json_params({
+        name: value for name, value in vectorizer.get_params().items() if name != "vocabulary"
+    })
+    classifier = "sgd" if isinstance(model, SGDClassifier) else "logistic_regression"
+    classifier_params = _json_params(model.get_params())
+    classes = model.classes_.tolist()
+    steps = float(model.t_) if classifier == "sgd" else None
+
+    # Content hash, so retraining to an identical model keeps its version
+    digest = hashlib.sha256(vocabulary)
+    for name, array in arrays.items():
+        digest.update(name.encode())
+        digest.update(array.tobytes())
+    digest.update(json.dumps([vectorizer_params, classifier, classifier_params, classes, steps], sort_keys=True).encode())
+    version = digest.hexdigest()[:16]
+
+    files = {}
+    if not hashing:
+        files["vocabulary"] = _write_file(directory, f"vocabulary-{version}.txt", vocabulary)
+    for name, array in arrays.items():
+        files[name] = _write_file(directory, f"{name}-{version}.npy", _npy_bytes(array))
+
+    manifest = {
+        "format": FORMAT_VERSION,
+        "version": version,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "featurizer": "hashing" if hashing else "tfidf",
+        "vectorizer_params": vectorizer_params,
+        "classifier": classifier,
+        "classifier_params": classifier_params,
+        "classes": classes,
+        "sgd_steps": steps,
+        "n_features": n_features,
+        "n_documents": vectorizer.n_documents_ if hashing else None,
+        "files": files,
+    }
+    _write_file(directory, MANIFEST_NAME, json.dumps(manifest, indent=2).encode("utf-8"))
+
+    # Readers that mapped older files keep them until they let go
+    current = {entry["name"] for entry in files.values()}
+    for name in os.listdir(directory):
+        is_data_file = name.startswith(tuple(f"{kind}-" for kind in DATA_FILES)) and not name.endswith(".tmp")
+        if is_data_file and name not in current:
+            try:
+                os.remove(os.path.join(directory, name))
+            except OSError:
+                pass  # Still mapped on platforms that lock open files; removed by a later save
+    return manifest
+
+
+def _unchanged_since_save(path: str, entry: Dict[str, Any]) -> bool:
+    """Whether a data file still has the size and mtime the manifest recorded"""
+    stat = os.stat(path)
+    return stat.st_size == entry.get("size") and stat.st_mtime_ns == entry.get("mtime_ns")
+
+
+def load_artifact(directory: str, verify: bool = False) -> Tuple[Any, Any, Dict[str, Any]]:
+    """
+    Load the model in directory, with its arrays memory-mapped read-only.
+    Files are checksummed if they changed since the save, or all of them
+    with verify.
+    """
+    manifest = read_manifest(directory)
+    if manifest is None:
+        raise ArtifactError(f"No model manifest in {directory}")
+    if (manifest.get("format") != FORMAT_VERSION or manifest.get("featurizer") not in ("tfidf", "hashing")
+            or manifest.get("classifier") not in CLASSIFIERS):
+        raise ArtifactError(f"Unsupported model format in {directory}")
+
+    paths = {}
+    for name, entry in manifest["files"].items():
+        path = os.path.join(directory, entry["name"])
+        try:
+            checked = verify or not _unchanged_since_save(path, entry)
+        except FileNotFoundError:
+            raise ArtifactError(f"Missing model file {entry['name']}")
+        if checked and _sha256(path) != entry["sha256"]:
+            raise ArtifactError(f"Checksum mismatch for {entry['name']}")
+        paths[name] = path
+
+    if manifest["featurizer"] == "hashing":
+        vectorizer = HashingTfidfVectorizer(**manifest["vectorizer_params"])
+        vectorizer.n_documents_ = manifest["n_documents"]
+        vectorizer.document_frequency_ = np.load(paths["df"], mmap_mode="r")
+        vectorizer.idf_ = np.load(paths["idf"], mmap_mode="r")
+    else:
+        with open(paths["vocabulary"], encoding="utf-8") as f:
+            terms = f.read().split("\n")
+        # The state fit() leaves behind; terms are unique and in feature order by construction
+        vectorizer = TfidfVectorizer(**_vectorizer_params(manifest["vectorizer_params"]))
+        vectorizer.vocabulary_ = dict(zip(terms, range(len(terms))))
+        vectorizer.idf_ = np.load(paths["idf"], mmap_mode="r")
+
+    model = CLASSIFIERS[manifest["classifier"]](**manifest["classifier_params"])
+    model.classes_ = np.array(manifest["classes"])
+    model.coef_ = np.load(paths["coef"], mmap_mode="r")
+    model.intercept_ = np.load(paths["intercept"], mmap_mode="r")
+    model.n_features_in_ = model.coef_.shape[1]
+    if manifest["classifier"] == "sgd":
+        model.t_ = manifest["sgd_steps"]
+    return vectorizer, model, manifest
@@ -0,0 +1,72 @@
+"""
+One shared, versioned sentiment model per process.
+
+Consumers take a snapshot with `model_registry.current()` and use it for a
+whole request, so a retrain never switches models halfway through one.
+`refresh()` loads the files on disk into a new snapshot and swaps it in
+with a single assignment; requests already holding the old snapshot finish
+on it, and the old model is freed once they are done.
+"""
+
+import threading
+from typing import List, Optional
+from .sentiment_model import PredictionBatch, SentimentModel, artifact_version
+
+# Attempts to load a consistent pair of files while they are being rewritten
+_LOAD_ATTEMPTS = 3
+
+
+class ModelSnapshot:
+    """A loaded model and the artifact version it was loaded from. Never modified."""
+
+    def __init__(self, version: Optional[str], model: SentimentModel):
+        self.version = version
+        self.model = model
+
+    def is_loaded(self) -> bool:
+        return self.model.is_loaded()
+
+    def predict_batch(self, texts: List[str]) -> PredictionBatch:
+        batch = self.model.predict_batch(texts)
+        batch.model_version = self.version
+        return batch
+
+
+class ModelRegistry:
+    """Holds the current ModelSnapshot and swaps it when the model on disk changes"""
+
+    def __init__(self):
+        self._snapshot: Optional[ModelSnapshot] = None
+        self._lock = threading.Lock()  # One load at a time
+
+    def current(self) -> ModelSnapshot:
+        """The current snapshot, loading one on first use"""
+        snapshot = self._snapshot
+        if snapshot is None:
+            snapshot = self.refresh()
+        return snapshot
+
+    def refresh(self, wait: bool = True) -> ModelSnapshot:
+        """
+        Load the model on disk if it differs from the current snapshot, then
+        swap it in. With wait=False a load already under way in another
+        thread is not waited for; the current snapshot is returned instead.
+        """
+        if not self._lock.acquire(blocking=wait):
+            return self.current()
+        try:
+            for _ in range(_LOAD_ATTEMPTS):
+                version = artifact_version()
+                if self._snapshot is not None and self._snapshot.version == version:
+                    return self._snapshot
+                model = SentimentModel()
+                # Files replaced while loading may have given a mixed pair
+                if artifact_version() == version:
+                    break
+            self._snapshot = ModelSnapshot(version, model)
+            return self._snapshot
+        finally:
+            self._lock.release()
+
+
+model_registry = ModelRegistry()
@@ -0,0 +1,145 @@
+"""
+Online training: the model is updated one mini-batch at a time.
+
+/train refits from scratch on the whole corpus it is sent. OnlineTrainer
+instead keeps an SGDClassifier (logistic loss, so it still predicts
+probabilities) in memory and takes one partial_fit step per batch of new
+labelled texts, so an update costs time in proportion to the batch.
+
+The featurizer stays stable between batches. Training resumes from the
+saved model: its featurizer is kept (a TF-IDF vocabulary stays frozen; a
+hashing featurizer keeps counting documents into its IDF) and its
+coefficients are the starting point. With no saved model a hashing
+featurizer is used, since it needs no vocabulary fitted up front.
+
+Updates are saved as a regular model checkpoint every
+INCREMENTAL_CHECKPOINT_SAMPLES samples, or on request, which is when
+prediction switches to them. A full /train in between supersedes updates
+not yet saved; the next batch starts from the retrained model.
+"""
+
+import threading
+from typing import Dict, List, Optional
+import numpy as np
+from sklearn.linear_model import SGDClassifier
+from ..config import settings
+from ..models.schemas import SentimentLabel
+from .featurizers import HashingTfidfVectorizer
+from .model_artifacts import load_artifact, read_manifest, save_artifact
+
+# Every class the API accepts, fixed on the first partial_fit
+CLASSES = np.array(sorted(label.value for label in SentimentLabel))
+
+
+def new_classifier() -> SGDClassifier:
+    """The online classifier: logistic loss, so it predicts probabilities"""
+    return SGDClassifier(loss="log_loss", alpha=1e-4, random_state=42)
+
+
+class OnlineTrainer:
+    """An SGD model updated in place by mini-batches and checkpointed to MODEL_DIR"""
+
+    def __init__(self):
+        self.vectorizer = None
+        self.model: Optional[SGDClassifier] = None
+        self.version: Optional[str] = None  # Saved model the in-memory one started from or was saved as
+        self.samples_trained = 0
+        self.pending_samples = 0  # Trained on but not yet checkpointed
+        self._lock = threading.Lock()  # One update at a time
+
+    def _resume(self):
+        """Start from the saved model, or from scratch if there is none"""
+        manifest = read_manifest(settings.MODEL_DIR)
+        self.samples_trained = 0
+        self.pending_samples = 0
+        if manifest is None:
+            self.vectorizer = HashingTfidfVectorizer(n_features=settings.HASHING_N_FEATURES)
+            self.model = new_classifier()
+            self.version = None
+            return
+
+        vectorizer, saved_model, manifest = load_artifact(settings.MODEL_DIR)
+        if isinstance(vectorizer, HashingTfidfVectorizer):
+            # Loaded read-only from disk; partial_fit needs its own copy
+            vectorizer.document_frequency_ = np.array(vectorizer.document_frequency_)
+            vectorizer.idf_ = np.array(vectorizer.idf_)
+        if isinstance(saved_model, SGDClassifier):
+            model = saved_model
+        else:
+            # Warm start from the batch-trained coefficients; same features, same linear form.
+            # The step size is 1 / (alpha * t_): starting t_ at 1 / alpha keeps the
+            # first steps from undoing them (at t_ = 1, one batch cost ~12 points of accuracy)
+            model = new_classifier()
+            model.classes_ = saved_model.classes_
+            model.n_features_in_ = saved_model.n_features_in_
+            model.t_ = 1.0 / model.alpha
+        model.coef_ = np.array(saved_model.coef_, dtype=np.float64, order="C")
+        model.intercept_ = np.array(saved_model.intercept_, dtype=np.float64)
+        self.vectorizer = vectorizer
+        self.model = model
+        self.version = manifest["version"]
+
+    def partial_fit(self, texts: List[str], labels: List[str], checkpoint: bool = False) -> Dict:
+        """
+        Update the model with one batch of preprocessed texts.
+
+        The batch is scored before the update, so batch_accuracy estimates
+        accuracy on data the model has not seen yet.
+        """
+        if len(texts) != len(labels):
+            raise ValueError("Number of texts and labels must match")
+
+        if not texts:
+            raise ValueError("Need at least 1 sample for training")
+
+        with self._lock:
+            saved = read_manifest(settings.MODEL_DIR)
+            saved_version = saved["version"] if saved else None
+            if self.model is None or saved_version != self.version:
+                self._resume()
+
+            unknown = set(labels) - set(self.model.classes_ if hasattr(self.model, "classes_") else CLASSES)
+            if unknown:
+                raise ValueError(f"Labels {sorted(unknown)} are not classes of the current model")
+
+            if isinstance(self.vectorizer, HashingTfidfVectorizer):
+                self.vectorizer.partial_fit(texts)
+            X = self.vectorizer.transform(texts)
+
+            batch_accuracy = None
+            if hasattr(self.model, "coef_"):
+                batch_accuracy = round(float(np.mean(self.model.predict(X) == np.asarray(labels))), 4)
+
+            self.model.partial_fit(X, labels, classes=CLASSES if not hasattr(self.model, "classes_") else None)
+            self.samples_trained += len(texts)
+            self.pending_samples += len(texts)
+
+            if checkpoint or self.pending_samples >= settings.INCREMENTAL_CHECKPOINT_SAMPLES:
+                self._checkpoint()
+
+            return {
+                "status": "success",
+                "samples_trained": len(texts),
+                "total_samples": self.samples_trained,
+                "pending_samples": self.pending_samples,
+                "batch_accuracy": batch_accuracy,
+                "checkpointed": self.pending_samples == 0,
+                "model_version": self.version,
+                "message": f"Model updated with {len(texts)} samples"
+            }
+
+    def checkpoint(self) -> Optional[str]:
+        """Save updates not yet saved. Returns the saved model's version."""
+        with self._lock:
+            if self.pending_samples:
+                self._checkpoint()
+            return self.version
+
+    def _checkpoint(self):
+        manifest = save_artifact(settings.MODEL_DIR, self.vectorizer, self.model)
+        self.version = manifest["version"]
+        self.pending_samples = 0
+        print(f"Saved online model checkpoint {self.version}")
+
+
+online_trainer = OnlineTrainer()
@@ -0,0 +1,208 @@
+"""
+Memoized predictions, keyed by a hash of the raw text and the model version.
+
+Social media text repeats a lot (bot comments come from a few templates),
+so each distinct text is preprocessed and predicted once per model. Entries
+live in an in-process LRU and, if PREDICTION_CACHE_DB is set, in a SQLite
+file that survives restarts and is shared by every API process using it.
+An entry holds the preprocessed text, the model's classes and the text's
+full-precision class probabilities, so cached rows rebuild the exact
+PredictionBatch rows they came from.
+
+A retrained model has a new version, so older entries stop matching. In
+memory they age out of the LRU. In SQLite, each version's last use is
+recorded, and versions unused for PREDICTION_CACHE_VERSION_TTL seconds are
+deleted, so processes serving different versions during a rollout (or an
+analysis still running on the previous snapshot) never wipe each other's
+rows.
+
+Methods block on SQLite; async callers run them in a thread. A lock
+serializes access to the shared connection and the LRU.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from ..config import settings
+from .sentiment_model import PredictionBatch
+
+# Bound parameters per SELECT, under SQLite's variable limit
+_LOOKUP_CHUNK = 500
+
+# Seconds between recording the same version's use in SQLite
+_TOUCH_INTERVAL = 60
+
+
+def text_hash(text: str) -> bytes:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+def batch_from_entries(entries: List[Dict]) -> PredictionBatch:
+    return PredictionBatch(
+        [entry["text"] for entry in entries],
+        entries[0]["classes"],
+        np.array([entry["probabilities"] for entry in entries])
+    )
+
+
+class PredictionCache:
+    """Two-level (memory LRU, then optional SQLite) cache of predictions"""
+
+    def __init__(self, max_entries: int = None, db_path: Optional[str] = None):
+        self.max_entries = settings.PREDICTION_CACHE_SIZE if max_entries is None else max_entries
+        self.db_path = settings.PREDICTION_CACHE_DB if db_path is None else db_path
+        self._memory: "OrderedDict[Tuple[str, bytes], Dict]" = OrderedDict()
+        self._db: Optional[sqlite3.Connection] = None
+        self._touched: Dict[str, float] = {}  # Version: when its use was last recorded in SQLite
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if self.db_path:
+            self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute("""
+                CREATE TABLE IF NOT EXISTS prediction_rows (
+                    model_version TEXT NOT NULL,
+                    text_hash BLOB NOT NULL,
+                    prediction TEXT NOT NULL,
+                    PRIMARY KEY (model_version, text_hash)
+                ) WITHOUT ROWID
+            """)
+            self._db.execute("""
+                CREATE TABLE IF NOT EXISTS prediction_versions (
+                    model_version TEXT PRIMARY KEY,
+                    last_used REAL NOT NULL
+                )
+            """)
+            # Rows written before versions were tracked start their TTL now
+            self._db.execute(
+                "INSERT OR IGNORE INTO prediction_versions (model_version, last_used) "
+                "SELECT DISTINCT model_version, ? FROM prediction_rows",
+                (time.time(),)
+            )
+            self._db.commit()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 or self._db is not None
+
+    def _touch(self, version: str):
+        """Record that version is in use, and delete versions nobody has used within the TTL"""
+        now = time.time()
+        if now - self._touched.get(version, 0.0) < _TOUCH_INTERVAL:
+            return
+        self._touched[version] = now
+        self._db.execute(
+            "INSERT OR REPLACE INTO prediction_versions (model_version, last_used) VALUES (?, ?)",
+            (version, now)
+        )
+        cutoff = now - settings.PREDICTION_CACHE_VERSION_TTL
+        self._db.execute(
+            "DELETE FROM prediction_rows WHERE model_version IN "
+            "(SELECT model_version FROM prediction_versions WHERE last_used < ?)",
+            (cutoff,)
+        )
+        self._db.execute("DELETE FROM prediction_versions WHERE last_used < ?", (cutoff,))
+        self._db.commit()
+
+    def get_many(self, texts: List[str], version: Optional[str]) -> List[Optional[Dict]]:
+        """Cached predictions for texts, None where missing"""
+        if not self.enabled or version is None:
+            with self._lock:
+                self.misses += len(texts)
+            return [None] * len(texts)
+
+        with self._lock:
+            return self._get_many(texts, version)
+
+    def _get_many(self, texts: List[str], version: str) -> List[Optional[Dict]]:
+        hashes = [text_hash(text) for text in texts]
+        results: List[Optional[Dict]] = []
+        for digest in hashes:
+            prediction = self._memory.get((version, digest))
+            if prediction is not None:
+                self._memory.move_to_end((version, digest))
+            results.append(prediction)
+        memory_hits = sum(prediction is not None for prediction in results)
+
+        if self._db is not None:
+            self._touch(version)
+        if self._db is not None and memory_hits < len(texts):
+            missing = list({digest for digest, prediction in zip(hashes, results) if prediction is None})
+            found = self._load(missing, version)
+            for i, digest in enumerate(hashes):
+                if results[i] is None and digest in found:
+                    results[i] = found[digest]
+            self._remember({(version, digest): prediction for digest, prediction in found.items()})
+
+        hits = sum(prediction is not None for prediction in results)
+        self.hits += hits
+        self.disk_hits += hits - memory_hits
+        self.misses += len(texts) - hits
+        return results
+
+    def put_batch(self, texts: List[str], batch: PredictionBatch, version: Optional[str]):
+        """Remember the predictions of texts, row for row"""
+        if not self.enabled or version is None:
+            return
+        classes = batch.classes.tolist()
+        entries = {
+            (version, text_hash(text)): {"text": preprocessed, "classes": classes, "probabilities": probabilities}
+            for text, preprocessed, probabilities in zip(texts, batch.texts, batch.probabilities.tolist())
+        }
+        with self._lock:
+            self._remember(entries)
+            if self._db is not None:
+                self._touch(version)
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO prediction_rows (model_version, text_hash, prediction) VALUES (?, ?, ?)",
+                    [(version, digest, json.dumps(prediction)) for (_, digest), prediction in entries.items()]
+                )
+                self._db.commit()
+
+    def _load(self, hashes: List[bytes], version: str) -> Dict[bytes, Dict]:
+        found = {}
+        for start in range(0, len(hashes), _LOOKUP_CHUNK):
+            chunk = hashes[start:start + _LOOKUP_CHUNK]
+            rows = self._db.execute(
+                "SELECT text_hash, prediction FROM prediction_rows "
+                f"WHERE model_version = ? AND text_hash IN ({','.join('?' * len(chunk))})",
+                [version, *chunk]
+            )
+            for digest, prediction in rows:
+                found[digest] = json.loads(prediction)
+        return found
+
+    def _remember(self, entries: Dict[Tuple[str, bytes], Dict]):
+        if self.max_entries <= 0:
+            return
+        self._memory.update(entries)
+        for key in entries:
+            self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._memory),
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "persistent": self._db is not None
+        }
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
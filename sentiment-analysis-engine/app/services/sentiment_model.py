@@ -1,13 +1,95 @@
 import os
 import joblib
 import numpy as np
-from typing import List, Dict, Tuple
-from sklearn.feature_extraction.text import TfidfVectorizer
+from typing import Callable, List, Dict, Optional, Sequence, Tuple
 from sklearn.linear_model import LogisticRegression
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score, classification_report
 from ..config import settings
 from ..models.schemas import SentimentLabel
+from .featurizers import HashingTfidfVectorizer, create_vectorizer
+from .model_artifacts import load_artifact, read_manifest, save_artifact
+
+def artifact_version() -> Optional[str]:
+    """Identifies the saved model, changing whenever it is rewritten. None if not trained."""
+    manifest = read_manifest(settings.MODEL_DIR)
+    if manifest is not None:
+        return manifest["version"]
+    
+    # Legacy joblib pickles
+    stamps = []
+    for path in (settings.MODEL_PATH, settings.VECTORIZER_PATH):
+        if not os.path.exists(path):
+            return None
+        stat = os.stat(path)
+        stamps.append(f"{stat.st_mtime_ns}:{stat.st_size}")
+    return "-".join(stamps)
+
+# Model classes to response labels; anything else is reported as neutral
+SENTIMENT_LABELS = {
+    'positive': SentimentLabel.POSITIVE,
+    'negative': SentimentLabel.NEGATIVE,
+    'neutral': SentimentLabel.NEUTRAL
+}
+
+class PredictionBatch:
+    """
+    Columnar predictions for a list of texts: the preprocessed texts, the
+    model's classes and a matrix with one row of class probabilities per
+    text. Labels and confidences are derived with one argmax; per-text dicts
+    are only built on request, for the predictions a response returns.
+    """
+    
+    def __init__(self, texts: List[str], classes: Sequence[str], probabilities: np.ndarray,
+                 model_version: Optional[str] = None):
+        self.texts = texts
+        self.model_version = model_version  # artifact_version() of the model that predicted
+        self.classes = np.asarray(classes)
+        self.probabilities = probabilities
+        self.label_index = probabilities.argmax(axis=1)
+        self.confidence = probabilities[np.arange(len(texts)), self.label_index]
+    
+    def __len__(self) -> int:
+        return len(self.texts)
+    
+    @classmethod
+    def concat(cls, batches: List["PredictionBatch"]) -> "PredictionBatch":
+        if len(batches) == 1:
+            return batches[0]
+        versions = {batch.model_version for batch in batches}
+        return cls(
+            [text for batch in batches for text in batch.texts],
+            batches[0].classes,
+            np.vstack([batch.probabilities for batch in batches]),
+            versions.pop() if len(versions) == 1 else None
+        )
+    
+    def take(self, indices: np.ndarray) -> "PredictionBatch":
+        """Rows at the given positions, repeats allowed"""
+        return PredictionBatch(
+            [self.texts[i] for i in indices], self.classes, self.probabilities[indices], self.model_version
+        )
+    
+    def sentiment_counts(self) -> Dict[str, int]:
+        counts = {label.value: 0 for label in SentimentLabel}
+        for label, count in zip(self.classes, np.bincount(self.label_index, minlength=len(self.classes))):
+            counts[SENTIMENT_LABELS.get(label, SentimentLabel.NEUTRAL).value] += int(count)
+        return counts
+    
+    def rows(self, limit: Optional[int] = None) -> List[Dict]:
+        """The first `limit` predictions (all by default) as dicts"""
+        count = len(self) if limit is None else min(limit, len(self))
+        return [
+            {
+                "text": self.texts[i],
+                "sentiment": SENTIMENT_LABELS.get(self.classes[self.label_index[i]], SentimentLabel.NEUTRAL),
+                "confidence": round(float(self.confidence[i]), 4),
+                "probabilities": {
+                    label: round(float(prob), 4) for label, prob in zip(self.classes, self.probabilities[i])
+                }
+            }
+            for i in range(count)
+        ]
 
 class SentimentModel:
     """
@@ -18,20 +100,24 @@ class SentimentModel:
     def __init__(self):
         self.vectorizer = None
         self.model = None
-        self.label_mapping = {
-            'positive': SentimentLabel.POSITIVE,
-            'negative': SentimentLabel.NEGATIVE,
-            'neutral': SentimentLabel.NEUTRAL
-        }
+        self.label_mapping = SENTIMENT_LABELS
         self.load_model()
     
-    def train(self, texts: List[str], labels: List[str]) -> Dict:
+    def train(self, texts: List[str], labels: List[str],
+              on_stage: Optional[Callable[[str], None]] = None,
+              vectorizer_params: Optional[Dict] = None, classifier_params: Optional[Dict] = None,
+              validation: bool = True) -> Dict:
         """
         Train the sentiment model with provided data.
         
         Args:
             texts: List of preprocessed text samples
             labels: List of sentiment labels (positive, negative, neutral)
+            on_stage: Called with the name of each training stage as it starts
+            vectorizer_params: Overrides of the featurizer's defaults (e.g. from tune_model.py)
+            classifier_params: Overrides of the LogisticRegression defaults, e.g. {"C": 10}
+            validation: Hold out 20% of the samples to report accuracy; without it
+                the model is fitted on all of them and accuracy is None
         
         Returns:
             Dictionary with training results
@@ -42,45 +128,52 @@ class SentimentModel:
         if len(texts) < 10:
             raise ValueError("Need at least 10 samples for training")
         
+        on_stage = on_stage or (lambda stage: None)
+        
         # Split data for training and validation
-        X_train, X_val, y_train, y_val = train_test_split(
-            texts, labels, test_size=0.2, random_state=42, stratify=labels
-        )
+        on_stage("splitting")
+        if validation:
+            X_train, X_val, y_train, y_val = train_test_split(
+                texts, labels, test_size=0.2, random_state=42, stratify=labels
+            )
+        else:
+            X_train, X_val, y_train, y_val = texts, [], labels, []
         
-        # Create and train TF-IDF vectorizer
-        self.vectorizer = TfidfVectorizer(
-            max_features=5000,
-            ngram_range=(1, 2),  # Unigrams and bigrams
-            min_df=2,  # Ignore terms that appear in less than 2 documents
-            max_df=0.8  # Ignore terms that appear in more than 80% of documents
-        )
+        # Create and train the TF-IDF featurizer (settings.FEATURIZER)
+        on_stage("vectorizing")
+        self.vectorizer = create_vectorizer(**(vectorizer_params or {}))
         
         X_train_vec = self.vectorizer.fit_transform(X_train)
-        X_val_vec = self.vectorizer.transform(X_val)
         
         # Train Logistic Regression model
         self.model = LogisticRegression(
             max_iter=1000,
             random_state=42,
             class_weight='balanced'  # Handle imbalanced classes
-        )
+        ).set_params(**(classifier_params or {}))
         
+        on_stage("fitting")
         self.model.fit(X_train_vec, y_train)
         
         # Evaluate on validation set
-        y_pred = self.model.predict(X_val_vec)
-        accuracy = accuracy_score(y_val, y_pred)
+        accuracy = None
+        if X_val:
+            on_stage("evaluating")
+            y_pred = self.model.predict(self.vectorizer.transform(X_val))
+            accuracy = round(accuracy_score(y_val, y_pred), 4)
         
         # Save the model
+        on_stage("saving")
         self.save_model()
         
         return {
             "status": "success",
-            "accuracy": round(accuracy, 4),
+            "accuracy": accuracy,
             "samples_trained": len(texts),
             "train_samples": len(X_train),
             "validation_samples": len(X_val),
-            "message": f"Model trained successfully with {accuracy:.2%} accuracy"
+            "message": (f"Model trained successfully with {accuracy:.2%} accuracy" if accuracy is not None
+                        else f"Model trained successfully on all {len(X_train)} samples")
         }
     
     def predict(self, texts: List[str]) -> List[Dict]:
@@ -90,40 +183,18 @@ class SentimentModel:
         Returns:
             List of predictions with sentiment label, confidence, and probabilities
         """
+        return self.predict_batch(texts).rows()
+    
+    def predict_batch(self, texts: List[str]) -> PredictionBatch:
+        """Predict sentiment for a list of texts, as columnar arrays"""
         if self.model is None or self.vectorizer is None:
             raise Exception("Model not loaded. Please train or load a model first.")
         
-        if not texts:
-            return []
-        
-        # Vectorize texts
+        # Vectorize texts; the label is the most probable class, so one
+        # predict_proba call gives labels, confidences and probabilities
         X = self.vectorizer.transform(texts)
-        
-        # Get predictions
-        predictions = self.model.predict(X)
-        probabilities = self.model.predict_proba(X)
-        
-        results = []
-        for i, text in enumerate(texts):
-            pred_label = predictions[i]
-            probs = probabilities[i]
-            
-            # Get confidence (max probability)
-            confidence = float(np.max(probs))
-            
-            # Create probability dictionary
-            prob_dict = {}
-            for label, prob in zip(self.model.classes_, probs):
-                prob_dict[label] = round(float(prob), 4)
-            
-            results.append({
-                "text": text,
-                "sentiment": self.label_mapping.get(pred_label, SentimentLabel.NEUTRAL),
-                "confidence": round(confidence, 4),
-                "probabilities": prob_dict
-            })
-        
-        return results
+        probabilities = self.model.predict_proba(X) if texts else np.empty((0, len(self.model.classes_)))
+        return PredictionBatch(list(texts), self.model.classes_, probabilities)
     
     def predict_single(self, text: str) -> Dict:
         """Predict sentiment for a single text"""
@@ -131,18 +202,17 @@ class SentimentModel:
         return results[0] if results else None
     
     def save_model(self):
-        """Save model and vectorizer to disk"""
-        os.makedirs(os.path.dirname(settings.MODEL_PATH), exist_ok=True)
-        
-        if self.model:
-            joblib.dump(self.model, settings.MODEL_PATH)
-        
-        if self.vectorizer:
-            joblib.dump(self.vectorizer, settings.VECTORIZER_PATH)
+        """Save model and vectorizer to disk, in the memory-mappable artifact format"""
+        if self.model and self.vectorizer:
+            save_artifact(settings.MODEL_DIR, self.vectorizer, self.model)
     
     def load_model(self):
-        """Load model and vectorizer from disk"""
+        """Load model and vectorizer from disk, falling back to legacy pickles"""
         try:
+            if read_manifest(settings.MODEL_DIR) is not None:
+                self.vectorizer, self.model, _ = load_artifact(settings.MODEL_DIR)
+                return
+            
             if os.path.exists(settings.MODEL_PATH):
                 self.model = joblib.load(settings.MODEL_PATH)
             
@@ -163,7 +233,11 @@ class SentimentModel:
         if not self.is_loaded():
             return {}
         
-        feature_names = self.vectorizer.get_feature_names_out()
+        if isinstance(self.vectorizer, HashingTfidfVectorizer):
+            # Hashed columns have no term; name them by index
+            feature_names = np.char.add("hash_", np.arange(self.vectorizer.n_features).astype(str))
+        else:
+            feature_names = self.vectorizer.get_feature_names_out()
         importance = {}
         
         for idx, class_name in enumerate(self.model.classes_):
@@ -1,14 +1,94 @@
-from typing import List, Dict
+import asyncio
+import numpy as np
+from typing import List, Dict, Any, Optional
 from ..models.schemas import (
-    DataSourceRequest, 
-    SentimentAnalysisResult, 
+    DataSourceRequest,
+    SentimentAnalysisResult,
     SentimentPrediction,
     TextData
 )
 from ..config import settings
-from .data_ingestion import DataIngestionService
-from .preprocessing import TextPreprocessor
-from .sentiment_model import SentimentModel
+from .data_ingestion import DataIngestionError, DataIngestionService, DataQualityTracker, FetchProgress
+from .prediction_cache import PredictionCache, batch_from_entries
+from .model_registry import ModelSnapshot, model_registry
+from .sentiment_model import PredictionBatch
+from .worker_pool import worker_pool
+
+# Predictions returned in a result, to limit response size
+PREDICTION_SAMPLE_SIZE = 50
+
+class SentimentAggregate:
+    """
+    Running totals of an analysis, updated one micro-batch of predictions at
+    a time so only the counts and the returned sample are kept in memory.
+    Batches are columnar (PredictionBatch), so totals are array reductions.
+    """
+    
+    def __init__(self, sample_size: int = PREDICTION_SAMPLE_SIZE):
+        self.sample_size = sample_size
+        self.sentiment_counts = {"positive": 0, "negative": 0, "neutral": 0}
+        self.total_confidence = 0.0
+        self.total_analyzed = 0
+        self.unique_texts = 0  # Distinct texts per analyzed batch, summed
+        self.sample: List[SentimentPrediction] = []
+    
+    def add(self, batch: PredictionBatch):
+        for sentiment, count in batch.sentiment_counts().items():
+            self.sentiment_counts[sentiment] += count
+        # Confidences are summed as reported, i.e. rounded to 4 places
+        self.total_confidence += float(np.round(batch.confidence, 4).sum())
+        self.total_analyzed += len(batch)
+        
+        # Keep the first predictions in input order
+        free = self.sample_size - len(self.sample)
+        if free > 0:
+            self.sample.extend(SentimentPrediction(**pred) for pred in batch.rows(free))
+    
+    def merge(self, other: "SentimentAggregate"):
+        """Fold in the totals of an analysis of later data"""
+        for sentiment, count in other.sentiment_counts.items():
+            self.sentiment_counts[sentiment] += count
+        self.total_confidence += other.total_confidence
+        self.total_analyzed += other.total_analyzed
+        self.unique_texts += other.unique_texts
+        self.sample.extend(other.sample[:self.sample_size - len(self.sample)])
+    
+    def result(self, total_samples: int, data_quality: Dict[str, Any]) -> SentimentAnalysisResult:
+        total_analyzed = self.total_analyzed
+        avg_confidence = self.total_confidence / total_analyzed if total_analyzed > 0 else 0.0
+        
+        # Calculate percentages
+        sentiment_percentages = {
+            sentiment: round((count / total_analyzed) * 100, 2) if total_analyzed > 0 else 0.0
+            for sentiment, count in self.sentiment_counts.items()
+        }
+        
+        # Share of texts that repeated one earlier in their batch and were not predicted again
+        dedup_ratio = 1 - self.unique_texts / total_analyzed if total_analyzed > 0 else 0.0
+        data_quality = {**data_quality, "unique_texts": self.unique_texts, "dedup_ratio": round(dedup_ratio, 4)}
+        
+        return SentimentAnalysisResult(
+            status="success",
+            total_samples=total_samples,
+            analyzed_samples=total_analyzed,
+            sentiment_distribution=dict(self.sentiment_counts),
+            sentiment_percentages=sentiment_percentages,
+            average_confidence=round(avg_confidence, 4),
+            predictions=list(self.sample),
+            data_quality=data_quality,
+            message=f"Successfully analyzed {total_analyzed} samples"
+        )
+
+class SourceAnalysis:
+    """Running state of one source within an analysis"""
+    
+    def __init__(self, request: DataSourceRequest):
+        self.request = request
+        self.quality = DataQualityTracker()
+        self.progress = FetchProgress()
+        self.aggregate = SentimentAggregate()
+        self.non_empty = 0
+        self.error: Optional[str] = None
 
 class SentimentAnalysisService:
     """
@@ -18,43 +98,73 @@ class SentimentAnalysisService:
     
     def __init__(self):
         self.ingestion_service = DataIngestionService()
-        self.preprocessor = TextPreprocessor()
-        self.model = SentimentModel()
+        self.cache = PredictionCache()
     
-    def analyze_from_api(self, request: DataSourceRequest) -> SentimentAnalysisResult:
+    async def analyze_from_api(self, request: DataSourceRequest) -> SentimentAnalysisResult:
         """
         Complete sentiment analysis pipeline from external API.
         
-        Steps:
-        1. Fetch data from API
-        2. Validate data sufficiency
+        Records are streamed from the source, following its pagination, and
+        handled in micro-batches of settings.ANALYSIS_BATCH_SIZE, so memory
+        stays bounded whatever the source size. For each batch:
+        1. Fetch the next records from the API
+        2. Track data sufficiency
         3. Preprocess texts
         4. Predict sentiments
-        5. Aggregate results
-        6. Evaluate confidence
+        5. Fold predictions into the running aggregate
+        Sufficiency and model status are evaluated once the stream ends.
+        """
+        return await self.analyze_from_apis([request])
+    
+    async def analyze_from_apis(self, requests: List[DataSourceRequest]) -> SentimentAnalysisResult:
+        """
+        Analyze several sources as one dataset. Sources are fetched and
+        analyzed concurrently, then merged in request order.
         """
+        snapshot = await self._model_snapshot()
+        model_loaded = snapshot.is_loaded()
+        sources = [SourceAnalysis(request) for request in requests]
+        await asyncio.gather(*(self._analyze_source(source, snapshot) for source in sources))
         
-        # Step 1: Fetch data
-        try:
-            raw_data = self.ingestion_service.fetch_from_api(request)
-        except Exception as e:
-            return SentimentAnalysisResult(
-                status="error",
-                total_samples=0,
-                analyzed_samples=0,
-                sentiment_distribution={},
-                sentiment_percentages={},
-                average_confidence=0.0,
-                predictions=[],
-                data_quality={},
-                message=f"Failed to fetch data: {str(e)}"
-            )
+        for source in sources:
+            if source.error is not None:
+                failed = "" if len(sources) == 1 else f" from {source.request.source_api}"
+                return SentimentAnalysisResult(
+                    status="error",
+                    total_samples=0,
+                    analyzed_samples=0,
+                    sentiment_distribution={},
+                    sentiment_percentages={},
+                    average_confidence=0.0,
+                    predictions=[],
+                    data_quality={},
+                    message=f"Failed to fetch data{failed}: {source.error}"
+                )
         
-        # Step 2: Validate data sufficiency
-        quality_check = self.ingestion_service.validate_data_sufficiency(
-            raw_data, 
-            min_samples=settings.MIN_SAMPLES_FOR_ANALYSIS
-        )
+        quality = DataQualityTracker()
+        aggregate = SentimentAggregate()
+        for source in sources:
+            quality.merge(source.quality)
+            aggregate.merge(source.aggregate)
+        non_empty = sum(source.non_empty for source in sources)
+        
+        quality_check = quality.result(min_samples=settings.MIN_SAMPLES_FOR_ANALYSIS)
+        if len(sources) == 1:
+            quality_check.update(sources[0].progress.report())
+        else:
+            quality_check.update({
+                "pages_fetched": sum(len(source.progress.page_times) for source in sources),
+                "bytes_fetched": sum(source.progress.bytes_fetched for source in sources),
+                "budget_exhausted": any(source.progress.budget_exhausted for source in sources),
+                "sources": [
+                    {
+                        "source_api": str(source.request.source_api),
+                        "total_samples": source.quality.total_samples,
+                        **source.progress.report()
+                    }
+                    for source in sources
+                ]
+            })
         
         if not quality_check["sufficient"]:
             return SentimentAnalysisResult(
@@ -69,15 +179,10 @@ class SentimentAnalysisService:
                 message=quality_check["reason"] + ". " + quality_check["recommendation"]
             )
         
-        # Step 3: Preprocess texts
-        texts = [item.text for item in raw_data if item.text.strip()]
-        preprocessed_texts = self.preprocessor.preprocess_batch(texts)
-        
-        # Step 4: Check if model is loaded
-        if not self.model.is_loaded():
+        if not model_loaded:
             return SentimentAnalysisResult(
                 status="error",
-                total_samples=len(texts),
+                total_samples=non_empty,
                 analyzed_samples=0,
                 sentiment_distribution={},
                 sentiment_percentages={},
@@ -87,44 +192,28 @@ class SentimentAnalysisService:
                 message="Sentiment model not loaded. Please train the model first."
             )
         
-        # Step 5: Predict sentiments
-        predictions = self.model.predict(preprocessed_texts)
-        
-        # Step 6: Aggregate results
-        sentiment_counts = {"positive": 0, "negative": 0, "neutral": 0}
-        total_confidence = 0.0
-        
-        for pred in predictions:
-            sentiment_counts[pred["sentiment"]] += 1
-            total_confidence += pred["confidence"]
-        
-        total_analyzed = len(predictions)
-        avg_confidence = total_confidence / total_analyzed if total_analyzed > 0 else 0.0
-        
-        # Calculate percentages
-        sentiment_percentages = {
-            sentiment: round((count / total_analyzed) * 100, 2)
-            for sentiment, count in sentiment_counts.items()
-        }
-        
-        # Create prediction objects
-        prediction_objects = [
-            SentimentPrediction(**pred) for pred in predictions
-        ]
-        
-        return SentimentAnalysisResult(
-            status="success",
-            total_samples=len(raw_data),
-            analyzed_samples=total_analyzed,
-            sentiment_distribution=sentiment_counts,
-            sentiment_percentages=sentiment_percentages,
-            average_confidence=round(avg_confidence, 4),
-            predictions=prediction_objects[:50],  # Limit to first 50 for response size
-            data_quality=quality_check,
-            message=f"Successfully analyzed {total_analyzed} samples"
+        return aggregate.result(total_samples=quality.total_samples, data_quality=quality_check)
+    
+    async def _analyze_source(self, source: "SourceAnalysis", snapshot: ModelSnapshot):
+        """Stream one source into its running state. Fetch errors are recorded, not raised."""
+        batches = self.ingestion_service.stream_from_api(
+            source.request, batch_size=settings.ANALYSIS_BATCH_SIZE, progress=source.progress
         )
+        try:
+            async for raw_batch in batches:
+                source.quality.add(raw_batch)
+                
+                texts = [item.text for item in raw_batch if item.text.strip()]
+                source.non_empty += len(texts)
+                
+                # Preprocessing and prediction run on the worker pool, while
+                # the next page downloads
+                if snapshot.is_loaded():
+                    await self._analyze_into(texts, source.aggregate, snapshot)
+        except DataIngestionError as e:
+            source.error = str(e)
     
-    def analyze_texts(self, texts: List[str]) -> SentimentAnalysisResult:
+    async def analyze_texts(self, texts: List[str]) -> SentimentAnalysisResult:
         """
         Analyze a list of texts directly (without API fetch).
         Useful for testing or when data is already available.
@@ -156,11 +245,9 @@ class SentimentAnalysisService:
                 message=f"Need at least {settings.MIN_SAMPLES_FOR_ANALYSIS} samples"
             )
         
-        # Preprocess
-        preprocessed_texts = self.preprocessor.preprocess_batch(texts)
-        
         # Check model
-        if not self.model.is_loaded():
+        snapshot = await self._model_snapshot()
+        if not snapshot.is_loaded():
             return SentimentAnalysisResult(
                 status="error",
                 total_samples=len(texts),
@@ -173,35 +260,52 @@ class SentimentAnalysisService:
                 message="Model not loaded"
             )
         
-        # Predict
-        predictions = self.model.predict(preprocessed_texts)
+        # Preprocess, predict and aggregate, sharded across the worker pool
+        aggregate = SentimentAggregate()
+        await self._analyze_into(texts, aggregate, snapshot)
         
-        # Aggregate
-        sentiment_counts = {"positive": 0, "negative": 0, "neutral": 0}
-        total_confidence = 0.0
+        return aggregate.result(total_samples=len(texts), data_quality={"sufficient": True})
+    
+    async def _model_snapshot(self) -> ModelSnapshot:
+        """
+        The model one analysis uses throughout. Picks up a model retrained
+        by another process; loading happens off the event loop, and an
+        analysis never waits for a load another request started.
+        """
+        return await asyncio.to_thread(model_registry.refresh, False)
+    
+    async def _analyze_into(self, texts: List[str], aggregate: SentimentAggregate, snapshot: ModelSnapshot):
+        """
+        Predict texts and fold them into the aggregate in input order.
+        Cached texts are answered from the prediction cache. The rest are
+        collapsed to unique texts, preprocessed and predicted once each on
+        the worker pool, and expanded back to every occurrence.
+        """
+        if not texts:
+            return
+        cached = await asyncio.to_thread(self.cache.get_many, texts, snapshot.version)
         
-        for pred in predictions:
-            sentiment_counts[pred["sentiment"]] += 1
-            total_confidence += pred["confidence"]
+        # Row of each text in the combined batch: cache hits first, then
+        # uncached texts in order of first occurrence
+        hits = [entry for entry in cached if entry is not None]
+        unique: Dict[str, int] = {}
+        rows = []
+        hit_row = 0
+        for text, entry in zip(texts, cached):
+            if entry is not None:
+                rows.append(hit_row)
+                hit_row += 1
+            else:
+                rows.append(len(hits) + unique.setdefault(text, len(unique)))
         
-        total_analyzed = len(predictions)
-        avg_confidence = total_confidence / total_analyzed if total_analyzed > 0 else 0.0
+        batches = [batch_from_entries(hits)] if hits else []
+        if unique:
+            shards = [shard async for shard in worker_pool.analyze(list(unique), snapshot.version)]
+            predicted = PredictionBatch.concat(shards)
+            # Workers use a newer model if the files changed since the snapshot; don't cache those
+            if predicted.model_version == snapshot.version:
+                await asyncio.to_thread(self.cache.put_batch, list(unique), predicted, snapshot.version)
+            batches.append(predicted)
         
-        sentiment_percentages = {
-            sentiment: round((count / total_analyzed) * 100, 2)
-            for sentiment, count in sentiment_counts.items()
-        }
-        
-        prediction_objects = [SentimentPrediction(**pred) for pred in predictions]
-        
-        return SentimentAnalysisResult(
-            status="success",
-            total_samples=len(texts),
-            analyzed_samples=total_analyzed,
-            sentiment_distribution=sentiment_counts,
-            sentiment_percentages=sentiment_percentages,
-            average_confidence=round(avg_confidence, 4),
-            predictions=prediction_objects[:50],
-            data_quality={"sufficient": True},
-            message=f"Successfully analyzed {total_analyzed} samples"
-        )
+        aggregate.unique_texts += len(set(texts))
+        aggregate.add(PredictionBatch.concat(batches).take(np.array(rows)))
@@ -0,0 +1,167 @@
+"""
+Background training jobs.
+
+A job preprocesses, splits, vectorizes, fits and saves a model in a process
+of its own, so a fit never holds up the worker pool that serves /analyze.
+Jobs run one at a time, in submission order.
+
+Job status lives in TRAINING_JOBS_DIR as one JSON file per job. The job
+process rewrites the file (atomically) as it moves through its stages, so
+every API process can report on any job. The saved model is promoted
+atomically by save_artifact's manifest rename; the registry of this
+process swaps it in as soon as the job finishes, and other processes on
+their next request.
+
+With WORKER_PROCESSES=0 jobs run in a thread of the API process instead.
+"""
+
+import asyncio
+import json
+import os
+import time
+import uuid
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timezone
+from multiprocessing import get_context
+from typing import Any, Dict, List, Optional
+from ..config import settings
+from .model_registry import model_registry
+from .preprocessing import create_preprocessor
+from .sentiment_model import SentimentModel
+
+# Status files of finished jobs kept in TRAINING_JOBS_DIR
+_KEPT_JOBS = 100
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _status_path(job_id: str) -> str:
+    return os.path.join(settings.TRAINING_JOBS_DIR, f"{job_id}.json")
+
+
+def _write_status(status: Dict[str, Any]):
+    path = _status_path(status["job_id"])
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(status, f)
+    os.replace(tmp_path, path)
+
+
+def read_job(job_id: str) -> Optional[Dict[str, Any]]:
+    """The status of a job, or None if there is no such job"""
+    if not job_id.isalnum():
+        return None
+    try:
+        with open(_status_path(job_id), encoding="utf-8") as f:
+            status = json.load(f)
+    except FileNotFoundError:
+        return None
+    if status["state"] == "running":
+        status["elapsed_seconds"] = round(time.time() - status["started"], 3)
+    return status
+
+
+def _run_job(status: Dict[str, Any], texts: List[str], labels: List[str]) -> Dict:
+    """Train and save a model, recording each stage in the job's status file"""
+    started = time.time()
+
+    def update(stage: str, **fields):
+        status.update(fields, stage=stage, elapsed_seconds=round(time.time() - started, 3))
+        _write_status(status)
+
+    update("preprocessing", state="running", started=started, started_at=_now())
+    preprocessor = create_preprocessor()
+    preprocessed_texts = []
+    for start in range(0, len(texts), settings.ANALYSIS_BATCH_SIZE):
+        preprocessed_texts.extend(preprocessor.preprocess_batch(texts[start:start + settings.ANALYSIS_BATCH_SIZE]))
+        update("preprocessing", samples_processed=len(preprocessed_texts))
+
+    result = SentimentModel().train(preprocessed_texts, labels, on_stage=update)
+    update("completed", state="completed", finished_at=_now(), result=result)
+    return result
+
+
+class TrainingJobRunner:
+    """Submits training jobs to a single background process and tracks them"""
+
+    def __init__(self):
+        self._executor: Optional[Executor] = None
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def start(self):
+        if self._executor is not None:
+            return
+        os.makedirs(settings.TRAINING_JOBS_DIR, exist_ok=True)
+        if settings.WORKER_PROCESSES == 0:
+            self._executor = ThreadPoolExecutor(max_workers=1)
+        else:
+            self._executor = ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn"))
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def submit(self, texts: List[str], labels: List[str]) -> Dict[str, Any]:
+        """Queue a job and return its initial status; must be called on the event loop"""
+        if len(texts) != len(labels):
+            raise ValueError("Number of texts and labels must match")
+
+        self.start()
+        self._prune()
+        status = {
+            "job_id": uuid.uuid4().hex,
+            "state": "queued",
+            "stage": "queued",
+            "created_at": _now(),
+            "started_at": None,
+            "finished_at": None,
+            "elapsed_seconds": 0.0,
+            "samples_total": len(texts),
+            "samples_processed": 0,
+            "result": None,
+            "error": None,
+        }
+        _write_status(status)
+        self._tasks[status["job_id"]] = asyncio.create_task(self._run(status, texts, labels))
+        return status
+
+    async def wait(self, job_id: str) -> Dict[str, Any]:
+        """Wait for a job submitted by this process to finish; returns its final status"""
+        task = self._tasks.get(job_id)
+        if task is not None:
+            await asyncio.shield(task)
+        return read_job(job_id)
+
+    async def _run(self, status: Dict[str, Any], texts: List[str], labels: List[str]):
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(self._executor, _run_job, dict(status), texts, labels)
+            # Serve the new model from this process right away
+            await asyncio.to_thread(model_registry.refresh)
+        except Exception as e:
+            # The job process is gone or raised; record it unless it already did
+            final = read_job(status["job_id"]) or status
+            final.update(state="failed", finished_at=_now(), error=str(e) or type(e).__name__)
+            _write_status(final)
+        finally:
+            self._tasks.pop(status["job_id"], None)
+
+    def _prune(self):
+        """Remove the status files of the oldest finished jobs"""
+        directory = settings.TRAINING_JOBS_DIR
+        names = [name for name in os.listdir(directory) if name.endswith(".json")]
+        if len(names) < _KEPT_JOBS:
+            return
+        names.sort(key=lambda name: os.path.getmtime(os.path.join(directory, name)))
+        for name in names[:len(names) - _KEPT_JOBS + 1]:
+            if name[:-len(".json")] not in self._tasks:
+                try:
+                    os.remove(os.path.join(directory, name))
+                except OSError:
+                    pass
+
+
+training_jobs = TrainingJobRunner()
@@ -0,0 +1,234 @@
+"""
+Hyperparameter search for SentimentModel: TF-IDF max_features, ngram_range,
+min_df and max_df, and LogisticRegression C, scored by k-fold
+cross-validation and by inference latency.
+
+Work is shared as far as the parameters allow:
+
+- Texts are preprocessed once (and cached on disk, see corpus_training).
+- n-grams are counted once per ngram_range and fold. Every min_df, max_df
+  and max_features setting selects columns of those counts and weights
+  them exactly as TfidfVectorizer would, instead of re-tokenizing.
+- The resulting sparse matrices are written to a scratch directory, and
+  classifier fits (one per config, C and fold) fan out over a process
+  pool that reads them from there.
+
+Latency is measured afterwards, one candidate at a time, so fits running
+in parallel don't distort it: featurizing and predicting a fixed sample
+of texts with the candidate's fold-0 featurizer and classifier.
+"""
+
+import itertools
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from numbers import Integral
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import CountVectorizer, TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import StratifiedKFold
+from sklearn.preprocessing import normalize
+from ..config import settings
+from .corpus_training import ShardStore, StageStats, preprocess_corpus
+
+# Texts featurized and predicted per latency measurement
+LATENCY_SAMPLE_SIZE = 1000
+
+
+def load_corpus(paths: Sequence[str], text_column: str = "text", label_column: str = "label",
+                max_rows: Optional[int] = None, workers: Optional[int] = None,
+                cache_dir: Optional[str] = None) -> Tuple[List[str], List[str]]:
+    """Preprocessed texts and labels of corpus files, in memory"""
+    store = ShardStore(cache_dir or settings.TRAINING_CACHE_DIR)
+    texts, labels = [], []
+    for _, chunk_texts, chunk_labels in preprocess_corpus(
+        paths, store, StageStats(), 10000, text_column, label_column, workers=workers
+    ):
+        texts.extend(chunk_texts)
+        labels.extend(chunk_labels)
+        if max_rows is not None and len(texts) >= max_rows:
+            break
+    return texts[:max_rows], labels[:max_rows]
+
+
+def feature_grid(max_features: Sequence[Optional[int]], ngram_ranges: Sequence[Tuple[int, int]],
+                 min_dfs: Sequence, max_dfs: Sequence) -> List[Dict[str, Any]]:
+    """Every combination, as TfidfVectorizer parameters"""
+    return [
+        {"max_features": limit, "ngram_range": tuple(ngram_range), "min_df": min_df, "max_df": max_df}
+        for ngram_range, limit, min_df, max_df in itertools.product(ngram_ranges, max_features, min_dfs, max_dfs)
+    ]
+
+
+def _select_features(counts, config: Dict[str, Any]) -> np.ndarray:
+    """Columns of a CountVectorizer matrix TfidfVectorizer keeps for config (its _limit_features)"""
+    n_doc = counts.shape[0]
+    max_df, min_df = config["max_df"], config["min_df"]
+    max_doc_count = max_df if isinstance(max_df, Integral) else max_df * n_doc
+    min_doc_count = min_df if isinstance(min_df, Integral) else min_df * n_doc
+    if max_doc_count < min_doc_count:
+        raise ValueError("max_df corresponds to < documents than min_df")
+
+    dfs = np.bincount(counts.indices, minlength=counts.shape[1])
+    mask = (dfs <= max_doc_count) & (dfs >= min_doc_count)
+    limit = config["max_features"]
+    if limit is not None and mask.sum() > limit:
+        tfs = np.asarray(counts.sum(axis=0)).ravel()
+        mask_inds = (-tfs[mask]).argsort()[:limit]
+        new_mask = np.zeros(len(dfs), dtype=bool)
+        new_mask[np.where(mask)[0][mask_inds]] = True
+        mask = new_mask
+    if not mask.any():
+        raise ValueError("After pruning, no terms remain. Try a lower min_df or a higher max_df.")
+    return np.where(mask)[0]
+
+
+def _tfidf(counts, idf: np.ndarray):
+    weighted = counts.astype(np.float64)
+    weighted.data *= idf[weighted.indices]
+    return normalize(weighted, norm="l2", copy=False)
+
+
+def _fit_candidate(task: Dict[str, Any]) -> Dict[str, Any]:
+    """Fit one classifier on one fold's cached matrices and score it"""
+    fold_dir = task["fold_dir"]
+    X_train = sparse.load_npz(os.path.join(fold_dir, "train.npz"))
+    X_val = sparse.load_npz(os.path.join(fold_dir, "val.npz"))
+    y_train = np.load(os.path.join(fold_dir, "..", "y_train.npy"))
+    y_val = np.load(os.path.join(fold_dir, "..", "y_val.npy"))
+
+    started = time.perf_counter()
+    model = LogisticRegression(max_iter=1000, random_state=42, class_weight="balanced", C=task["C"])
+    model.fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - started
+    accuracy = float(np.mean(model.predict(X_val) == y_val))
+    return {**task, "accuracy": accuracy, "fit_seconds": fit_seconds, "model": model if task["keep_model"] else None}
+
+
+def _measure_latency(vectorizer, model, texts: List[str], repeats: int = 3) -> float:
+    """Best-of-repeats milliseconds to featurize and predict texts, per 1000 texts"""
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        model.predict_proba(vectorizer.transform(texts))
+        best = min(best, time.perf_counter() - started)
+    return best * 1000 * 1000 / len(texts)
+
+
+def tune(texts: List[str], labels: List[str], configs: List[Dict[str, Any]], Cs: Sequence[float],
+         folds: int = 5, workers: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Cross-validate every (featurizer config, C) pair. Returns the
+    leaderboard, best mean accuracy first.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    texts_array = np.asarray(texts, dtype=object)
+    labels_array = np.asarray(labels)
+    rng = np.random.default_rng(42)
+    latency_texts = list(rng.choice(texts_array, size=min(LATENCY_SAMPLE_SIZE, len(texts)), replace=False))
+    splits = list(StratifiedKFold(n_splits=folds, shuffle=True, random_state=42).split(texts_array, labels_array))
+    scratch_dir = tempfile.mkdtemp(prefix="sentiment-tuning-")
+
+    try:
+        # Featurize: count n-grams once per (ngram_range, fold), derive every config from the counts
+        started = time.perf_counter()
+        tasks = []
+        vectorizers = {}  # Fold-0 featurizer per config, for latency
+        n_features = {}
+        invalid = set()  # Configs TfidfVectorizer would reject on some fold
+        for ngram_range in sorted({config["ngram_range"] for config in configs}):
+            for fold, (train_index, val_index) in enumerate(splits):
+                counter = CountVectorizer(ngram_range=ngram_range)
+                train_counts = counter.fit_transform(texts_array[train_index]).tocsr()
+                val_counts = counter.transform(texts_array[val_index]).tocsr()
+                terms = counter.get_feature_names_out()
+                fold_root = os.path.join(scratch_dir, f"fold{fold}")
+                os.makedirs(fold_root, exist_ok=True)
+                np.save(os.path.join(fold_root, "y_train.npy"), labels_array[train_index])
+                np.save(os.path.join(fold_root, "y_val.npy"), labels_array[val_index])
+
+                for index, config in enumerate(configs):
+                    if config["ngram_range"] != ngram_range or index in invalid:
+                        continue
+                    try:
+                        columns = _select_features(train_counts, config)
+                    except ValueError as e:
+                        print(f"Skipping {config}: {e}")
+                        invalid.add(index)
+                        continue
+                    selected = train_counts[:, columns]
+                    # Smoothed IDF, as TfidfTransformer computes it
+                    dfs = np.bincount(selected.indices, minlength=len(columns))
+                    idf = np.log((1 + selected.shape[0]) / (1 + dfs)) + 1
+                    fold_dir = os.path.join(fold_root, f"config{index}")
+                    os.makedirs(fold_dir)
+                    sparse.save_npz(os.path.join(fold_dir, "train.npz"), _tfidf(selected, idf), compressed=False)
+                    sparse.save_npz(os.path.join(fold_dir, "val.npz"), _tfidf(val_counts[:, columns], idf), compressed=False)
+                    if fold == 0:
+                        vectorizer = TfidfVectorizer(**config)
+                        vectorizer.vocabulary_ = dict(zip(terms[columns], range(len(columns))))
+                        vectorizer.idf_ = idf
+                        vectorizers[index] = vectorizer
+                        n_features[index] = len(columns)
+                    for C in Cs:
+                        tasks.append({"config": index, "C": C, "fold": fold, "fold_dir": fold_dir, "keep_model": fold == 0})
+        featurize_seconds = time.perf_counter() - started
+        tasks = [task for task in tasks if task["config"] not in invalid]
+        if not tasks:
+            raise ValueError("No featurizer config leaves any terms")
+        print(f"Featurized {len(configs) - len(invalid)} configs x {folds} folds in {featurize_seconds:.1f}s")
+
+        # Fit: every (config, C, fold) on the process pool
+        started = time.perf_counter()
+        if workers > 0:
+            with ProcessPoolExecutor(max_workers=workers, mp_context=get_context("spawn")) as executor:
+                results = list(executor.map(_fit_candidate, tasks))
+        else:
+            results = [_fit_candidate(task) for task in tasks]
+        print(f"Fitted {len(tasks)} classifiers in {time.perf_counter() - started:.1f}s")
+    finally:
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+
+    leaderboard = []
+    for (index, C), group in itertools.groupby(
+        sorted(results, key=lambda result: (result["config"], result["C"], result["fold"])),
+        key=lambda result: (result["config"], result["C"])
+    ):
+        group = list(group)
+        accuracies = [result["accuracy"] for result in group]
+        leaderboard.append({
+            "vectorizer_params": configs[index],
+            "classifier_params": {"C": C},
+            "accuracy": round(float(np.mean(accuracies)), 4),
+            "accuracy_std": round(float(np.std(accuracies)), 4),
+            "n_features": n_features[index],
+            "fit_seconds": round(float(np.mean([result["fit_seconds"] for result in group])), 3),
+            "latency_ms_per_1k": round(_measure_latency(vectorizers[index], group[0]["model"], latency_texts), 2),
+        })
+    leaderboard.sort(key=lambda entry: (-entry["accuracy"], entry["latency_ms_per_1k"]))
+    return leaderboard
+
+
+def fastest_meeting(leaderboard: List[Dict[str, Any]], min_accuracy: float) -> Optional[Dict[str, Any]]:
+    """The lowest-latency entry with at least min_accuracy, if any"""
+    passing = [entry for entry in leaderboard if entry["accuracy"] >= min_accuracy]
+    return min(passing, key=lambda entry: entry["latency_ms_per_1k"]) if passing else None
+
+
+def format_leaderboard(leaderboard: List[Dict[str, Any]]) -> str:
+    lines = [f"{'rank':>4}  {'accuracy':>15}  {'ms/1k':>7}  {'features':>8}  {'fit s':>6}  params"]
+    for rank, entry in enumerate(leaderboard, 1):
+        params = entry["vectorizer_params"]
+        lines.append(
+            f"{rank:>4}  {entry['accuracy']:.4f} ± {entry['accuracy_std']:.4f}  {entry['latency_ms_per_1k']:>7.2f}  "
+            f"{entry['n_features']:>8}  {entry['fit_seconds']:>6.2f}  "
+            f"ngram_range={params['ngram_range']} max_features={params['max_features']} "
+            f"min_df={params['min_df']} max_df={params['max_df']} C={entry['classifier_params']['C']}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,120 @@
+"""
+Process pool for the CPU-bound parts of the pipeline: NLTK preprocessing
+and TF-IDF + Logistic Regression prediction. Training runs elsewhere (see
+training_jobs), so a fit never occupies a worker that /analyze needs.
+
+Each worker process builds its own TextPreprocessor once, when it starts,
+and reads the model through its process's model registry, which reloads it
+only when the files on disk change (e.g. after /train). The model's arrays
+are memory-mapped and shared between workers, but each worker holds its
+own TF-IDF vocabulary dict, so that part of the model's memory is paid
+once per worker (see benchmarks/bench_worker_memory.py). Large batches are
+split into shards that run on all workers at once; results come back in
+input order.
+
+With WORKER_PROCESSES=0 the same functions run in a thread of the API
+process instead, which still keeps them off the event loop.
+"""
+
+import asyncio
+import math
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import get_context
+from typing import AsyncIterator, List, Optional
+from ..config import settings
+from .preprocessing import TextPreprocessor, create_preprocessor
+from .model_registry import model_registry
+from .sentiment_model import PredictionBatch
+
+# Per-process state, set up by _init_worker
+_preprocessor: Optional[TextPreprocessor] = None
+
+
+def _init_worker():
+    global _preprocessor
+    _preprocessor = create_preprocessor()
+    model_registry.current()
+
+
+def _preprocess_shard(texts: List[str]) -> List[str]:
+    return _preprocessor.preprocess_batch(texts)
+
+
+def _analyze_shard(texts: List[str], model_version: Optional[str]) -> PredictionBatch:
+    """Preprocess and predict one shard, as columnar predictions"""
+    snapshot = model_registry.current()
+    if snapshot.version != model_version:
+        snapshot = model_registry.refresh()
+    return snapshot.predict_batch(_preprocessor.preprocess_batch(texts))
+
+
+class WorkerPool:
+    """Runs pipeline stages on a process pool, sharding large batches"""
+
+    def __init__(self):
+        self._executor: Optional[Executor] = None
+        self.processes = 0
+
+    def start(self):
+        if self._executor is not None:
+            return
+        processes = settings.WORKER_PROCESSES
+        if processes is None:
+            processes = os.cpu_count() or 1
+
+        if processes > 0:
+            # Spawned workers don't inherit the API process's threads and sockets
+            self._executor = ProcessPoolExecutor(
+                max_workers=processes,
+                mp_context=get_context("spawn"),
+                initializer=_init_worker
+            )
+            print(f"Started {processes} worker processes")
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=1, initializer=_init_worker)
+        self.processes = processes
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _shards(self, texts: List[str]) -> List[List[str]]:
+        """Split texts so every worker gets a share, within the shard size bounds"""
+        workers = max(self.processes, 1)
+        size = math.ceil(len(texts) / workers)
+        size = max(settings.WORKER_MIN_SHARD_SIZE, min(size, settings.ANALYSIS_BATCH_SIZE))
+        return [texts[start:start + size] for start in range(0, len(texts), size)]
+
+    async def _run(self, fn, *args):
+        self.start()
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    async def analyze(self, texts: List[str], model_version: Optional[str] = None) -> AsyncIterator[PredictionBatch]:
+        """
+        Predictions for texts, yielded shard by shard in input order. Workers
+        predict with model_version, or the newest model if the files on disk
+        have moved past it; each batch records the version it used.
+        """
+        self.start()
+        loop = asyncio.get_running_loop()
+        futures = [
+            loop.run_in_executor(self._executor, _analyze_shard, shard, model_version)
+            for shard in self._shards(texts)
+        ]
+        try:
+            for future in futures:
+                yield await future
+        finally:
+            for future in futures:
+                future.cancel()
+
+    async def preprocess(self, texts: List[str]) -> List[str]:
+        shards = await asyncio.gather(*(
+            self._run(_preprocess_shard, shard) for shard in self._shards(texts)
+        ))
+        return [text for shard in shards for text in shard]
+
+
+worker_pool = WorkerPool()
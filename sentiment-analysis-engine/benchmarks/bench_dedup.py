@@ -0,0 +1,100 @@
+"""
+Benchmark analyzing a batch with repeated texts: every text sent to the
+worker pool (the path before deduplication) against
+SentimentAnalysisService.analyze_texts, which predicts each distinct text once.
+
+    python benchmarks/bench_dedup.py --texts 20000 --template-share 0.7
+
+Runs in-process on one worker process with the prediction cache disabled,
+so only deduplication within the batch is measured.
+"""
+
+import argparse
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Spawned workers re-run this module; they must find the parent's scratch directory
+if "BENCH_SCRATCH_DIR" not in os.environ:
+    os.environ["BENCH_SCRATCH_DIR"] = tempfile.mkdtemp(prefix="bench-dedup-")
+SCRATCH_DIR = os.environ["BENCH_SCRATCH_DIR"]
+os.environ.update(MODEL_DIR=os.path.join(SCRATCH_DIR, "model"), PREDICTION_CACHE_SIZE="0")
+os.environ.pop("PREDICTION_CACHE_DB", None)
+os.environ.setdefault("WORKER_PROCESSES", "1")
+
+from app.services.model_registry import model_registry
+from app.services.preprocessing import create_preprocessor
+from app.services.sentiment_model import SentimentModel
+from app.services.sentiment_service import SentimentAggregate, SentimentAnalysisService
+from app.services.worker_pool import worker_pool
+from synthetic import make_comment_stream, make_corpus
+
+
+async def without_dedup(texts):
+    snapshot = model_registry.current()
+    aggregate = SentimentAggregate()
+    async for shard in worker_pool.analyze(texts, snapshot.version):
+        aggregate.add(shard)
+    return aggregate.result(total_samples=len(texts), data_quality={"sufficient": True})
+
+
+service = SentimentAnalysisService()
+
+
+async def with_dedup(texts):
+    return await service.analyze_texts(texts)
+
+
+async def best_of(fn, texts, repeats: int):
+    best, result = float("inf"), None
+    for _ in range(repeats):
+        started = time.perf_counter()
+        result = await fn(texts)
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+async def run(args):
+    texts = make_comment_stream(args.texts, args.template_share)
+    await without_dedup(texts[:100])  # Warm up the workers
+
+    before, reference = await best_of(without_dedup, texts, args.repeats)
+    after, result = await best_of(with_dedup, texts, args.repeats)
+    print(f"{len(texts)} texts, {args.template_share:.0%} bot templates, best of {args.repeats}")
+    print(f"  every text     {before:7.3f}s")
+    print(f"  deduplicated   {after:7.3f}s  dedup_ratio {result.data_quality['dedup_ratio']}")
+    print(f"  speedup        {before / after:7.2f}x")
+    same = (
+        result.sentiment_distribution == reference.sentiment_distribution
+        and result.average_confidence == reference.average_confidence
+        and result.predictions == reference.predictions
+    )
+    print(f"  identical distribution, confidence and sample: {same}")
+    if not same:
+        sys.exit(1)
+
+
+def main(args):
+    training_texts, labels = make_corpus(args.train_samples, seed=7)
+    SentimentModel().train(create_preprocessor().preprocess_batch(training_texts), labels)
+    worker_pool.start()
+    try:
+        asyncio.run(run(args))
+    finally:
+        worker_pool.shutdown()
+        shutil.rmtree(SCRATCH_DIR, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark predicting each distinct text in a batch once")
+    parser.add_argument("--texts", type=int, default=20000)
+    parser.add_argument("--template-share", type=float, default=0.7)
+    parser.add_argument("--train-samples", type=int, default=5000)
+    parser.add_argument("--repeats", type=int, default=3)
+    main(parser.parse_args())
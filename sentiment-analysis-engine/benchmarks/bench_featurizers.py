@@ -0,0 +1,74 @@
+"""
+Benchmark FEATURIZER "tfidf" (TfidfVectorizer) against "hashing"
+(HashingTfidfVectorizer): fit time and traced peak memory, transform
+throughput, and the accuracy of the LogisticRegression SentimentModel
+fits on top:
+
+    python benchmarks/bench_featurizers.py --texts 80000
+
+Texts are preprocessed once up front and split 80/20 into train and test.
+Peak memory is traced on a second, untimed fit.
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.linear_model import LogisticRegression
+from app.config import settings
+from app.services.featurizers import HashingTfidfVectorizer
+from app.services.preprocessing import create_preprocessor
+from synthetic import make_corpus
+
+
+def make_featurizers(n_features: int):
+    return {
+        "tfidf": TfidfVectorizer(max_features=5000, ngram_range=(1, 2), min_df=2, max_df=0.8),
+        "hashing": HashingTfidfVectorizer(n_features=n_features, ngram_range=(1, 2)),
+    }
+
+
+def main(args):
+    texts, labels = make_corpus(args.texts)
+    texts = create_preprocessor().preprocess_batch(texts)
+    split = int(len(texts) * 0.8)
+    train_texts, test_texts = texts[:split], texts[split:]
+    y_train, y_test = np.asarray(labels[:split]), np.asarray(labels[split:])
+
+    print(f"{len(train_texts)} train / {len(test_texts)} test texts")
+    print(f"{'featurizer':<10} {'fit s':>7} {'fit peak MB':>12} {'transform texts/s':>18} {'accuracy':>9}")
+    for name, vectorizer in make_featurizers(args.n_features).items():
+        started = time.perf_counter()
+        X_train = vectorizer.fit_transform(train_texts)
+        fit_seconds = time.perf_counter() - started
+        # A second fit for memory; tracing slows allocation too much to time the same run
+        tracemalloc.start()
+        vectorizer.fit_transform(train_texts)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        best = float("inf")
+        for _ in range(args.repeats):
+            started = time.perf_counter()
+            X_test = vectorizer.transform(test_texts)
+            best = min(best, time.perf_counter() - started)
+
+        model = LogisticRegression(max_iter=1000, random_state=42, class_weight="balanced")
+        model.fit(X_train, y_train)
+        accuracy = float(np.mean(model.predict(X_test) == y_test))
+        print(f"{name:<10} {fit_seconds:>7.2f} {peak / 1e6:>12.0f} {len(test_texts) / best:>18.0f} {accuracy:>9.4f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the tfidf and hashing featurizers")
+    parser.add_argument("--texts", type=int, default=80000)
+    parser.add_argument("--n-features", type=int, default=settings.HASHING_N_FEATURES)
+    parser.add_argument("--repeats", type=int, default=3)
+    main(parser.parse_args())
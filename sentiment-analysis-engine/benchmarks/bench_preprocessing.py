@@ -0,0 +1,58 @@
+"""
+Benchmark PREPROCESSOR_MODE "nltk" (TextPreprocessor) against "fast"
+(FastTextPreprocessor) on bot comment templates and on distinct texts,
+and check their outputs are identical:
+
+    python benchmarks/bench_preprocessing.py --texts 5000
+
+Each mode gets a fresh preprocessor per run, so the lemma cache starts
+empty and repeats only help within a run, as they would in a batch.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.preprocessing import FastTextPreprocessor, TextPreprocessor
+from synthetic import make_comment_stream, make_corpus
+
+MODES = {"nltk": TextPreprocessor, "fast": FastTextPreprocessor}
+
+
+def best_of(preprocessor_class, texts, repeats: int):
+    best, output = float("inf"), None
+    for _ in range(repeats):
+        preprocessor = preprocessor_class()
+        started = time.perf_counter()
+        output = preprocessor.preprocess_batch(texts)
+        best = min(best, time.perf_counter() - started)
+    return best, output
+
+
+def main(args):
+    corpora = {
+        "bot templates": make_comment_stream(args.texts, template_share=1.0),
+        "distinct texts": make_corpus(args.texts)[0],
+    }
+    print(f"{args.texts} texts per corpus, best of {args.repeats}")
+    print(f"{'corpus':<16} {'mode':<6} {'texts/s':>9}")
+    for name, texts in corpora.items():
+        outputs = {}
+        for mode, preprocessor_class in MODES.items():
+            seconds, outputs[mode] = best_of(preprocessor_class, texts, args.repeats)
+            print(f"{name:<16} {mode:<6} {len(texts) / seconds:>9.0f}")
+        mismatches = sum(a != b for a, b in zip(outputs["nltk"], outputs["fast"]))
+        print(f"{name:<16} mismatches: {mismatches}")
+        if mismatches:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the nltk and fast preprocessing modes")
+    parser.add_argument("--texts", type=int, default=5000)
+    parser.add_argument("--repeats", type=int, default=3)
+    main(parser.parse_args())
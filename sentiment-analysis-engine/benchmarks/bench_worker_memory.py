@@ -0,0 +1,115 @@
+"""
+Measure what the model costs in resident memory per worker process:
+
+    python benchmarks/bench_worker_memory.py --texts 80000 --workers 1 2 4
+
+Trains a model with an unpruned unigram+bigram vocabulary (the worst case
+for memory), widened with made-up words (names, tags, typos) since the
+synthetic corpus alone has only a few thousand terms. Then for each pool size starts the worker pool twice, once
+on an empty MODEL_DIR and once on the model, and reads every worker's
+RSS and PSS from /proc/<pid>/smaps_rollup (Linux only). PSS splits shared
+pages between the processes mapping them, so the memory-mapped arrays
+count once in total while the per-process vocabulary dict counts in full
+in every worker.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import shutil
+import sys
+import tempfile
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Spawned workers re-run this module; they must find the parent's scratch directory
+if "BENCH_SCRATCH_DIR" not in os.environ:
+    os.environ["BENCH_SCRATCH_DIR"] = tempfile.mkdtemp(prefix="bench-worker-memory-")
+SCRATCH_DIR = os.environ["BENCH_SCRATCH_DIR"]
+MODEL_DIR = os.path.join(SCRATCH_DIR, "model")
+EMPTY_DIR = os.path.join(SCRATCH_DIR, "empty")
+os.environ["MODEL_PATH"] = os.path.join(EMPTY_DIR, "sentiment_model.pkl")
+
+from app.config import settings
+from app.services.model_artifacts import read_manifest
+from app.services.preprocessing import create_preprocessor
+from app.services.sentiment_model import SentimentModel
+from app.services.worker_pool import worker_pool
+from synthetic import make_corpus
+
+
+def memory_kb(pid: int):
+    """(RSS, PSS) of a process in kB"""
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            name, _, value = line.partition(":")
+            if name in ("Rss", "Pss"):
+                fields[name] = int(value.split()[0])
+    return fields["Rss"], fields["Pss"]
+
+
+def measure_pool(processes: int, model_dir: str):
+    """Per-worker (RSS, PSS) with every worker started and its model loaded"""
+    os.environ["MODEL_DIR"] = model_dir
+    settings.MODEL_DIR = model_dir
+    settings.WORKER_PROCESSES = processes
+    worker_pool.start()
+    try:
+        # One shard per worker, submitted together, so the pool starts them all
+        texts = ["warm up the worker"] * (processes * settings.WORKER_MIN_SHARD_SIZE)
+
+        async def warm_up():
+            async for _ in worker_pool.analyze(texts):
+                pass
+
+        if read_manifest(model_dir) is not None:
+            asyncio.run(warm_up())
+        else:
+            asyncio.run(worker_pool.preprocess(texts))
+        return [memory_kb(pid) for pid in list(worker_pool._executor._processes)]
+    finally:
+        worker_pool.shutdown()
+
+
+def main(args):
+    os.makedirs(EMPTY_DIR, exist_ok=True)
+    texts, labels = make_corpus(args.texts)
+    rng = random.Random(42)
+    words = ["".join(rng.choices("abcdefghijklmnopqrstuvwxyz", k=8)) for _ in range(args.extra_words)]
+    texts = [f"{text} {rng.choice(words)} {rng.choice(words)}" for text in texts]
+    settings.MODEL_DIR = MODEL_DIR
+    SentimentModel().train(
+        create_preprocessor().preprocess_batch(texts), labels,
+        vectorizer_params={"max_features": None, "min_df": 1, "max_df": 1.0}
+    )
+    manifest = read_manifest(MODEL_DIR)
+    array_bytes = sum(
+        os.path.getsize(os.path.join(MODEL_DIR, entry["name"]))
+        for name, entry in manifest["files"].items() if name != "vocabulary"
+    )
+    print(f"Model: {manifest['n_features']} features, {array_bytes / 1e6:.1f} MB of memory-mapped arrays")
+    print(f"{'workers':>7}  {'RSS/worker MB':>13}  {'model RSS/worker MB':>19}  "
+          f"{'model PSS total MB':>18}")
+    for processes in args.workers:
+        baseline = measure_pool(processes, EMPTY_DIR)
+        loaded = measure_pool(processes, MODEL_DIR)
+        rss = sum(r for r, _ in loaded) / len(loaded)
+        model_rss = rss - sum(r for r, _ in baseline) / len(baseline)
+        model_pss = sum(p for _, p in loaded) - sum(p for _, p in baseline)
+        print(f"{processes:>7}  {rss / 1024:>13.1f}  {model_rss / 1024:>19.1f}  {model_pss / 1024:>18.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure model memory per worker process")
+    parser.add_argument("--texts", type=int, default=80000)
+    parser.add_argument("--extra-words", type=int, default=100000, help="Distinct made-up words mixed into the texts")
+    parser.add_argument("--workers", nargs="+", type=int, default=[os.cpu_count() or 1, 2, 4],
+                        help="Pool sizes; the default starts with one per core, WORKER_PROCESSES unset")
+    args = parser.parse_args()
+    try:
+        main(args)
+    finally:
+        shutil.rmtree(SCRATCH_DIR, ignore_errors=True)
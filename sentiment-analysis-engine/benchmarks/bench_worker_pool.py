@@ -0,0 +1,137 @@
+"""
+Benchmark /analyze-texts throughput, and how responsive the API stays
+while it runs, for different WORKER_PROCESSES settings.
+
+For each setting a uvicorn server is started on a model trained once up
+front. One large /analyze-texts call is timed while another thread polls
+/health, whose latency shows whether the event loop stays free:
+
+    python benchmarks/bench_worker_pool.py --texts 5000 --workers 0 1 2
+
+The prediction cache is disabled, so every call does the full work.
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import httpx
+
+ENGINE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Add parent directory to path
+sys.path.append(ENGINE_DIR)
+
+from synthetic import make_corpus
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def train(env: dict, samples: int):
+    """Train the model the servers load, in a separate process so settings come from env"""
+    script = (
+        "import sys; sys.path[:0] = [sys.argv[1], sys.argv[2]]\n"
+        "from synthetic import make_corpus\n"
+        "from app.services.preprocessing import create_preprocessor\n"
+        "from app.services.sentiment_model import SentimentModel\n"
+        "texts, labels = make_corpus(int(sys.argv[3]), seed=7)\n"
+        "SentimentModel().train(create_preprocessor().preprocess_batch(texts), labels)\n"
+    )
+    subprocess.run([sys.executable, "-c", script, ENGINE_DIR, os.path.dirname(os.path.abspath(__file__)),
+                    str(samples)], env=env, cwd=ENGINE_DIR, check=True, stdout=subprocess.DEVNULL)
+
+
+def start_server(env: dict, port: int) -> subprocess.Popen:
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        env=env, cwd=ENGINE_DIR
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1).status_code == 200:
+                return server
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    server.terminate()
+    raise RuntimeError("Server did not start")
+
+
+def run(env: dict, texts, repeats: int):
+    port = free_port()
+    base = f"http://127.0.0.1:{port}"
+    server = start_server(env, port)
+    try:
+        with httpx.Client(base_url=base, timeout=600) as client:
+            client.post("/analyze-texts", json=texts[:200])  # Warm up the workers
+
+            best = float("inf")
+            health_ms = []
+            for _ in range(repeats):
+                done = threading.Event()
+
+                def poll():
+                    with httpx.Client(base_url=base, timeout=600) as poller:
+                        while not done.is_set():
+                            started = time.perf_counter()
+                            poller.get("/health")
+                            health_ms.append((time.perf_counter() - started) * 1000)
+                            time.sleep(0.05)
+
+                poller = threading.Thread(target=poll)
+                poller.start()
+                started = time.perf_counter()
+                response = client.post("/analyze-texts", json=texts)
+                best = min(best, time.perf_counter() - started)
+                done.set()
+                poller.join()
+                response.raise_for_status()
+            return len(texts) / best, response.json()["sentiment_distribution"], health_ms
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main(args):
+    texts, _ = make_corpus(args.texts)
+    with tempfile.TemporaryDirectory(prefix="bench-worker-pool-") as scratch:
+        env = dict(
+            os.environ,
+            MODEL_DIR=os.path.join(scratch, "model"),
+            TRAINING_JOBS_DIR=os.path.join(scratch, "jobs"),
+            PREDICTION_CACHE_SIZE="0",
+            PREPROCESSOR_MODE=args.preprocessor,
+        )
+        env.pop("PREDICTION_CACHE_DB", None)
+        print(f"Training on {args.train_samples} texts...")
+        train(env, args.train_samples)
+
+        print(f"\n{len(texts)} texts per /analyze-texts call, PREPROCESSOR_MODE={args.preprocessor}, "
+              f"{os.cpu_count()} core(s)")
+        print(f"{'workers':>8} {'texts/s':>9} {'/health median ms':>18} {'/health max ms':>15}  distribution")
+        for workers in args.workers:
+            throughput, distribution, health_ms = run(dict(env, WORKER_PROCESSES=str(workers)), texts, args.repeats)
+            print(f"{workers:>8} {throughput:>9.0f} {statistics.median(health_ms):>18.1f} {max(health_ms):>15.1f}  "
+                  f"{distribution}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark /analyze-texts across worker pool sizes")
+    parser.add_argument("--texts", type=int, default=5000)
+    parser.add_argument("--train-samples", type=int, default=5000)
+    parser.add_argument("--workers", nargs="+", type=int, default=[0, 1, 2],
+                        help="WORKER_PROCESSES values to compare; 0 runs in-process")
+    parser.add_argument("--preprocessor", choices=["fast", "nltk"], default="nltk")
+    parser.add_argument("--repeats", type=int, default=3, help="Best of this many calls per setting")
+    main(parser.parse_args())
@@ -0,0 +1,65 @@
+"""
+Synthetic labelled social-media texts for the benchmarks in this directory.
+
+Each text mixes topic words with a few sentiment words, mostly of its own
+label's polarity but sometimes of another, plus the mentions, hashtags,
+URLs, emoji and punctuation runs the preprocessor has to strip.
+"""
+
+import random
+from typing import List, Tuple
+
+LABELS = ["positive", "negative", "neutral"]
+
+SENTIMENT_WORDS = {
+    "positive": ["love", "great", "amazing", "awesome", "happy", "fantastic", "wonderful", "best",
+                 "brilliant", "excellent", "enjoyed", "perfect", "impressed", "recommend", "beautiful"],
+    "negative": ["hate", "terrible", "awful", "worst", "disappointed", "useless", "horrible", "boring",
+                 "broken", "waste", "annoying", "angry", "regret", "poor", "ugly"],
+    "neutral": ["okay", "fine", "average", "noted", "maybe", "usual", "standard", "normal",
+                "expected", "whatever", "alright", "plain", "typical", "moderate", "regular"],
+}
+
+TOPIC_WORDS = ["phone", "game", "movie", "update", "team", "album", "election", "recipe", "trip", "launch",
+               "price", "service", "app", "match", "show", "book", "camera", "battery", "delivery", "weather",
+               "coffee", "concert", "stream", "release", "patch", "season", "episode", "store", "class", "city"]
+
+FILLER_WORDS = ["the", "this", "is", "was", "so", "really", "just", "i", "it", "and", "we", "they", "not",
+                "don't", "can't", "it's", "gonna", "wanna", "today", "again", "very", "too", "my", "our"]
+
+DECORATIONS = ["@user", "@news_desk", "#tech", "#TBT", "https://t.co/abc123", "www.example.com/page",
+               "😀", "👍🏽", "😡", "❤️", "!!!", "...", "?!", "?", "!", ",", "lol", "omg", "1,000", "3.5"]
+
+# Repeated verbatim many times over, like the bots' comment templates
+TEMPLATES = [
+    "This is amazing! 😊", "Love this content!", "Great post! Keep it up! 👍", "So inspiring! 🌟",
+    "Interesting perspective.", "Thanks for sharing.", "Good point.", "Makes sense.",
+    "I don't really agree with this.", "Not sure about this...", "Could be better.", "Disappointing.",
+]
+
+
+def make_text(rng: random.Random, label: str) -> str:
+    words = [rng.choice(TOPIC_WORDS) for _ in range(rng.randint(2, 6))]
+    words += [rng.choice(FILLER_WORDS) for _ in range(rng.randint(2, 8))]
+    for _ in range(rng.randint(1, 3)):
+        polarity = label if rng.random() < 0.75 else rng.choice(LABELS)
+        words.append(rng.choice(SENTIMENT_WORDS[polarity]))
+    words += [rng.choice(DECORATIONS) for _ in range(rng.randint(0, 3))]
+    rng.shuffle(words)
+    return " ".join(words)
+
+
+def make_corpus(count: int, seed: int = 42) -> Tuple[List[str], List[str]]:
+    """(texts, labels) of count distinct-ish texts"""
+    rng = random.Random(seed)
+    labels = [rng.choice(LABELS) for _ in range(count)]
+    return [make_text(rng, label) for label in labels], labels
+
+
+def make_comment_stream(count: int, template_share: float = 0.7, seed: int = 42) -> List[str]:
+    """Texts where template_share of them are bot comment templates, the rest distinct"""
+    rng = random.Random(seed)
+    return [
+        rng.choice(TEMPLATES) if rng.random() < template_share else make_text(rng, rng.choice(LABELS))
+        for _ in range(count)
+    ]
@@ -0,0 +1,41 @@
+"""
+Preprocessed chunks are cached, so a second run over the same corpus
+preprocesses nothing, whether chunks ran on the pool or in-process.
+"""
+
+import pytest
+from app.services.corpus_training import ShardStore, StageStats, preprocess_corpus
+
+ROWS = [
+    ("I love this phone, it's great!", "positive"),
+    ("worst update ever @support #fail", "negative"),
+    ("the meeting is at noon https://t.co/abc", "neutral"),
+    ("so happy with the new album", "positive"),
+    ("this game is terrible and boring", "negative"),
+]
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    path = tmp_path / "corpus.csv"
+    lines = ["text,label"] + [f'"{text}",{label}' for text, label in ROWS * 3]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return str(path)
+
+
+def run(corpus, store, workers):
+    stats = StageStats()
+    chunks = list(preprocess_corpus([corpus], store, stats, chunk_size=4, workers=workers))
+    return chunks, stats
+
+
+@pytest.mark.parametrize("workers", [0, 1])
+def test_second_run_is_served_from_cache(corpus, tmp_path, workers):
+    store = ShardStore(str(tmp_path / "shards"))
+
+    first, stats = run(corpus, store, workers)
+    assert stats.counts.get("cached", 0) == 0
+
+    second, stats = run(corpus, store, workers)
+    assert stats.counts["cached"] == len(ROWS) * 3
+    assert second == first
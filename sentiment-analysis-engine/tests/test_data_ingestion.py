@@ -0,0 +1,159 @@
+"""
+The fetcher against a local stand-in for a source API: pagination,
+NDJSON streaming, the item/byte budget, per-host concurrency and errors.
+"""
+
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import pytest
+from app.config import settings
+from app.models.schemas import DataSourceRequest
+from app.services.data_ingestion import DataIngestionError, DataIngestionService, FetchProgress
+
+COMMENTS = [{"id": i, "content": f"comment number {i}", "is_bot": i % 2 == 0} for i in range(1, 26)]
+
+
+class SourceHandler(BaseHTTPRequestHandler):
+    """
+    /comments  skip/limit pages of COMMENTS
+    /cursor    COMMENTS in pages of 10, linked by X-Next-Cursor
+    /export    COMMENTS as one NDJSON stream
+    /failing   the first page of /comments, then a 500
+    /slow      one page after a delay, counting requests in flight
+    """
+
+    def log_message(self, *args):
+        pass
+
+    def send_body(self, body: bytes, content_type: str = "application/json", headers=None):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {name: values[0] for name, values in parse_qs(url.query).items()}
+        skip, limit = int(query.get("skip", 0)), int(query.get("limit", 10))
+        server = self.server
+
+        if url.path == "/comments":
+            self.send_body(json.dumps(COMMENTS[skip:skip + limit]).encode())
+        elif url.path == "/cursor":
+            start = int(query.get("cursor", 0))
+            headers = {"X-Next-Cursor": str(start + 10)} if start + 10 < len(COMMENTS) else {}
+            self.send_body(json.dumps(COMMENTS[start:start + 10]).encode(), headers=headers)
+        elif url.path == "/export":
+            body = "".join(json.dumps(comment) + "\n" for comment in COMMENTS).encode()
+            self.send_body(body, content_type="application/x-ndjson")
+        elif url.path == "/failing" and skip == 0:
+            self.send_body(json.dumps(COMMENTS[:limit]).encode())
+        elif url.path == "/slow":
+            with server.lock:
+                server.in_flight += 1
+                server.max_in_flight = max(server.max_in_flight, server.in_flight)
+            time.sleep(0.1)
+            with server.lock:
+                server.in_flight -= 1
+            self.send_body(json.dumps(COMMENTS[:1]).encode())
+        else:
+            self.send_response(500)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+
+@pytest.fixture(scope="module")
+def source():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SourceHandler)
+    server.lock = threading.Lock()
+    server.in_flight = server.max_in_flight = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server, f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def fetch(url: str, progress: FetchProgress = None, **request_fields):
+    async def run():
+        service = DataIngestionService()
+        try:
+            request = DataSourceRequest(source_api=url, language=None, **request_fields)
+            return [item async for batch in service.stream_from_api(request, progress=progress) for item in batch]
+        finally:
+            await service.close()
+    return asyncio.run(run())
+
+
+def test_follows_skip_limit_pages(source):
+    _, base = source
+    progress = FetchProgress()
+    items = fetch(f"{base}/comments?limit=10", progress)
+    assert [item.id for item in items] == [comment["id"] for comment in COMMENTS]
+    # 10 + 10 + 5: the short page is the last one
+    assert progress.report()["pages_fetched"] == 3
+    assert not progress.budget_exhausted
+
+
+def test_follows_cursor_header(source):
+    _, base = source
+    items = fetch(f"{base}/cursor")
+    assert [item.id for item in items] == [comment["id"] for comment in COMMENTS]
+
+
+def test_streams_ndjson(source):
+    _, base = source
+    progress = FetchProgress()
+    items = fetch(f"{base}/export", progress)
+    assert [item.text for item in items] == [comment["content"] for comment in COMMENTS]
+    expected_bytes = sum(len(json.dumps(comment)) + 1 for comment in COMMENTS)
+    assert progress.bytes_fetched == expected_bytes
+
+
+def test_item_budget_stops_paging(source):
+    _, base = source
+    progress = FetchProgress()
+    items = fetch(f"{base}/comments?limit=10", progress, max_items=15)
+    assert [item.id for item in items] == list(range(1, 16))
+    assert progress.budget_exhausted
+    assert progress.report()["pages_fetched"] == 2
+
+
+def test_byte_budget_stops_paging(source):
+    _, base = source
+    first_page = len(json.dumps(COMMENTS[:10]).encode())
+    progress = FetchProgress()
+    items = fetch(f"{base}/comments?limit=10", progress, max_bytes=first_page)
+    assert len(items) == 10
+    assert progress.budget_exhausted
+
+
+def test_failing_page_raises_ingestion_error(source):
+    _, base = source
+    with pytest.raises(DataIngestionError):
+        fetch(f"{base}/failing?limit=10")
+
+
+def test_requests_per_host_are_limited(source, monkeypatch):
+    server, base = source
+    monkeypatch.setattr(settings, "HTTP_MAX_PER_HOST", 2)
+    server.max_in_flight = 0
+
+    async def run():
+        service = DataIngestionService()
+        try:
+            requests = [DataSourceRequest(source_api=f"{base}/slow?limit=10", language=None) for _ in range(6)]
+            return await asyncio.gather(*(service.fetch_from_api(request) for request in requests))
+        finally:
+            await service.close()
+
+    results = asyncio.run(run())
+    assert all(len(items) == 1 for items in results)
+    assert server.max_in_flight == 2
@@ -0,0 +1,66 @@
+"""
+A retrained model must serve the very next request, in the API process and
+in the worker processes, without a restart.
+"""
+
+import random
+import pytest
+from fastapi.testclient import TestClient
+from app.config import settings
+
+POSITIVE = ["I love this great product", "amazing wonderful happy day", "fantastic work love it", "so good and nice"]
+NEGATIVE = ["I hate this awful thing", "terrible bad horrible day", "worst experience ever sad", "so bad and ugly"]
+NEUTRAL = ["it is a table", "the meeting is at noon", "this is a chair", "we went to the store"]
+FLIPPED = {"positive": "negative", "negative": "positive", "neutral": "neutral"}
+
+
+def make_training_data(count=300, seed=0):
+    rng = random.Random(seed)
+    texts, labels = [], []
+    for _ in range(count):
+        label, source = rng.choice([("positive", POSITIVE), ("negative", NEGATIVE), ("neutral", NEUTRAL)])
+        texts.append(f"{rng.choice(source)} {rng.randrange(5)}")
+        labels.append(label)
+    return texts, labels
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    """The API on a scratch model directory with one worker process"""
+    overrides = {
+        "MODEL_DIR": str(tmp_path / "sentiment"),
+        "MODEL_PATH": str(tmp_path / "sentiment_model.pkl"),
+        "TRAINING_JOBS_DIR": str(tmp_path / "jobs"),
+        "TRAINING_CACHE_DIR": str(tmp_path / "preprocessed"),
+    }
+    # Spawned workers read the environment, this process reads settings
+    for name, value in overrides.items():
+        monkeypatch.setenv(name, value)
+        monkeypatch.setattr(settings, name, value)
+    monkeypatch.setenv("WORKER_PROCESSES", "1")
+    monkeypatch.setattr(settings, "WORKER_PROCESSES", 1)
+
+    from app.main import app
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+def distribution(client):
+    response = client.post("/analyze-texts", json=["I love this"] * 12 + ["I hate this"] * 3)
+    assert response.status_code == 200
+    return response.json()["sentiment_distribution"]
+
+
+def test_retrained_model_serves_next_request(client):
+    texts, labels = make_training_data()
+
+    response = client.post("/train", json={"texts": texts, "labels": labels})
+    assert response.status_code == 200
+    before = distribution(client)
+    assert before["positive"] > before["negative"]
+
+    response = client.post("/train", json={"texts": texts, "labels": [FLIPPED[label] for label in labels]})
+    assert response.status_code == 200
+    after = distribution(client)
+    assert after["negative"] == before["positive"]
+    assert after["positive"] == before["negative"]
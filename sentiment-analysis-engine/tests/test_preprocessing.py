@@ -0,0 +1,91 @@
+"""
+FastTextPreprocessor must give exactly TextPreprocessor's output, so models
+trained with one mode serve correctly with the other.
+"""
+
+import random
+import pytest
+from nltk import word_tokenize
+from app.services.preprocessing import FastTextPreprocessor, TextPreprocessor
+
+SOCIAL_MEDIA_TEXTS = [
+    # URLs
+    "Check this out https://t.co/abc123 so cool",
+    "read more at www.example.com/page?id=3&x=1.",
+    "link:http://x.co/a?b=1,and more",
+    "foohttp://z.y bar",
+    # Mentions and hashtags
+    "@user thanks!! #blessed #TBT",
+    "@user_1. said #Tag! was great",
+    "@ahttp://x and #bwww.y run into URLs",
+    "#@a @@b @x#y",
+    # Contractions
+    "I don't know, it's not what we can't do",
+    "I cannot believe it...wanna go?",
+    "gonna, gotta, lemme, gimme!",
+    "Wanna! wanna? wanna",
+    # Emoji and unicode
+    "Love it 😀👍🏽❤️ so much",
+    "café naïve über İstanbul 日本",
+    "ſtop the ſ",
+    # Punctuation runs and abbreviations
+    "Hello!!! ... ?! ..",
+    "What?!?! No way!!!!",
+    "a,,b ,, end,",
+    "Mr. Smith went to Washington. He said no!",
+    "U.S. is big. e.g. this. i.e. what",
+    "1. first 2. second",
+    "it's 3.5 vs. 4,000,000 ,, ok",
+    ". . .",
+    "ok.ok. ok",
+    "x ...",
+    "wait.. what",
+    # Empty and whitespace
+    "",
+    "   \n\t ",
+    "!!!",
+]
+
+WORDS = ["i", "love", "this", "post", "cannot", "gimme", "gonna", "gotta", "lemme", "wanna", "dr", "mr", "e.g",
+         "etc", "vs", "dogs", "geese", "running", "better", "Great", "NOT", "don't", "it's", "3", "3.5", "1,000",
+         "café", "naïve", "GIMME", "İstanbul", "ſ", "_", "日本", "😀", "👍🏽", "ok", "no", "U.S", "the", "mice"]
+DECORATIONS = ["http://x.co/a?b=1", "https://t.co/abc", "www.site.com", "@user", "#tag", "@user_1.", "#Tag!",
+               "http", "www.", "@ahttp://x", "#bwww.y", "@x#y", "#@a", "@@b", "wwww.x", "foohttp://z.y"]
+PUNCTUATION = [".", ",", "!", "?", "..", "...", "'", '"', "-", ":", ";", "(", ")", "&", "’", "“", "*", "%"]
+
+
+def generated_texts(count: int, seed: int = 15):
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(count):
+        parts = []
+        for _ in range(rng.randint(0, 25)):
+            kind = rng.random()
+            pool = WORDS if kind < 0.55 else DECORATIONS if kind < 0.62 else PUNCTUATION
+            parts.append(rng.choice(pool))
+            parts.append(rng.choice([" ", " ", " ", "", "", "\n"]))
+        texts.append("".join(parts))
+    return texts
+
+
+@pytest.fixture(scope="module")
+def reference():
+    return TextPreprocessor()
+
+
+@pytest.fixture(scope="module")
+def fast():
+    return FastTextPreprocessor()
+
+
+@pytest.mark.parametrize("text", SOCIAL_MEDIA_TEXTS)
+def test_same_output(reference, fast, text):
+    cleaned = reference.clean_text(text)
+    assert fast.clean_text(text) == cleaned
+    assert fast.tokenize_clean(cleaned) == word_tokenize(cleaned)
+    assert fast.preprocess(text) == reference.preprocess(text)
+
+
+def test_same_output_on_generated_corpus(reference, fast):
+    texts = generated_texts(2000)
+    assert fast.preprocess_batch(texts) == reference.preprocess_batch(texts)
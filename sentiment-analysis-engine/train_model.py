@@ -1,8 +1,15 @@
 """
 Script to train the sentiment model with sample data.
 This creates a basic model that can be improved with real data.
+
+To train on a labelled corpus instead, pass its files:
+
+    python train_model.py --data reviews.csv more_reviews.ndjson
+
+The files are streamed in chunks, so they can be larger than memory.
 """
 
+import argparse
 import sys
 import os
 
@@ -11,6 +18,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.services.sentiment_model import SentimentModel
 from app.services.preprocessing import TextPreprocessor
+from app.services.corpus_training import CORPUS_FORMATS, CorpusError, train_from_files
 
 # Sample training data
 TRAINING_DATA = {
@@ -137,5 +145,55 @@ def train_model():
     print("\n✓ Model trained and saved successfully!")
     print("✓ You can now use the sentiment analysis API")
 
+def train_model_from_files(args):
+    """Train the sentiment model out of core on labelled corpus files"""
+    print(f"Training on {len(args.data)} file(s)...")
+    result = train_from_files(
+        args.data,
+        text_column=args.text_column,
+        label_column=args.label_column,
+        fmt=args.format,
+        chunk_size=args.chunk_size,
+        epochs=args.epochs,
+        validation_fraction=args.validation_fraction,
+        workers=args.workers,
+        cache_dir=args.cache_dir,
+        use_cache=not args.no_cache
+    )
+    
+    print("\n" + "="*50)
+    print("TRAINING COMPLETE!")
+    print("="*50)
+    print(f"Status: {result['status']}")
+    if result['accuracy'] is not None:
+        print(f"Held-out Accuracy: {result['accuracy']:.2%}")
+    print(f"Samples Trained: {result['samples_trained']}")
+    print(f"Rows Skipped: {result['skipped_rows']} (no text or unknown label)")
+    print(f"Rows From Cache: {result['cached_rows']}")
+    print(f"Model Version: {result['model_version']}")
+    print("="*50)
+
 if __name__ == "__main__":
-    train_model()
+    parser = argparse.ArgumentParser(description="Train the sentiment model")
+    parser.add_argument("--data", nargs="+", metavar="FILE",
+                        help="Labelled corpus files (.csv, .ndjson/.jsonl, .parquet); default: built-in samples")
+    parser.add_argument("--format", choices=sorted(set(CORPUS_FORMATS.values())),
+                        help="Corpus format, if not given by the file extensions")
+    parser.add_argument("--text-column", default="text")
+    parser.add_argument("--label-column", default="label", help="Column of positive/negative/neutral labels")
+    parser.add_argument("--chunk-size", type=int, default=10000, help="Rows read and preprocessed at a time")
+    parser.add_argument("--epochs", type=int, default=5, help="Passes over the corpus")
+    parser.add_argument("--validation-fraction", type=float, default=0.1, help="Share of rows held out for accuracy")
+    parser.add_argument("--workers", type=int, help="Preprocessing processes; default one per core, 0 in-process")
+    parser.add_argument("--cache-dir", help="Preprocessed shard cache (default TRAINING_CACHE_DIR)")
+    parser.add_argument("--no-cache", action="store_true", help="Don't keep preprocessed shards for re-runs")
+    args = parser.parse_args()
+    
+    if args.data:
+        try:
+            train_model_from_files(args)
+        except CorpusError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+    else:
+        train_model()
@@ -0,0 +1,109 @@
+"""
+Script to search TF-IDF and Logistic Regression hyperparameters.
+
+Cross-validates every combination of the given values on a labelled corpus
+and prints a leaderboard of accuracy against inference latency:
+
+    python tune_model.py --data reviews.csv --ngram-range 1,1 1,2 --C 0.3 1 3
+
+With --min-accuracy the fastest combination meeting it is picked, and with
+--save it is trained on the whole corpus and saved as the model.
+"""
+
+import argparse
+import json
+import sys
+import os
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.config import settings
+from app.services.corpus_training import CorpusError
+from app.services.sentiment_model import SentimentModel
+from app.services.tuning import fastest_meeting, feature_grid, format_leaderboard, load_corpus, tune
+
+def parse_df(value: str):
+    """min_df/max_df as TfidfVectorizer takes them: 0.8 is a proportion, 2 a document count"""
+    return float(value) if "." in value else int(value)
+
+def parse_ngram_range(value: str):
+    low, high = value.split(",")
+    return int(low), int(high)
+
+def parse_max_features(value: str):
+    return None if value.lower() == "none" else int(value)
+
+def tune_model(args):
+    """Cross-validate the grid and report, optionally saving the chosen model"""
+    if args.save and settings.FEATURIZER != "tfidf":
+        print("Error: --save needs FEATURIZER=tfidf; the grid is of TF-IDF parameters")
+        sys.exit(1)
+    
+    print(f"Loading {len(args.data)} file(s)...")
+    texts, labels = load_corpus(
+        args.data, args.text_column, args.label_column, args.max_rows, args.workers, args.cache_dir
+    )
+    configs = feature_grid(args.max_features, args.ngram_range, args.min_df, args.max_df)
+    print(f"Tuning {len(configs) * len(args.C)} combinations with {args.folds}-fold CV on {len(texts)} samples...")
+    
+    leaderboard = tune(texts, labels, configs, args.C, args.folds, args.workers)
+    
+    print("\n" + "="*50)
+    print("LEADERBOARD")
+    print("="*50)
+    print(format_leaderboard(leaderboard))
+    
+    chosen = leaderboard[0]
+    if args.min_accuracy is not None:
+        chosen = fastest_meeting(leaderboard, args.min_accuracy)
+        if chosen is None:
+            print(f"\nNo combination reaches {args.min_accuracy:.2%} accuracy")
+            return
+    
+    print("\nChosen:")
+    print(f"  Vectorizer: {chosen['vectorizer_params']}")
+    print(f"  Classifier: {chosen['classifier_params']}")
+    print(f"  Accuracy: {chosen['accuracy']:.2%}, {chosen['latency_ms_per_1k']:.2f} ms per 1000 texts")
+    
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"leaderboard": leaderboard, "chosen": chosen}, f, indent=2)
+        print(f"\nLeaderboard written to {args.output}")
+    
+    if args.save:
+        print("\nTraining the chosen model on all samples...")
+        result = SentimentModel().train(
+            texts, labels,
+            vectorizer_params=chosen["vectorizer_params"],
+            classifier_params=chosen["classifier_params"],
+            validation=False
+        )
+        print(result["message"])
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Search sentiment model hyperparameters")
+    parser.add_argument("--data", nargs="+", metavar="FILE", required=True,
+                        help="Labelled corpus files (.csv, .ndjson/.jsonl, .parquet)")
+    parser.add_argument("--text-column", default="text")
+    parser.add_argument("--label-column", default="label")
+    parser.add_argument("--max-rows", type=int, help="Tune on the first rows only")
+    parser.add_argument("--max-features", nargs="+", type=parse_max_features, default=[5000],
+                        help="TF-IDF vocabulary sizes; 'none' for unlimited")
+    parser.add_argument("--ngram-range", nargs="+", type=parse_ngram_range, default=[(1, 2)], metavar="LOW,HIGH")
+    parser.add_argument("--min-df", nargs="+", type=parse_df, default=[2])
+    parser.add_argument("--max-df", nargs="+", type=parse_df, default=[0.8])
+    parser.add_argument("--C", nargs="+", type=float, default=[1.0], help="Logistic Regression inverse regularization")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--workers", type=int, help="Fit processes; default one per core, 0 in-process")
+    parser.add_argument("--cache-dir", help="Preprocessed shard cache (default TRAINING_CACHE_DIR)")
+    parser.add_argument("--min-accuracy", type=float, help="Choose the fastest combination with at least this accuracy")
+    parser.add_argument("--output", help="Write the leaderboard to this JSON file")
+    parser.add_argument("--save", action="store_true", help="Train the chosen combination on all samples and save it")
+    args = parser.parse_args()
+    
+    try:
+        tune_model(args)
+    except (CorpusError, ValueError) as e:
+        print(f"Error: {e}")
+        sys.exit(1)
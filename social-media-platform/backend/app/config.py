@@ -8,6 +8,13 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     
+    # Background bot workers
+    BOT_WORKER_COUNT: int = 4
+    BOT_QUEUE_POLL_INTERVAL: float = 1.0  # Seconds between polls when no task is due
+    BOT_SCHEDULER_WORKERS: int = 8  # Threads running due actions from /bots/process-posts
+    BOT_BATCH_SIZE: int = 200  # (bot, post) pairs written per commit in batch runs
+    BOT_QUEUE_BATCH_SIZE: int = 20  # Due tasks a queue worker claims and commits together
+    
     class Config:
         env_file = ".env"
 
@@ -12,6 +12,9 @@ engine = create_engine(
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Max ids per IN (...) clause, well under SQLite's bound-parameter limit
+IN_CLAUSE_CHUNK = 500
+
 # Base class for models
 Base = declarative_base()
 
@@ -2,11 +2,14 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 import os
-from .database import engine, Base
+from .database import engine
+from .migrations import run_migrations
 from .routers import auth, posts, comments, reactions, bots, public_api, uploads
+from .services.bot_queue import worker_pool
+from .services.scheduler import action_scheduler
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# Create database tables and upgrade existing ones in place
+run_migrations(engine)
 
 # Create uploads directory
 UPLOAD_DIR = os.path.join(os.path.dirname(__file__), "..", "uploads")
@@ -25,6 +28,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Link"],  # Pagination headers
 )
 
 # Include routers
@@ -36,6 +40,15 @@ app.include_router(bots.router)
 app.include_router(public_api.router)
 app.include_router(uploads.router)
 
+@app.on_event("startup")
+def start_bot_workers():
+    worker_pool.start()
+
+@app.on_event("shutdown")
+def stop_bot_workers():
+    worker_pool.stop()
+    action_scheduler.shutdown()
+
 @app.get("/")
 def read_root():
     return {
@@ -0,0 +1,104 @@
+"""
+Minimal schema migrations for the social media database.
+
+`Base.metadata.create_all` creates missing tables but never changes tables
+that already exist, so columns and indexes added to the models later would
+not reach an existing social_media.db. Each migration below upgrades such a
+database in place. Applied versions are recorded in the `schema_version`
+table, and every step is written to be safe on a fresh database where
+create_all already built the current schema.
+
+Run on startup from main.py, or by hand:
+
+    python -m app.migrations
+"""
+
+from typing import Callable, List, Tuple
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+from .database import Base
+
+
+def _add_post_counters(conn: Connection):
+    """Denormalized like/dislike/comment counters on posts, filled from source tables"""
+    existing = {column["name"] for column in inspect(conn).get_columns("posts")}
+    added = False
+    for name in ("like_count", "dislike_count", "comment_count"):
+        if name not in existing:
+            conn.execute(text(f"ALTER TABLE posts ADD COLUMN {name} INTEGER NOT NULL DEFAULT 0"))
+            added = True
+    if added:
+        conn.execute(text("""
+            UPDATE posts SET
+                like_count = (SELECT COUNT(*) FROM reactions
+                              WHERE reactions.post_id = posts.id AND reactions.is_like = :liked),
+                dislike_count = (SELECT COUNT(*) FROM reactions
+                                 WHERE reactions.post_id = posts.id AND reactions.is_like = :disliked),
+                comment_count = (SELECT COUNT(*) FROM comments
+                                 WHERE comments.post_id = posts.id)
+        """), {"liked": True, "disliked": False})
+
+
+def _create_indexes(*statements: str) -> Callable[[Connection], None]:
+    def migrate(conn: Connection):
+        for statement in statements:
+            conn.execute(text(statement))
+    return migrate
+
+
+# (version, description, upgrade). Append only; never renumber.
+MIGRATIONS: List[Tuple[int, str, Callable[[Connection], None]]] = [
+    (1, "post counter columns", _add_post_counters),
+    (2, "keyset pagination indexes", _create_indexes(
+        "CREATE INDEX IF NOT EXISTS ix_posts_created_at_id ON posts (created_at, id)",
+        "CREATE INDEX IF NOT EXISTS ix_comments_created_at_id ON comments (created_at, id)",
+    )),
+    (3, "foreign key and filter indexes", _create_indexes(
+        "CREATE INDEX IF NOT EXISTS ix_comments_post_id ON comments (post_id)",
+        "CREATE INDEX IF NOT EXISTS ix_reactions_post_id_is_like ON reactions (post_id, is_like)",
+        "CREATE INDEX IF NOT EXISTS ix_bot_interaction_logs_bot_id_post_id "
+        "ON bot_interaction_logs (bot_id, post_id)",
+        "CREATE INDEX IF NOT EXISTS ix_bots_is_active ON bots (is_active)",
+        "CREATE INDEX IF NOT EXISTS ix_bot_tasks_status_due_at ON bot_tasks (status, due_at)",
+    )),
+    (4, "unique bot interaction log per pair", _create_indexes(
+        # Racing bot runs could log a pair twice; keep the first log
+        "DELETE FROM bot_interaction_logs WHERE id NOT IN "
+        "(SELECT MIN(id) FROM bot_interaction_logs GROUP BY bot_id, post_id)",
+        "DROP INDEX IF EXISTS ix_bot_interaction_logs_bot_id_post_id",
+        "CREATE UNIQUE INDEX ix_bot_interaction_logs_bot_id_post_id "
+        "ON bot_interaction_logs (bot_id, post_id)",
+    )),
+]
+
+
+def current_version(conn: Connection) -> int:
+    conn.execute(text("CREATE TABLE IF NOT EXISTS schema_version (version INTEGER NOT NULL)"))
+    version = conn.execute(text("SELECT MAX(version) FROM schema_version")).scalar()
+    return version or 0
+
+
+def run_migrations(engine: Engine) -> int:
+    """Create missing tables, then apply pending migrations. Returns the schema version."""
+    Base.metadata.create_all(bind=engine)
+
+    with engine.begin() as conn:
+        version = current_version(conn)
+
+    for target, description, upgrade in MIGRATIONS:
+        if target <= version:
+            continue
+        # One transaction per migration, so a failure leaves earlier ones applied
+        with engine.begin() as conn:
+            upgrade(conn)
+            conn.execute(text("INSERT INTO schema_version (version) VALUES (:v)"), {"v": target})
+        print(f"Applied migration {target}: {description}")
+        version = target
+
+    return version
+
+
+if __name__ == "__main__":
+    from .database import engine
+    from . import models  # Register all tables with Base
+    print(f"Schema at version {run_migrations(engine)}")
@@ -3,6 +3,7 @@ from .post import Post, Media
 from .comment import Comment
 from .reaction import Reaction
 from .bot import Bot, BotProfile, BotInteractionLog
+from .bot_job import BotJob, BotTask
 
 __all__ = [
     "User",
@@ -12,5 +13,7 @@ __all__ = [
     "Reaction",
     "Bot",
     "BotProfile",
-    "BotInteractionLog"
+    "BotInteractionLog",
+    "BotJob",
+    "BotTask"
 ]
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum, Boolean
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Enum, Boolean, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 import enum
@@ -14,7 +14,7 @@ class Bot(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, unique=True, nullable=False)
-    is_active = Column(Boolean, default=True)
+    is_active = Column(Boolean, default=True, index=True)
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
     
     # Relationships
@@ -64,3 +64,8 @@ class BotInteractionLog(Base):
     
     # Relationships
     bot = relationship("Bot", back_populates="interaction_logs")
+    
+    # One log per (bot, post): bot runs claim a pair by inserting its log
+    __table_args__ = (
+        Index('ix_bot_interaction_logs_bot_id_post_id', 'bot_id', 'post_id', unique=True),
+    )
@@ -0,0 +1,50 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index
+from sqlalchemy.orm import relationship
+from datetime import datetime, timezone
+import enum
+from ..database import Base
+
+class JobStatus(str, enum.Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+class BotJob(Base):
+    """A queued request to let every active bot react to one post"""
+    __tablename__ = "bot_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    post_id = Column(Integer, ForeignKey("posts.id", ondelete="CASCADE"), nullable=False)
+    status = Column(String, default=JobStatus.PENDING.value, nullable=False)
+    total_tasks = Column(Integer, default=0, nullable=False)
+    completed_tasks = Column(Integer, default=0, nullable=False)
+    failed_tasks = Column(Integer, default=0, nullable=False)
+    interactions = Column(Integer, default=0, nullable=False)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    finished_at = Column(DateTime, nullable=True)
+
+    # Relationships
+    tasks = relationship("BotTask", back_populates="job", cascade="all, delete-orphan")
+
+class BotTask(Base):
+    """One bot's pending reaction to a post, due at a scheduled time"""
+    __tablename__ = "bot_tasks"
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_id = Column(Integer, ForeignKey("bot_jobs.id", ondelete="CASCADE"), nullable=False, index=True)
+    bot_id = Column(Integer, ForeignKey("bots.id", ondelete="CASCADE"), nullable=False)
+    post_id = Column(Integer, ForeignKey("posts.id", ondelete="CASCADE"), nullable=False)
+    status = Column(String, default=JobStatus.PENDING.value, nullable=False, index=True)
+    due_at = Column(DateTime, nullable=False, index=True)  # Replaces the simulated response delay
+    attempts = Column(Integer, default=0, nullable=False)
+    error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+    # Relationships
+    job = relationship("BotJob", back_populates="tasks")
+    
+    # Backs the workers' "earliest due pending task" claim query
+    __table_args__ = (
+        Index('ix_bot_tasks_status_due_at', 'status', 'due_at'),
+    )
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 from ..database import Base
@@ -7,7 +7,7 @@ class Comment(Base):
     __tablename__ = "comments"
     
     id = Column(Integer, primary_key=True, index=True)
-    post_id = Column(Integer, ForeignKey("posts.id"), nullable=False)
+    post_id = Column(Integer, ForeignKey("posts.id"), nullable=False, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True)  # Nullable for bot comments
     bot_id = Column(Integer, ForeignKey("bots.id"), nullable=True)  # For bot-generated comments
     content = Column(Text, nullable=False)
@@ -17,3 +17,8 @@ class Comment(Base):
     post = relationship("Post", back_populates="comments")
     user = relationship("User", back_populates="comments")
     bot = relationship("Bot", back_populates="comments")
+    
+    # Backs keyset pagination on (created_at, id)
+    __table_args__ = (
+        Index('ix_comments_created_at_id', 'created_at', 'id'),
+    )
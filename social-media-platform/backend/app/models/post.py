@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 import enum
@@ -19,11 +19,21 @@ class Post(Base):
     created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), index=True)
     updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
     
+    # Denormalized counters, kept in step with reactions/comments (see services/post_counters.py)
+    like_count = Column(Integer, nullable=False, default=0, server_default="0")
+    dislike_count = Column(Integer, nullable=False, default=0, server_default="0")
+    comment_count = Column(Integer, nullable=False, default=0, server_default="0")
+    
     # Relationships
     user = relationship("User", back_populates="posts")
     media = relationship("Media", back_populates="post", cascade="all, delete-orphan")
     comments = relationship("Comment", back_populates="post", cascade="all, delete-orphan")
     reactions = relationship("Reaction", back_populates="post", cascade="all, delete-orphan")
+    
+    # Backs keyset pagination on (created_at, id)
+    __table_args__ = (
+        Index('ix_posts_created_at_id', 'created_at', 'id'),
+    )
 
 class Media(Base):
     __tablename__ = "media"
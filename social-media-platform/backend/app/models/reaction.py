@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Boolean, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, Integer, Boolean, DateTime, ForeignKey, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 from ..database import Base
@@ -22,4 +22,5 @@ class Reaction(Base):
     __table_args__ = (
         UniqueConstraint('post_id', 'user_id', name='unique_user_reaction'),
         UniqueConstraint('post_id', 'bot_id', name='unique_bot_reaction'),
+        Index('ix_reactions_post_id_is_like', 'post_id', 'is_like'),
     )
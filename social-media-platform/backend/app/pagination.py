@@ -0,0 +1,55 @@
+"""
+Keyset (cursor) pagination over (created_at, id), newest first.
+
+List endpoints accept an opaque `cursor` and return the cursor for the next
+page in the `X-Next-Cursor` header plus a `Link: <...>; rel="next"` header,
+so existing clients that expect a plain JSON array keep working. `skip`
+still works when no cursor is given.
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import List, Optional, Tuple
+from fastapi import HTTPException, Request, Response
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    """Opaque cursor pointing just after the given row"""
+    payload = json.dumps([created_at.isoformat(), row_id]).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), int(row_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def paginate(query: Query, model, skip: int, limit: int, cursor: Optional[str] = None) -> Query:
+    """Order newest first and apply either the cursor or the legacy offset"""
+    query = query.order_by(model.created_at.desc(), model.id.desc())
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        query = query.filter(tuple_(model.created_at, model.id) < (created_at, row_id))
+    else:
+        query = query.offset(skip)
+    return query.limit(limit)
+
+
+def set_next_cursor(request: Request, response: Response, items: List, limit: int):
+    """Advertise the next page if this one was full"""
+    if not items or len(items) < limit:
+        return
+    last = items[-1]
+    cursor = encode_cursor(last.created_at, last.id)
+    next_url = request.url.remove_query_params(["skip", "cursor"]).include_query_params(cursor=cursor)
+    response.headers[NEXT_CURSOR_HEADER] = cursor
+    response.headers["Link"] = f'<{next_url}>; rel="next"'
@@ -3,7 +3,9 @@ from sqlalchemy.orm import Session
 from typing import List
 from ..database import get_db
 from ..models.bot import Bot, BotProfile
-from ..schemas import BotCreate, BotResponse
+from ..models.bot_job import BotJob, BotTask, JobStatus
+from ..schemas import BotCreate, BotResponse, BotJobResponse
+from ..services import post_counters
 
 router = APIRouter(prefix="/bots", tags=["Bots"])
 
@@ -78,23 +80,55 @@ def delete_bot(bot_id: int, db: Session = Depends(get_db)):
     if not bot:
         raise HTTPException(status_code=404, detail="Bot not found")
     
+    # Its reactions and comments are deleted with it
+    post_counters.bot_interactions_removed(db, bot.id)
     db.delete(bot)
     db.commit()
     return None
 
 @router.post("/process-posts", status_code=status.HTTP_200_OK)
 def trigger_bot_processing(hours: int = 24, db: Session = Depends(get_db)):
-    """Manually trigger bot processing for recent posts"""
+    """
+    Manually trigger bot processing for recent posts.
+    Interactions are scheduled after each bot's response delay and run in
+    the background, so this returns as soon as they are queued.
+    """
     from ..services.bot_service import BotEngine
     
     bot_engine = BotEngine(db)
     results = bot_engine.process_recent_posts(hours=hours)
     
     return {
-        "message": f"Bot processing triggered for posts from last {hours} hours",
+        "message": f"Bot processing scheduled for posts from last {hours} hours",
         "posts_processed": results.get("posts", 0),
         "bots_active": results.get("bots", 0),
-        "interactions": results.get("interactions", 0)
+        "interactions_scheduled": results.get("scheduled", 0)
+    }
+
+@router.get("/jobs/{job_id}", response_model=BotJobResponse)
+def get_bot_job(job_id: int, db: Session = Depends(get_db)):
+    """Get progress of a queued bot job"""
+    job = db.query(BotJob).filter(BotJob.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    next_task = db.query(BotTask).filter(
+        BotTask.job_id == job.id,
+        BotTask.status == JobStatus.PENDING.value
+    ).order_by(BotTask.due_at).first()
+    
+    return {
+        "id": job.id,
+        "post_id": job.post_id,
+        "status": job.status,
+        "total_tasks": job.total_tasks,
+        "completed_tasks": job.completed_tasks,
+        "failed_tasks": job.failed_tasks,
+        "pending_tasks": job.total_tasks - job.completed_tasks - job.failed_tasks,
+        "interactions": job.interactions,
+        "next_due_at": next_task.due_at if next_task else None,
+        "created_at": job.created_at,
+        "finished_at": job.finished_at
     }
 
 @router.patch("/{bot_id}/activate", response_model=BotResponse)
@@ -8,6 +8,7 @@ from ..models.comment import Comment
 from ..models.bot import Bot
 from ..schemas import CommentCreate, CommentResponse
 from ..routers.auth import get_current_user
+from ..services import post_counters
 
 router = APIRouter(prefix="/posts", tags=["Comments"])
 
@@ -30,6 +31,7 @@ def create_comment(
         content=comment.content
     )
     db.add(db_comment)
+    post_counters.comment_added(db, post_id)
     db.commit()
     db.refresh(db_comment)
     
@@ -58,6 +60,7 @@ def delete_comment(
     if comment.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized to delete this comment")
     
+    post_counters.comment_removed(db, comment.post_id)
     db.delete(comment)
     db.commit()
     return None
@@ -1,14 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import List, Annotated
+from fastapi import APIRouter, Depends, HTTPException, Query as QueryParam, Request, Response, status
+from sqlalchemy.orm import Session, Query, selectinload
+from typing import List, Annotated, Optional
 from ..database import get_db
 from ..models.user import User
 from ..models.post import Post, Media
-from ..models.comment import Comment
-from ..models.reaction import Reaction
 from ..schemas import PostCreate, PostResponse, User as UserSchema
 from ..routers.auth import get_current_user
+from ..pagination import paginate, set_next_cursor
 
 router = APIRouter(prefix="/posts", tags=["Posts"])
 
@@ -41,30 +39,35 @@ def create_post(
         db.commit()
         db.refresh(db_post)
     
-    # Trigger bot processing for this post (async in production)
-    from ..services.bot_service import BotEngine
-    bot_engine = BotEngine(db)
-    bot_engine.process_single_post(db_post.id)
+    # Queue bot reactions; background workers run them when due
+    from ..services.bot_queue import enqueue_post
+    job = enqueue_post(db, db_post)
     
-    return enrich_post_response(db_post, db)
+    response = enrich_post_response(posts_with_counts(db).filter(Post.id == db_post.id).one())
+    response["bot_job_id"] = job.id
+    return response
 
 @router.get("/", response_model=List[PostResponse])
 def get_posts(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 20,
+    cursor: Optional[str] = QueryParam(None, description="Cursor from the X-Next-Cursor header of the previous page"),
     db: Session = Depends(get_db)
 ):
     """Get all posts (feed)"""
-    posts = db.query(Post).order_by(Post.created_at.desc()).offset(skip).limit(limit).all()
-    return [enrich_post_response(post, db) for post in posts]
+    posts = paginate(posts_with_counts(db), Post, skip, limit, cursor).all()
+    set_next_cursor(request, response, posts, limit)
+    return [enrich_post_response(post) for post in posts]
 
 @router.get("/{post_id}", response_model=PostResponse)
 def get_post(post_id: int, db: Session = Depends(get_db)):
     """Get a specific post"""
-    post = db.query(Post).filter(Post.id == post_id).first()
+    post = posts_with_counts(db).filter(Post.id == post_id).first()
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
-    return enrich_post_response(post, db)
+    return enrich_post_response(post)
 
 @router.delete("/{post_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_post(
@@ -84,22 +87,16 @@ def delete_post(
     db.commit()
     return None
 
-def enrich_post_response(post: Post, db: Session) -> dict:
+def posts_with_counts(db: Session) -> Query:
+    """
+    Query for posts ready for enrich_post_response.
+    Counts are denormalized columns on the post and user/media are
+    eager-loaded, so a page costs a fixed number of statements whatever its size.
+    """
+    return db.query(Post).options(selectinload(Post.user), selectinload(Post.media))
+
+def enrich_post_response(post: Post) -> dict:
     """Add counts to post response"""
-    like_count = db.query(func.count(Reaction.id)).filter(
-        Reaction.post_id == post.id,
-        Reaction.is_like == True
-    ).scalar()
-    
-    dislike_count = db.query(func.count(Reaction.id)).filter(
-        Reaction.post_id == post.id,
-        Reaction.is_like == False
-    ).scalar()
-    
-    comment_count = db.query(func.count(Comment.id)).filter(
-        Comment.post_id == post.id
-    ).scalar()
-    
     post_dict = {
         "id": post.id,
         "user_id": post.user_id,
@@ -109,9 +106,9 @@ def enrich_post_response(post: Post, db: Session) -> dict:
         "created_at": post.created_at,
         "user": post.user,
         "media": post.media,
-        "like_count": like_count or 0,
-        "dislike_count": dislike_count or 0,
-        "comment_count": comment_count or 0
+        "like_count": post.like_count or 0,
+        "dislike_count": post.dislike_count or 0,
+        "comment_count": post.comment_count or 0
     }
     
     return post_dict
@@ -1,84 +1,120 @@
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
-from typing import List, Optional
+from fastapi import APIRouter, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session, Query as SAQuery
+from sqlalchemy import func
+from collections import defaultdict
+import json
+from typing import Dict, List, Optional
 from datetime import datetime, timedelta
-from ..database import get_db
+from ..database import get_db, SessionLocal, IN_CLAUSE_CHUNK
 from ..models.post import Post
 from ..models.comment import Comment
 from ..models.reaction import Reaction
 from ..schemas import PublicPost, PublicComment
+from ..pagination import paginate, set_next_cursor
 
 router = APIRouter(prefix="/public", tags=["Public API"])
 
+# Rows fetched from the database cursor and flushed to the client per chunk
+EXPORT_CHUNK_SIZE = 1000
+
+def filter_posts(query: SAQuery, date_from: Optional[datetime], date_to: Optional[datetime], topic: Optional[str]) -> SAQuery:
+    if date_from:
+        query = query.filter(Post.created_at >= date_from)
+    if date_to:
+        query = query.filter(Post.created_at <= date_to)
+    if topic:
+        query = query.filter(Post.topic.ilike(f"%{topic}%"))
+    return query
+
+def filter_comments(query: SAQuery, date_from: Optional[datetime], date_to: Optional[datetime]) -> SAQuery:
+    if date_from:
+        query = query.filter(Comment.created_at >= date_from)
+    if date_to:
+        query = query.filter(Comment.created_at <= date_to)
+    return query
+
 @router.get("/posts", response_model=List[PublicPost])
 def get_public_posts(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
     language: Optional[str] = Query(None, description="Filter by language (not implemented)"),
     date_from: Optional[datetime] = Query(None, description="Filter posts from this date"),
     date_to: Optional[datetime] = Query(None, description="Filter posts until this date"),
     topic: Optional[str] = Query(None, description="Filter by topic"),
+    max_comments_per_post: Optional[int] = Query(None, ge=0, description="Return at most this many comments per post"),
     db: Session = Depends(get_db)
 ):
     """
     Public API endpoint for external services (like sentiment analysis engine).
     Returns posts with comments in a standardized format.
     """
-    query = db.query(Post)
+    query = filter_posts(db.query(Post), date_from, date_to, topic)
     
-    # Apply filters
-    if date_from:
-        query = query.filter(Post.created_at >= date_from)
-    if date_to:
-        query = query.filter(Post.created_at <= date_to)
-    if topic:
-        query = query.filter(Post.topic.ilike(f"%{topic}%"))
+    posts = paginate(query, Post, skip, limit, cursor).all()
+    set_next_cursor(request, response, posts, limit)
     
-    posts = query.order_by(Post.created_at.desc()).offset(skip).limit(limit).all()
+    # One query for the comments of every post on the page
+    comments_by_post = fetch_public_comments(db, [post.id for post in posts], max_comments_per_post)
     
-    result = []
-    for post in posts:
-        # Get likes and dislikes count
-        likes = db.query(Reaction).filter(
-            Reaction.post_id == post.id,
-            Reaction.is_like == True
-        ).count()
-        
-        dislikes = db.query(Reaction).filter(
-            Reaction.post_id == post.id,
-            Reaction.is_like == False
-        ).count()
+    return [
+        PublicPost(
+            id=post.id,
+            content=post.content,
+            topic=post.topic,
+            created_at=post.created_at,
+            likes=post.like_count,
+            dislikes=post.dislike_count,
+            comments=comments_by_post.get(post.id, [])
+        )
+        for post in posts
+    ]
+
+def fetch_public_comments(
+    db: Session,
+    post_ids: List[int],
+    max_comments_per_post: Optional[int] = None
+) -> Dict[int, List[PublicComment]]:
+    """
+    Comments for many posts, grouped by post id, oldest first.
+    With max_comments_per_post, each post keeps only its first N comments
+    (ranked in SQL so the rest are never loaded).
+    """
+    comments_by_post = defaultdict(list)
+    for start in range(0, len(post_ids), IN_CLAUSE_CHUNK):
+        chunk = post_ids[start:start + IN_CLAUSE_CHUNK]
+        query = db.query(
+            Comment.id, Comment.post_id, Comment.content, Comment.created_at, Comment.bot_id
+        ).filter(Comment.post_id.in_(chunk))
         
-        # Get comments
-        comments = db.query(Comment).filter(Comment.post_id == post.id).all()
-        public_comments = [
-            PublicComment(
-                id=comment.id,
-                content=comment.content,
-                created_at=comment.created_at,
-                is_bot=comment.bot_id is not None
+        if max_comments_per_post is not None:
+            rank = func.row_number().over(
+                partition_by=Comment.post_id, order_by=Comment.id
+            ).label("rank")
+            ranked = db.query(Comment.id, rank).filter(Comment.post_id.in_(chunk)).subquery()
+            query = query.join(ranked, ranked.c.id == Comment.id).filter(
+                ranked.c.rank <= max_comments_per_post
             )
-            for comment in comments
-        ]
         
-        result.append(
-            PublicPost(
-                id=post.id,
-                content=post.content,
-                topic=post.topic,
-                created_at=post.created_at,
-                likes=likes,
-                dislikes=dislikes,
-                comments=public_comments
-            )
-        )
-    
-    return result
+        for comment_id, post_id, content, created_at, bot_id in query.order_by(Comment.post_id, Comment.id):
+            comments_by_post[post_id].append(PublicComment(
+                id=comment_id,
+                content=content,
+                created_at=created_at,
+                is_bot=bot_id is not None
+            ))
+    return comments_by_post
 
 @router.get("/comments")
 def get_public_comments(
+    request: Request,
+    response: Response,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
     date_from: Optional[datetime] = Query(None),
     date_to: Optional[datetime] = Query(None),
     db: Session = Depends(get_db)
@@ -87,14 +123,10 @@ def get_public_comments(
     Get all comments (standalone endpoint for sentiment analysis).
     Returns just the comment texts.
     """
-    query = db.query(Comment)
-    
-    if date_from:
-        query = query.filter(Comment.created_at >= date_from)
-    if date_to:
-        query = query.filter(Comment.created_at <= date_to)
+    query = filter_comments(db.query(Comment), date_from, date_to)
     
-    comments = query.order_by(Comment.created_at.desc()).offset(skip).limit(limit).all()
+    comments = paginate(query, Comment, skip, limit, cursor).all()
+    set_next_cursor(request, response, comments, limit)
     
     return [
         {
@@ -106,6 +138,79 @@ def get_public_comments(
         for comment in comments
     ]
 
+@router.get("/posts/export")
+def export_public_posts(
+    date_from: Optional[datetime] = Query(None, description="Filter posts from this date"),
+    date_to: Optional[datetime] = Query(None, description="Filter posts until this date"),
+    topic: Optional[str] = Query(None, description="Filter by topic"),
+    max_comments_per_post: Optional[int] = Query(None, ge=0, description="Include at most this many comments per post"),
+):
+    """
+    Bulk export of posts with their comments as newline-delimited JSON,
+    one PublicPost per line, newest first. Rows are read from a streaming
+    database cursor and flushed in chunks, so memory stays constant.
+    """
+    def rows(db: Session):
+        query = filter_posts(db.query(Post), date_from, date_to, topic)
+        query = query.order_by(Post.created_at.desc(), Post.id.desc())
+        result = db.execute(query.statement, execution_options={"yield_per": EXPORT_CHUNK_SIZE})
+        for posts in result.scalars().partitions():
+            comments_by_post = fetch_public_comments(db, [post.id for post in posts], max_comments_per_post)
+            yield "".join(
+                PublicPost(
+                    id=post.id,
+                    content=post.content,
+                    topic=post.topic,
+                    created_at=post.created_at,
+                    likes=post.like_count,
+                    dislikes=post.dislike_count,
+                    comments=comments_by_post.get(post.id, [])
+                ).model_dump_json() + "\n"
+                for post in posts
+            )
+    
+    return StreamingResponse(stream_ndjson(rows), media_type="application/x-ndjson")
+
+@router.get("/comments/export")
+def export_public_comments(
+    date_from: Optional[datetime] = Query(None),
+    date_to: Optional[datetime] = Query(None),
+):
+    """
+    Bulk export of all comments as newline-delimited JSON, newest first.
+    Each line has the same fields as /public/comments plus post_id.
+    """
+    def rows(db: Session):
+        query = filter_comments(
+            db.query(Comment.id, Comment.post_id, Comment.content, Comment.created_at, Comment.bot_id),
+            date_from, date_to
+        ).order_by(Comment.created_at.desc(), Comment.id.desc())
+        result = db.execute(query.statement, execution_options={"yield_per": EXPORT_CHUNK_SIZE})
+        for comments in result.partitions():
+            yield "".join(
+                json.dumps({
+                    "id": comment_id,
+                    "post_id": post_id,
+                    "content": content,
+                    "created_at": created_at.isoformat() if created_at else None,
+                    "is_bot": bot_id is not None
+                }) + "\n"
+                for comment_id, post_id, content, created_at, bot_id in comments
+            )
+    
+    return StreamingResponse(stream_ndjson(rows), media_type="application/x-ndjson")
+
+def stream_ndjson(rows):
+    """
+    Run an NDJSON chunk generator with its own session. The response body is
+    sent after the endpoint returns, so it cannot use the request's session.
+    """
+    db = SessionLocal()
+    try:
+        yield from rows(db)
+    finally:
+        db.close()
+
 @router.get("/stats")
 def get_platform_stats(db: Session = Depends(get_db)):
     """Get platform statistics"""
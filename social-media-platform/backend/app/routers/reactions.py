@@ -7,6 +7,7 @@ from ..models.post import Post
 from ..models.reaction import Reaction
 from ..schemas import ReactionCreate, ReactionResponse
 from ..routers.auth import get_current_user
+from ..services import post_counters
 
 router = APIRouter(prefix="/posts", tags=["Reactions"])
 
@@ -31,6 +32,7 @@ def create_reaction(
     
     if existing_reaction:
         # Update existing reaction
+        post_counters.reaction_changed(db, post_id, existing_reaction.is_like, reaction.is_like)
         existing_reaction.is_like = reaction.is_like
         db.commit()
         db.refresh(existing_reaction)
@@ -43,6 +45,7 @@ def create_reaction(
         is_like=reaction.is_like
     )
     db.add(db_reaction)
+    post_counters.reaction_added(db, post_id, reaction.is_like)
     db.commit()
     db.refresh(db_reaction)
     
@@ -63,6 +66,7 @@ def delete_reaction(
     if not reaction:
         raise HTTPException(status_code=404, detail="Reaction not found")
     
+    post_counters.reaction_removed(db, post_id, reaction.is_like)
     db.delete(reaction)
     db.commit()
     return None
@@ -74,6 +74,7 @@ class PostResponse(BaseModel):
     like_count: int = 0
     dislike_count: int = 0
     comment_count: int = 0
+    bot_job_id: Optional[int] = None  # Set when the post was just created
     
     @field_serializer('created_at')
     def serialize_dt(self, dt: datetime, _info):
@@ -156,6 +157,19 @@ class BotResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class BotJobResponse(BaseModel):
+    id: int
+    post_id: int
+    status: str
+    total_tasks: int
+    completed_tasks: int
+    failed_tasks: int
+    pending_tasks: int
+    interactions: int
+    next_due_at: Optional[datetime] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
 # Public API Schemas (for Sentiment Analysis)
 class PublicComment(BaseModel):
     id: int
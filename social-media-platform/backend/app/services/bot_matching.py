@@ -0,0 +1,217 @@
+"""
+Vectorized relevance scoring for many bots against many posts.
+
+BotEngine.calculate_relevance_score re-parses a bot's interests for every
+post it looks at. InterestMatcher compiles the interests of all bots into
+one shared vocabulary up front, scans each post's topic, keywords and
+content once against that vocabulary, and turns the per-interest hits into
+a posts x bots relevance matrix with a single matrix product.
+
+Scores are identical to calculate_relevance_score, including its quirks
+(substring matching in both directions, interests of 2 characters or fewer
+only counting for keywords, and +0.3 per interest matching any keyword).
+"""
+
+import bisect
+import re
+from typing import Callable, Dict, List
+import numpy as np
+from ..models.bot import Bot
+from ..models.post import Post
+
+TOPIC_WEIGHT = 0.5
+KEYWORD_WEIGHT = 0.3
+CONTENT_WEIGHT = 0.2
+
+# Interests this short are ignored when matching topic and content
+MIN_INTEREST_LENGTH = 3
+
+# Posts scored per matrix product, to bound memory on large runs
+POST_CHUNK_SIZE = 1024
+
+
+def _sequential_score(topic_hit: bool, keyword_hits: int, content_hit: bool) -> float:
+    """Sum the weights in the same order as calculate_relevance_score so floats match exactly"""
+    relevance = 0.0
+    if topic_hit:
+        relevance += TOPIC_WEIGHT
+    for _ in range(keyword_hits):
+        relevance += KEYWORD_WEIGHT
+    if content_hit:
+        relevance += CONTENT_WEIGHT
+    return min(relevance, 1.0)
+
+
+def _trie_pattern(words: List[str]) -> str:
+    """
+    Regex equivalent to an alternation of words, factored into a trie so the
+    engine walks shared prefixes once. Optional tails are greedy, so the
+    match at any position is the longest word starting there.
+    """
+    trie: Dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[''] = {}  # End-of-word marker
+
+    def build(node: dict) -> str:
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        return '(?:' + body + ')?' if '' in node else body
+
+    return build(trie)
+
+
+class InterestMatcher:
+    """Relevance of every post to every bot, compiled once per processing run"""
+
+    def __init__(self, bots: List[Bot], is_universal: Callable[[Bot], bool]):
+        self.bots = bots
+        self.universal = np.array([is_universal(bot) for bot in bots], dtype=bool)
+
+        vocabulary: Dict[str, int] = {}
+        bot_interests = []
+        for bot, universal in zip(bots, self.universal):
+            interests = set()
+            if not universal and bot.profile and bot.profile.interests:
+                interests = set(
+                    interest.strip().lower() for interest in bot.profile.interests.split(',')
+                )
+                interests.discard('')
+            bot_interests.append([vocabulary.setdefault(i, len(vocabulary)) for i in interests])
+
+        self.interests = list(vocabulary)
+        self.long_interest = np.array(
+            [len(i) >= MIN_INTEREST_LENGTH for i in self.interests], dtype=bool
+        )
+
+        # bots x interests incidence matrix
+        self.membership = np.zeros((len(bots), len(self.interests)), dtype=np.float32)
+        for row, columns in enumerate(bot_interests):
+            self.membership[row, columns] = 1.0
+
+        max_interests = max((len(c) for c in bot_interests), default=0)
+        self._score_table = np.array([
+            [[_sequential_score(t, k, c) for c in (False, True)] for k in range(max_interests + 1)]
+            for t in (False, True)
+        ])
+
+        self._compile_vocabulary()
+        self._contained_cache: Dict[str, np.ndarray] = {}
+        self._containing_cache: Dict[str, np.ndarray] = {}
+
+    def _compile_vocabulary(self):
+        """Build the lookups used to find interests inside text and text inside interests"""
+        index = {interest: col for col, interest in enumerate(self.interests)}
+        self._index = index
+
+        # Interests inside a text: a lookahead at every position captures the
+        # longest interest starting there. Any other interest starting at that
+        # position is a prefix of it, so it is recovered from the prefix table.
+        self._pattern = None
+        if self.interests:
+            self._pattern = re.compile('(?=(' + _trie_pattern(self.interests) + '))')
+        self._prefixes = {
+            interest: np.array(
+                [index[interest[:k]] for k in range(1, len(interest) + 1) if interest[:k] in index],
+                dtype=np.intp
+            )
+            for interest in self.interests
+        }
+
+        # Text inside interests: search one joined string and map offsets back
+        self._joined = None
+        if not any('\0' in i for i in self.interests):
+            self._joined = '\0'.join(self.interests)
+        self._offsets = []
+        offset = 0
+        for interest in self.interests:
+            self._offsets.append(offset)
+            offset += len(interest) + 1
+
+    def _find_containing(self, text: str) -> List[int]:
+        """Columns of all interests that contain text as a substring"""
+        if self._joined is None or '\0' in text:
+            return [col for col, i in enumerate(self.interests) if text in i]
+        columns = []
+        start = self._joined.find(text)
+        while start != -1:
+            col = bisect.bisect_right(self._offsets, start) - 1
+            if not columns or columns[-1] != col:
+                columns.append(col)
+            start = self._joined.find(text, start + 1)
+        return columns
+
+    def _scan(self, text: str) -> np.ndarray:
+        """Columns of all interests occurring as substrings of text"""
+        if self._pattern is None:
+            return np.empty(0, dtype=np.intp)
+        longest = set(m.group(1) for m in self._pattern.finditer(text))
+        if not longest:
+            return np.empty(0, dtype=np.intp)
+        return np.unique(np.concatenate([self._prefixes[i] for i in longest]))
+
+    def interests_in(self, text: str) -> np.ndarray:
+        """Columns of all interests occurring in a topic or keyword (memoized)"""
+        cached = self._contained_cache.get(text)
+        if cached is None:
+            cached = self._scan(text)
+            self._contained_cache[text] = cached
+        return cached
+
+    def interests_containing(self, text: str) -> np.ndarray:
+        """Columns of all interests that a topic or keyword is a substring of (memoized)"""
+        cached = self._containing_cache.get(text)
+        if cached is None:
+            cached = np.array(self._find_containing(text), dtype=np.intp)
+            self._containing_cache[text] = cached
+        return cached
+
+    def _post_hits(self, post: Post, topic: np.ndarray, keyword: np.ndarray, content: np.ndarray):
+        """Fill one row of per-interest hit flags for a post"""
+        if post.topic:
+            post_topic = post.topic.lower()
+            topic[self.interests_in(post_topic)] = True
+            topic[self.interests_containing(post_topic)] = True
+            topic &= self.long_interest
+
+        if post.keywords:
+            for kw in set(kw.strip().lower() for kw in post.keywords.split(',')):
+                if kw:
+                    keyword[self.interests_in(kw)] = True
+                    keyword[self.interests_containing(kw)] = True
+
+        # Content is rarely repeated, so it is scanned without memoizing
+        content[self._scan(post.content.lower())] = True
+        content &= self.long_interest
+
+    def score_posts(self, posts: List[Post]) -> np.ndarray:
+        """
+        Relevance matrix of shape (len(posts), len(bots)).
+        Entry [p, b] equals calculate_relevance_score(bots[b], posts[p]).
+        """
+        scores = np.zeros((len(posts), len(self.bots)))
+        n_interests = len(self.interests)
+
+        for start in range(0, len(posts), POST_CHUNK_SIZE):
+            chunk = posts[start:start + POST_CHUNK_SIZE]
+            topic = np.zeros((len(chunk), n_interests), dtype=bool)
+            keyword = np.zeros((len(chunk), n_interests), dtype=bool)
+            content = np.zeros((len(chunk), n_interests), dtype=bool)
+            for row, post in enumerate(chunk):
+                self._post_hits(post, topic[row], keyword[row], content[row])
+
+            membership_t = self.membership.T
+            topic_any = (topic.astype(np.float32) @ membership_t) > 0
+            keyword_count = (keyword.astype(np.float32) @ membership_t).astype(np.intp)
+            content_any = (content.astype(np.float32) @ membership_t) > 0
+
+            scores[start:start + len(chunk)] = self._score_table[
+                topic_any.astype(np.intp), keyword_count, content_any.astype(np.intp)
+            ]
+
+        scores[:, self.universal] = 1.0
+        return scores
@@ -0,0 +1,191 @@
+"""
+Durable bot job queue backed by the bot_jobs / bot_tasks tables.
+
+Creating a post enqueues one task per interested bot, each due after that
+bot's simulated response delay. A pool of worker threads claims due tasks
+and runs them through the BotEngine, so the request path never waits on
+bot delays or AI comment generation. Each worker claims due tasks in
+small chunks and writes a chunk's interactions with one commit.
+"""
+
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Set, Tuple
+from sqlalchemy import update
+from sqlalchemy.orm import Session, joinedload
+from ..config import settings
+from ..database import SessionLocal
+from ..models.bot import Bot
+from ..models.bot_job import BotJob, BotTask, JobStatus
+from ..models.post import Post
+from .bot_service import BotEngine, run_interactions
+
+
+def enqueue_post(db: Session, post: Post) -> BotJob:
+    """Create a job with one scheduled task per active bot interested in the post"""
+    engine = BotEngine(db)
+    now = datetime.now(timezone.utc)
+
+    job = BotJob(post_id=post.id, status=JobStatus.PENDING.value)
+    db.add(job)
+    db.flush()
+
+    active_bots = db.query(Bot).filter(Bot.is_active == True).all()
+    tasks = []
+    for bot in active_bots:
+        if engine.get_effective_relevance(bot, post) is None:
+            continue
+        tasks.append(BotTask(
+            job_id=job.id,
+            bot_id=bot.id,
+            post_id=post.id,
+            due_at=now + timedelta(seconds=engine.get_response_delay(bot))
+        ))
+
+    db.add_all(tasks)
+    job.total_tasks = len(tasks)
+    if not tasks:
+        job.status = JobStatus.COMPLETED.value
+        job.finished_at = now
+    db.commit()
+    db.refresh(job)
+    return job
+
+
+class BotWorkerPool:
+    """Pool of threads draining due tasks from the bot task queue"""
+
+    def __init__(self, worker_count: int = None, poll_interval: float = None):
+        self.worker_count = worker_count or settings.BOT_WORKER_COUNT
+        self.poll_interval = poll_interval or settings.BOT_QUEUE_POLL_INTERVAL
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    def start(self):
+        """Recover interrupted tasks and start the worker threads"""
+        if self._threads:
+            return
+        self._requeue_running_tasks()
+        self._stop.clear()
+        for i in range(self.worker_count):
+            thread = threading.Thread(target=self._run, name=f"bot-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = 5.0):
+        """Signal workers to stop and wait for them to finish their current chunk"""
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+        self._threads = []
+
+    def _requeue_running_tasks(self):
+        """Tasks left running by a previous process never finished; run them again"""
+        db = SessionLocal()
+        try:
+            db.query(BotTask).filter(
+                BotTask.status == JobStatus.RUNNING.value
+            ).update({BotTask.status: JobStatus.PENDING.value})
+            db.commit()
+        finally:
+            db.close()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                processed = self.run_next_batch()
+            except Exception as e:
+                print(f"Bot worker error: {e}")
+                processed = False
+            if not processed:
+                self._stop.wait(self.poll_interval)
+
+    def _claim_due_tasks(self, db: Session, limit: int) -> List[BotTask]:
+        """Atomically mark up to limit of the earliest due tasks as running; [] if nothing is due"""
+        now = datetime.now(timezone.utc)
+        while True:
+            candidates = [task_id for task_id, in db.query(BotTask.id).filter(
+                BotTask.status == JobStatus.PENDING.value,
+                BotTask.due_at <= now
+            ).order_by(BotTask.due_at).limit(limit)]
+            if not candidates:
+                return []
+
+            # Other workers may have claimed some between the select and the update
+            claimed = [task_id for task_id, in db.execute(
+                update(BotTask).where(
+                    BotTask.id.in_(candidates),
+                    BotTask.status == JobStatus.PENDING.value
+                ).values(
+                    status=JobStatus.RUNNING.value,
+                    attempts=BotTask.attempts + 1
+                ).returning(BotTask.id)
+            )]
+            db.commit()
+            if claimed:
+                return db.query(BotTask).filter(BotTask.id.in_(claimed)).order_by(BotTask.due_at).all()
+
+    def run_next_batch(self) -> bool:
+        """
+        Run up to BOT_QUEUE_BATCH_SIZE due tasks with one shared
+        InteractionIndex and one commit. Returns False if no task was due.
+        """
+        db = SessionLocal()
+        try:
+            tasks = self._claim_due_tasks(db, settings.BOT_QUEUE_BATCH_SIZE)
+            if not tasks:
+                return False
+
+            bots = {
+                bot.id: bot
+                for bot in db.query(Bot).options(joinedload(Bot.profile)).filter(
+                    Bot.id.in_({task.bot_id for task in tasks})
+                )
+            }
+            posts = {post.id: post for post in db.query(Post).filter(Post.id.in_({task.post_id for task in tasks}))}
+            interacted, errors = run_interactions(db, [
+                (bots[task.bot_id], posts[task.post_id], None)
+                for task in tasks
+                if task.bot_id in bots and task.post_id in posts
+            ])
+
+            self._finish_tasks(db, tasks, interacted, errors)
+            return True
+        finally:
+            db.close()
+
+    def _finish_tasks(self, db: Session, tasks: List[BotTask], interacted: Set[Tuple[int, int]],
+                      errors: Dict[Tuple[int, int], str]):
+        """Record the task outcomes and roll them up into their jobs' progress"""
+        progress: Dict[int, List[int]] = defaultdict(lambda: [0, 0, 0])  # job: completed, failed, interactions
+        for task in tasks:
+            pair = (task.bot_id, task.post_id)
+            error = errors.get(pair)
+            task.status = JobStatus.FAILED.value if error else JobStatus.COMPLETED.value
+            task.error = error
+            counts = progress[task.job_id]
+            counts[1 if error else 0] += 1
+            if pair in interacted:
+                counts[2] += 1
+                interacted.discard(pair)  # Counted once even if the pair was queued twice
+
+        for job_id, (completed, failed, interactions) in progress.items():
+            db.query(BotJob).filter(BotJob.id == job_id).update({
+                BotJob.completed_tasks: BotJob.completed_tasks + completed,
+                BotJob.failed_tasks: BotJob.failed_tasks + failed,
+                BotJob.interactions: BotJob.interactions + interactions,
+                BotJob.status: JobStatus.RUNNING.value
+            }, synchronize_session=False)
+        db.commit()
+
+        now = datetime.now(timezone.utc)
+        for job in db.query(BotJob).filter(BotJob.id.in_(list(progress))):
+            if job.completed_tasks + job.failed_tasks >= job.total_tasks:
+                job.status = JobStatus.FAILED.value if job.failed_tasks else JobStatus.COMPLETED.value
+                job.finished_at = now
+        db.commit()
+
+
+# Shared pool, started and stopped with the application
+worker_pool = BotWorkerPool()
@@ -1,13 +1,21 @@
 import random
-import time
-from typing import List, Optional
-from sqlalchemy.orm import Session
+import numpy as np
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy import insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session, joinedload
 from datetime import datetime, timedelta
 from ..models.bot import Bot, BotProfile, BotInteractionLog, EmotionalBias
 from ..models.post import Post
 from ..models.comment import Comment
 from ..models.reaction import Reaction
+from ..config import settings
+from ..database import SessionLocal, IN_CLAUSE_CHUNK
 from .ai_comment_generator import generate_comment_for_bot
+from .bot_matching import InterestMatcher
+from . import post_counters
+from .scheduler import action_scheduler
 
 # Predefined comment templates based on emotional bias
 COMMENT_TEMPLATES = {
@@ -46,6 +54,88 @@ COMMENT_TEMPLATES = {
 # Personality bot names that should always respond to all posts
 PERSONALITY_BOT_NAMES = ['Optimistic_Bot', 'Critical_Bot', 'Neutral_Bot', 'Sarcastic_Bot', 'Techie_Bot', 'Minimal_Bot']
 
+class InteractionIndex:
+    """
+    In-memory sets of (bot_id, post_id) pairs that already have an interaction
+    log, a reaction or a comment. Loaded with one query per table so batch
+    runs check existence with set lookups instead of three queries per pair.
+    New rows are buffered here and written with one bulk insert per table.
+    """
+    
+    def __init__(self):
+        self.logged: Set[Tuple[int, int]] = set()
+        self.reacted: Set[Tuple[int, int]] = set()
+        self.commented: Set[Tuple[int, int]] = set()
+        self.new_rows: Dict[type, List[dict]] = defaultdict(list)
+    
+    def add_row(self, model: type, **values):
+        """Buffer a new row until write()"""
+        self.new_rows[model].append(values)
+    
+    def write(self, db: Session) -> Set[Tuple[int, int]]:
+        """
+        Insert buffered rows and bump post counters (the caller commits).
+        
+        Another writer may have interacted since load(). The interaction log
+        is inserted first and acts as the claim on each pair: its unique
+        (bot_id, post_id) index makes INSERT OR IGNORE skip pairs that are
+        already logged, and only claimed pairs get their reactions and
+        comments. Counters are bumped from the rows actually inserted.
+        Returns the claimed pairs.
+        """
+        logs = self.new_rows.pop(BotInteractionLog, [])
+        reactions = self.new_rows.pop(Reaction, [])
+        comments = self.new_rows.pop(Comment, [])
+        if not logs:
+            return set()
+        
+        claimed = set(db.execute(
+            sqlite_insert(BotInteractionLog).on_conflict_do_nothing()
+            .returning(BotInteractionLog.bot_id, BotInteractionLog.post_id),
+            logs
+        ).tuples())
+        
+        deltas: Dict[int, List[int]] = defaultdict(lambda: [0, 0, 0])
+        reactions = [row for row in reactions if (row["bot_id"], row["post_id"]) in claimed]
+        if reactions:
+            inserted = db.execute(
+                sqlite_insert(Reaction).on_conflict_do_nothing()
+                .returning(Reaction.post_id, Reaction.is_like),
+                reactions
+            ).tuples()
+            for post_id, is_like in inserted:
+                deltas[post_id][0 if is_like else 1] += 1
+        comments = [row for row in comments if (row["bot_id"], row["post_id"]) in claimed]
+        if comments:
+            db.execute(insert(Comment), comments)
+            for row in comments:
+                deltas[row["post_id"]][2] += 1
+        post_counters.apply_bulk_deltas(db, {post_id: tuple(d) for post_id, d in deltas.items()})
+        return claimed
+    
+    @classmethod
+    def load(cls, db: Session, post_ids: Iterable[int], bot_ids: Optional[Iterable[int]] = None) -> "InteractionIndex":
+        """Load existing bot interactions for the given posts (optionally only some bots)"""
+        index = cls()
+        post_ids = list(set(post_ids))
+        bot_ids = list(set(bot_ids)) if bot_ids is not None else None
+        targets = [
+            (index.logged, BotInteractionLog),
+            (index.reacted, Reaction),
+            (index.commented, Comment),
+        ]
+        for start in range(0, len(post_ids), IN_CLAUSE_CHUNK):
+            chunk = post_ids[start:start + IN_CLAUSE_CHUNK]
+            for pairs, model in targets:
+                query = db.query(model.bot_id, model.post_id).filter(
+                    model.post_id.in_(chunk),
+                    model.bot_id.isnot(None)
+                )
+                if bot_ids is not None and len(bot_ids) <= IN_CLAUSE_CHUNK:
+                    query = query.filter(model.bot_id.in_(bot_ids))
+                pairs.update((bot_id, post_id) for bot_id, post_id in query)
+        return index
+
 class BotEngine:
     """Rule-based bot interaction engine"""
     
@@ -171,94 +261,116 @@ class BotEngine:
         
         return None
     
-    def process_post_for_bot(self, bot: Bot, post: Post):
-        """Process a single post for a single bot"""
-        if not bot.is_active:
-            return False
+    def get_effective_relevance(self, bot: Bot, post: Post) -> Optional[float]:
+        """
+        Relevance used when interacting with a post.
+        Returns None if the bot should skip the post entirely.
+        """
+        # Universal bots always interact, topic bots need relevance
+        if self.is_universal_bot(bot):
+            # Universal bots always have full relevance
+            return 1.0
         
-        # Check if bot already interacted with this post
-        existing_log = self.db.query(BotInteractionLog).filter(
-            BotInteractionLog.bot_id == bot.id,
-            BotInteractionLog.post_id == post.id
-        ).first()
+        relevance_score = self.calculate_relevance_score(bot, post)
+        if relevance_score < 0.1:
+            # Topic-based bots skip irrelevant posts
+            return None
+        return relevance_score
+    
+    def get_response_delay(self, bot: Bot) -> int:
+        """Pick a simulated response delay (seconds) from the bot's profile"""
+        if not bot.profile:
+            return 0
+        return random.randint(
+            bot.profile.min_response_delay,
+            bot.profile.max_response_delay
+        )
+    
+    def plan_interaction(self, bot: Bot, post: Post, relevance_score: Optional[float] = None) -> Optional[dict]:
+        """
+        Decide what a bot does with a post: {"relevance_score", "reaction", "comment"},
+        reaction True/False/None and comment the generated text or None.
+        Returns None if the bot skips the post.
         
-        if existing_log:
-            return False  # Already processed
+        This touches no interaction rows; run_interactions calls it only for
+        pairs not yet logged, so the slow part (AI comment generation) is
+        skipped for pairs another run already handled.
+        Pass relevance_score if it was already computed (e.g. by InterestMatcher).
+        """
+        if not bot.is_active:
+            return None
         
-        # Calculate relevance
-        relevance_score = self.calculate_relevance_score(bot, post)
+        if relevance_score is None:
+            relevance_score = self.get_effective_relevance(bot, post)
+            if relevance_score is None:
+                return None
         
-        # Universal bots always interact, topic bots need relevance
-        is_universal = self.is_universal_bot(bot)
+        plan = {
+            "relevance_score": relevance_score,
+            "reaction": self.should_like_or_dislike(bot, relevance_score),
+            "comment": None
+        }
+        # Personality bots always comment, others use probability
+        if bot.profile and (self.is_personality_bot(bot) or
+                            self.should_interact(bot.profile.comment_probability, relevance_score)):
+            plan["comment"] = self.get_emotional_comment(bot, post.content)
         
-        if is_universal:
-            # Universal bots always have full relevance
-            relevance_score = 1.0
-        elif relevance_score < 0.1:
-            # Topic-based bots skip irrelevant posts
-            return False
+        if plan["reaction"] is None and plan["comment"] is None:
+            return None
+        return plan
+    
+    def apply_interaction(self, bot: Bot, post: Post, plan: dict, index: InteractionIndex) -> bool:
+        """
+        Buffer the planned rows on the index, minus actions the pair already has.
+        The caller writes and commits the index. Returns True if anything was buffered.
+        """
+        pair = (bot.id, post.id)
         
-        # Simulate response delay
-        if bot.profile:
-            delay = random.randint(
-                bot.profile.min_response_delay,
-                bot.profile.max_response_delay
-            )
-            time.sleep(min(delay, 5))  # Cap at 5 seconds for demonstration
+        # Check if bot already interacted with this post
+        if pair in index.logged:
+            return False  # Already processed
         
         actions_taken = []
+        new_rows = []  # (model, values), buffered only if an action is taken
         
-        # Try to react (like/dislike)
-        existing_reaction = self.db.query(Reaction).filter(
-            Reaction.post_id == post.id,
-            Reaction.bot_id == bot.id
-        ).first()
-        
-        if not existing_reaction:
-            reaction_type = self.should_like_or_dislike(bot, relevance_score)
-            if reaction_type is not None:
-                reaction = Reaction(
-                    post_id=post.id,
-                    bot_id=bot.id,
-                    is_like=reaction_type
-                )
-                self.db.add(reaction)
-                actions_taken.append("like" if reaction_type else "dislike")
-        
-        # Try to comment
-        existing_comment = self.db.query(Comment).filter(
-            Comment.post_id == post.id,
-            Comment.bot_id == bot.id
-        ).first()
-        
-        if not existing_comment and bot.profile:
-            # Personality bots always comment, others use probability
-            should_comment = self.is_personality_bot(bot) or self.should_interact(bot.profile.comment_probability, relevance_score)
-            if should_comment:
-                comment_text = self.get_emotional_comment(bot, post.content)
-                comment = Comment(
-                    post_id=post.id,
-                    bot_id=bot.id,
-                    content=comment_text
-                )
-                self.db.add(comment)
-                actions_taken.append("comment")
-        
-        # Log the interaction
-        if actions_taken:
-            log = BotInteractionLog(
+        if plan["reaction"] is not None and pair not in index.reacted:
+            new_rows.append((Reaction, dict(
+                post_id=post.id,
                 bot_id=bot.id,
+                is_like=plan["reaction"]
+            )))
+            index.reacted.add(pair)
+            actions_taken.append("like" if plan["reaction"] else "dislike")
+        
+        if plan["comment"] is not None and pair not in index.commented:
+            new_rows.append((Comment, dict(
                 post_id=post.id,
-                action_type=",".join(actions_taken),
-                relevance_score=relevance_score
-            )
-            self.db.add(log)
-            self.db.commit()
-            return True
-        return False
+                bot_id=bot.id,
+                content=plan["comment"]
+            )))
+            index.commented.add(pair)
+            actions_taken.append("comment")
+        
+        # Log the interaction
+        if not actions_taken:
+            return False
+        new_rows.append((BotInteractionLog, dict(
+            bot_id=bot.id,
+            post_id=post.id,
+            action_type=",".join(actions_taken),
+            relevance_score=plan["relevance_score"]
+        )))
+        for model, values in new_rows:
+            index.add_row(model, **values)
+        index.logged.add(pair)
+        return True
     
     def process_recent_posts(self, hours: int = 24):
-        """Process recent posts for all active bots"""
+        """
+        Schedule recent posts for all active bots.
+        Each relevant (bot, post) pair fires after the bot's response delay
+        on the shared action scheduler, so this returns without waiting.
+        """
         # Get recent posts
         since_time = datetime.utcnow() - timedelta(hours=hours)
         recent_posts = self.db.query(Post).filter(
@@ -268,37 +380,106 @@ class BotEngine:
         # Get all active bots
         active_bots = self.db.query(Bot).filter(Bot.is_active == True).all()
         
-        print(f"Processing {len(recent_posts)} posts for {len(active_bots)} bots...")
+        print(f"Scheduling {len(recent_posts)} posts for {len(active_bots)} bots...")
         
-        interactions_count = 0
-        for post in recent_posts:
-            for bot in active_bots:
-                try:
-                    result = self.process_post_for_bot(bot, post)
-                    if result:
-                        interactions_count += 1
-                except Exception as e:
-                    print(f"Error processing post {post.id} for bot {bot.name}: {e}")
-                    self.db.rollback()
+        # Score every (post, bot) pair at once; universal bots come out as 1.0
+        matcher = InterestMatcher(active_bots, self.is_universal_bot)
+        scores = matcher.score_posts(recent_posts)
         
-        print(f"Bot processing complete! {interactions_count} interactions created.")
+        # Skip bots that already interacted, without a query per pair
+        index = InteractionIndex.load(self.db, [post.id for post in recent_posts])
+        
+        # Pairs with the same delay fire together, written in chunks
+        due_batches = defaultdict(list)
+        for post_idx, bot_idx in zip(*np.nonzero(scores >= 0.1)):
+            post = recent_posts[post_idx]
+            bot = active_bots[bot_idx]
+            if (bot.id, post.id) in index.logged:
+                continue
+            due_batches[self.get_response_delay(bot)].append(
+                (bot.id, post.id, float(scores[post_idx, bot_idx]))
+            )
+        
+        scheduled_count = 0
+        for delay, pairs in due_batches.items():
+            for start in range(0, len(pairs), settings.BOT_BATCH_SIZE):
+                chunk = pairs[start:start + settings.BOT_BATCH_SIZE]
+                action_scheduler.schedule(delay, run_scheduled_batch, chunk)
+                scheduled_count += len(chunk)
+        
+        print(f"Bot scheduling complete! {scheduled_count} interactions scheduled.")
         return {
             "posts": len(recent_posts),
             "bots": len(active_bots),
-            "interactions": interactions_count
+            "scheduled": scheduled_count
         }
+
+
+def run_interactions(db: Session, items: List[Tuple[Bot, Post, Optional[float]]]
+                     ) -> Tuple[Set[Tuple[int, int]], Dict[Tuple[int, int], str]]:
+    """
+    Run a chunk of (bot, post, relevance or None) interactions with one
+    InteractionIndex and a single commit. Existing interactions are loaded
+    first, so pairs already logged (overlapping runs, retried tasks) skip
+    the comment model call. A writer that logs a pair while comments are
+    being generated loses nothing: INSERT OR IGNORE in write() drops ours.
     
-    def process_single_post(self, post_id: int):
-        """Process a single post for all active bots"""
-        post = self.db.query(Post).filter(Post.id == post_id).first()
-        if not post:
-            return
-        
-        active_bots = self.db.query(Bot).filter(Bot.is_active == True).all()
+    Returns the (bot_id, post_id) pairs that got an interaction, and the
+    error per pair that failed. If the write fails every pair fails with it.
+    """
+    engine = BotEngine(db)
+    plans = []
+    errors: Dict[Tuple[int, int], str] = {}
+    if not items:
+        return set(), errors
+    
+    index = InteractionIndex.load(db, {post.id for _, post, _ in items}, {bot.id for bot, _, _ in items})
+    for bot, post, relevance_score in items:
+        if (bot.id, post.id) in index.logged:
+            continue
+        try:
+            plan = engine.plan_interaction(bot, post, relevance_score)
+        except Exception as e:
+            print(f"Error processing post {post.id} for bot {bot.name}: {e}")
+            errors[(bot.id, post.id)] = str(e)
+            continue
+        if plan is not None:
+            plans.append((bot, post, plan))
+    if not plans:
+        return set(), errors
+    
+    for bot, post, plan in plans:
+        engine.apply_interaction(bot, post, plan, index)
+    try:
+        interacted = index.write(db)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"Error saving bot interactions: {e}")
+        errors.update({(bot.id, post.id): str(e) for bot, post, _ in plans})
+        return set(), errors
+    return interacted, errors
+
+
+def run_scheduled_batch(pairs: List[Tuple[int, int, float]]):
+    """
+    Scheduler callback: process a chunk of (bot_id, post_id, relevance) pairs
+    that came due together, in its own session with a single commit.
+    """
+    db = SessionLocal()
+    try:
+        bot_ids = {bot_id for bot_id, _, _ in pairs}
+        post_ids = {post_id for _, post_id, _ in pairs}
+        bots = {
+            bot.id: bot
+            for bot in db.query(Bot).options(joinedload(Bot.profile)).filter(Bot.id.in_(bot_ids))
+        }
+        posts = {post.id: post for post in db.query(Post).filter(Post.id.in_(post_ids))}
         
-        for bot in active_bots:
-            try:
-                self.process_post_for_bot(bot, post)
-            except Exception as e:
-                print(f"Error processing post {post.id} for bot {bot.name}: {e}")
-                self.db.rollback()
+        run_interactions(db, [
+            (bots[bot_id], posts[post_id], relevance_score)
+            for bot_id, post_id, relevance_score in pairs
+            if bot_id in bots and post_id in posts
+        ])
+    finally:
+        db.close()
@@ -0,0 +1,119 @@
+"""
+Denormalized like/dislike/comment counters on the posts table.
+
+Every write to reactions or comments adjusts the owning post's counters in
+the same transaction, so feeds read counts as plain columns. If they ever
+drift (e.g. rows edited by hand), rebuild them from the source tables:
+
+    python -m app.services.post_counters
+"""
+
+from typing import Dict, Iterable, Tuple
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.orm import Session
+from ..models.post import Post
+from ..models.comment import Comment
+from ..models.reaction import Reaction
+
+def _bump(db: Session, post_id: int, likes: int = 0, dislikes: int = 0, comments: int = 0):
+    """Add deltas to one post's counters, leaving updated_at untouched"""
+    db.query(Post).filter(Post.id == post_id).update({
+        Post.like_count: Post.like_count + likes,
+        Post.dislike_count: Post.dislike_count + dislikes,
+        Post.comment_count: Post.comment_count + comments,
+        Post.updated_at: Post.updated_at
+    }, synchronize_session=False)
+
+
+def reaction_added(db: Session, post_id: int, is_like: bool):
+    _bump(db, post_id, likes=int(is_like), dislikes=int(not is_like))
+
+
+def reaction_removed(db: Session, post_id: int, is_like: bool):
+    _bump(db, post_id, likes=-int(is_like), dislikes=-int(not is_like))
+
+
+def reaction_changed(db: Session, post_id: int, was_like: bool, is_like: bool):
+    """A user flipped their reaction between like and dislike"""
+    if was_like != is_like:
+        delta = 1 if is_like else -1
+        _bump(db, post_id, likes=delta, dislikes=-delta)
+
+
+def comment_added(db: Session, post_id: int):
+    _bump(db, post_id, comments=1)
+
+
+def comment_removed(db: Session, post_id: int):
+    _bump(db, post_id, comments=-1)
+
+
+def apply_bulk_deltas(db: Session, deltas: Dict[int, Tuple[int, int, int]]):
+    """Apply {post_id: (likes, dislikes, comments)} deltas with one executemany UPDATE"""
+    if not deltas:
+        return
+    stmt = update(Post.__table__).where(Post.__table__.c.id == bindparam("b_post_id")).values(
+        like_count=Post.__table__.c.like_count + bindparam("b_likes"),
+        dislike_count=Post.__table__.c.dislike_count + bindparam("b_dislikes"),
+        comment_count=Post.__table__.c.comment_count + bindparam("b_comments"),
+        updated_at=Post.__table__.c.updated_at
+    )
+    db.execute(stmt, [
+        {"b_post_id": post_id, "b_likes": likes, "b_dislikes": dislikes, "b_comments": comments}
+        for post_id, (likes, dislikes, comments) in deltas.items()
+    ])
+
+
+def bot_interactions_removed(db: Session, bot_id: int):
+    """Take a bot's reactions and comments off the counters before the bot is deleted"""
+    deltas: Dict[int, list] = {}
+    reactions = db.query(Reaction.post_id, Reaction.is_like, func.count(Reaction.id)).filter(
+        Reaction.bot_id == bot_id
+    ).group_by(Reaction.post_id, Reaction.is_like)
+    for post_id, is_like, count in reactions:
+        entry = deltas.setdefault(post_id, [0, 0, 0])
+        entry[0 if is_like else 1] -= count
+
+    comments = db.query(Comment.post_id, func.count(Comment.id)).filter(
+        Comment.bot_id == bot_id
+    ).group_by(Comment.post_id)
+    for post_id, count in comments:
+        deltas.setdefault(post_id, [0, 0, 0])[2] -= count
+
+    apply_bulk_deltas(db, {post_id: tuple(entry) for post_id, entry in deltas.items()})
+
+
+def reconcile_post_counters(db: Session, post_ids: Iterable[int] = None) -> int:
+    """Recompute counters from reactions and comments. Returns the number of posts updated."""
+    posts = Post.__table__
+    like_count = select(func.count(Reaction.id)).where(
+        Reaction.post_id == posts.c.id, Reaction.is_like == True
+    ).scalar_subquery()
+    dislike_count = select(func.count(Reaction.id)).where(
+        Reaction.post_id == posts.c.id, Reaction.is_like == False
+    ).scalar_subquery()
+    comment_count = select(func.count(Comment.id)).where(
+        Comment.post_id == posts.c.id
+    ).scalar_subquery()
+
+    stmt = update(posts).values(
+        like_count=like_count,
+        dislike_count=dislike_count,
+        comment_count=comment_count,
+        updated_at=posts.c.updated_at
+    )
+    if post_ids is not None:
+        stmt = stmt.where(posts.c.id.in_(list(post_ids)))
+    result = db.execute(stmt)
+    db.commit()
+    return result.rowcount
+
+
+if __name__ == "__main__":
+    from ..database import SessionLocal
+    db = SessionLocal()
+    try:
+        updated = reconcile_post_counters(db)
+        print(f"Reconciled counters for {updated} posts")
+    finally:
+        db.close()
@@ -0,0 +1,104 @@
+"""
+In-process scheduler for delayed bot actions.
+
+Pending actions sit in a min-heap keyed by due time. A single dispatcher
+thread sleeps until the earliest action is due and hands it to a thread
+pool, so thousands of delayed actions cost no threads while they wait and
+due actions run concurrently.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Tuple
+from ..config import settings
+
+
+class ActionScheduler:
+    """Heap-based timer that runs callbacks once their due time is reached"""
+
+    def __init__(self, max_workers: int = None):
+        self.max_workers = max_workers or settings.BOT_SCHEDULER_WORKERS
+        self._heap: List[Tuple[float, int, Callable, tuple]] = []
+        self._counter = itertools.count()  # Tie-breaker so callbacks are never compared
+        self._condition = threading.Condition()
+        self._executor = None
+        self._dispatcher = None
+        self._running = False
+
+    def start(self):
+        """Start the dispatcher thread (called lazily on first schedule)"""
+        with self._condition:
+            if self._running:
+                return
+            self._running = True
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers, thread_name_prefix="bot-action"
+            )
+            self._dispatcher = threading.Thread(
+                target=self._dispatch, name="bot-scheduler", daemon=True
+            )
+            self._dispatcher.start()
+
+    def shutdown(self, wait: bool = False):
+        """Stop dispatching. Actions that are not yet due are dropped."""
+        with self._condition:
+            if not self._running:
+                return
+            self._running = False
+            self._heap.clear()
+            self._condition.notify_all()
+        self._dispatcher.join()
+        self._executor.shutdown(wait=wait)
+
+    def schedule(self, delay: float, callback: Callable, *args):
+        """Run callback(*args) after delay seconds"""
+        self.schedule_at(time.monotonic() + max(delay, 0), callback, *args)
+
+    def schedule_at(self, due: float, callback: Callable, *args):
+        """Run callback(*args) once time.monotonic() reaches due"""
+        self.start()
+        with self._condition:
+            seq = next(self._counter)
+            heapq.heappush(self._heap, (due, seq, callback, args))
+            # Wake the dispatcher only if this action is now the earliest
+            if self._heap[0][1] == seq:
+                self._condition.notify()
+
+    def pending(self) -> int:
+        """Number of actions waiting for their due time"""
+        with self._condition:
+            return len(self._heap)
+
+    def _dispatch(self):
+        while True:
+            with self._condition:
+                while self._running and (
+                    not self._heap or self._heap[0][0] > time.monotonic()
+                ):
+                    timeout = self._heap[0][0] - time.monotonic() if self._heap else None
+                    self._condition.wait(timeout)
+                if not self._running:
+                    return
+
+                # Pop everything that is due in one pass
+                now = time.monotonic()
+                due = []
+                while self._heap and self._heap[0][0] <= now:
+                    due.append(heapq.heappop(self._heap))
+
+            for _, _, callback, args in due:
+                self._executor.submit(self._run, callback, args)
+
+    @staticmethod
+    def _run(callback: Callable, args: tuple):
+        try:
+            callback(*args)
+        except Exception as e:
+            print(f"Scheduled bot action failed: {e}")
+
+
+# Shared scheduler for bot actions
+action_scheduler = ActionScheduler()
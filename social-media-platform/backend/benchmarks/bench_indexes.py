@@ -0,0 +1,151 @@
+"""
+Benchmark the hot read queries before and after the indexes added by
+migrations 2 and 3 (keyset pagination, foreign key and filter indexes).
+
+Builds a scratch SQLite database with the current schema minus those
+indexes, fills it with synthetic rows, then times each query and shows
+its query plan, applies the migrations' index steps and does it again:
+
+    python benchmarks/bench_indexes.py --comments 1000000
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine
+from app.database import Base
+from app import models  # Register all tables with Base
+from app.migrations import MIGRATIONS
+
+# Migrations whose indexes are measured
+INDEX_MIGRATIONS = (2, 3)
+
+# The same indexes as declared on the models, dropped for the "before" run
+INDEXES = [
+    "ix_posts_created_at_id",
+    "ix_comments_created_at_id",
+    "ix_comments_post_id",
+    "ix_reactions_post_id_is_like",
+    "ix_bot_interaction_logs_bot_id_post_id",
+    "ix_bots_is_active",
+    "ix_bot_tasks_status_due_at",
+]
+
+QUERIES = {
+    "comment count for a post": "SELECT COUNT(*) FROM comments WHERE post_id = :post_id",
+    "like count for a post": "SELECT COUNT(*) FROM reactions WHERE post_id = :post_id AND is_like = 1",
+    "newest posts page": "SELECT id FROM posts ORDER BY created_at DESC, id DESC LIMIT 20",
+    "newest comments page": "SELECT id FROM comments ORDER BY created_at DESC, id DESC LIMIT 20",
+    "comments since a date": "SELECT id FROM comments WHERE created_at >= :since ORDER BY created_at, id LIMIT 100",
+    "bot task claim": "SELECT id FROM bot_tasks WHERE status = 'pending' AND due_at <= :now ORDER BY due_at LIMIT 20",
+}
+
+
+def populate(conn: sqlite3.Connection, args, rng: random.Random):
+    start = datetime(2024, 1, 1)
+
+    def timestamp(i: int, total: int) -> str:
+        return (start + timedelta(seconds=i * 86400 * 365 // total)).isoformat(sep=" ")
+
+    conn.execute("INSERT INTO users (id, username, email, hashed_password) VALUES (1, 'bench', 'bench@example.com', 'x')")
+    conn.executemany(
+        "INSERT INTO bots (id, name, is_active) VALUES (?, ?, ?)",
+        ((i, f"bot{i}", rng.random() < 0.8) for i in range(1, args.bots + 1))
+    )
+    conn.executemany(
+        "INSERT INTO posts (id, user_id, content, topic, created_at, like_count, dislike_count, comment_count) "
+        "VALUES (?, 1, 'post', 'technology', ?, 0, 0, 0)",
+        ((i, timestamp(i, args.posts)) for i in range(1, args.posts + 1))
+    )
+    conn.executemany(
+        "INSERT INTO comments (post_id, user_id, content, created_at) VALUES (?, 1, 'comment', ?)",
+        ((rng.randint(1, args.posts), timestamp(i, args.comments)) for i in range(args.comments))
+    )
+    conn.executemany(
+        "INSERT OR IGNORE INTO reactions (post_id, bot_id, is_like) VALUES (?, ?, ?)",
+        ((rng.randint(1, args.posts), rng.randint(1, args.bots), rng.random() < 0.7) for _ in range(args.reactions))
+    )
+    conn.execute("INSERT INTO bot_jobs (id, post_id, status, total_tasks, completed_tasks, failed_tasks, interactions) "
+                 "VALUES (1, 1, 'running', 0, 0, 0, 0)")
+    conn.executemany(
+        "INSERT INTO bot_tasks (job_id, bot_id, post_id, status, due_at, attempts) VALUES (1, ?, ?, ?, ?, 0)",
+        ((rng.randint(1, args.bots), rng.randint(1, args.posts),
+          "pending" if rng.random() < 0.05 else "completed", timestamp(i, args.tasks)) for i in range(args.tasks))
+    )
+    conn.commit()
+
+
+def measure(conn: sqlite3.Connection, params: dict, repeats: int):
+    results = {}
+    for name, sql in QUERIES.items():
+        plan = " / ".join(row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params))
+        best = float("inf")
+        for _ in range(repeats):
+            started = time.perf_counter()
+            conn.execute(sql, params).fetchall()
+            best = min(best, time.perf_counter() - started)
+        results[name] = (best * 1000, plan)
+    return results
+
+
+def main(args):
+    rng = random.Random(args.seed)
+    directory = tempfile.mkdtemp(prefix="bench-indexes-")
+    path = os.path.join(directory, "bench.db")
+    try:
+        Base.metadata.create_all(bind=create_engine(f"sqlite:///{path}"))
+        conn = sqlite3.connect(path)
+        for index in INDEXES:
+            conn.execute(f"DROP INDEX IF EXISTS {index}")
+
+        print(f"Filling {args.posts} posts, {args.comments} comments, {args.reactions} reactions, "
+              f"{args.tasks} bot tasks...")
+        started = time.perf_counter()
+        populate(conn, args, rng)
+        print(f"  done in {time.perf_counter() - started:.1f}s")
+
+        params = {"post_id": args.posts // 2, "since": "2024-12-01", "now": "2024-06-01"}
+        before = measure(conn, params, args.repeats)
+        conn.close()
+
+        engine = create_engine(f"sqlite:///{path}")
+        with engine.begin() as migration_conn:
+            for version, _, upgrade in MIGRATIONS:
+                if version in INDEX_MIGRATIONS:
+                    upgrade(migration_conn)
+        engine.dispose()
+        # A fresh connection, so no statement prepared against the old schema is reused
+        conn = sqlite3.connect(path)
+        after = measure(conn, params, args.repeats)
+        conn.close()
+
+        print(f"\n{'query':<28} {'before ms':>10} {'after ms':>10}")
+        for name in QUERIES:
+            print(f"{name:<28} {before[name][0]:>10.2f} {after[name][0]:>10.2f}")
+            print(f"    before: {before[name][1]}")
+            print(f"    after:  {after[name][1]}")
+    finally:
+        for name in os.listdir(directory):
+            os.remove(os.path.join(directory, name))
+        os.rmdir(directory)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark read queries with and without the migration indexes")
+    parser.add_argument("--posts", type=int, default=50000)
+    parser.add_argument("--comments", type=int, default=1000000)
+    parser.add_argument("--reactions", type=int, default=500000)
+    parser.add_argument("--bots", type=int, default=1000)
+    parser.add_argument("--tasks", type=int, default=200000)
+    parser.add_argument("--repeats", type=int, default=5, help="Best of this many runs per query")
+    parser.add_argument("--seed", type=int, default=42)
+    main(parser.parse_args())
@@ -0,0 +1,103 @@
+"""
+Benchmark InterestMatcher against the per-pair calculate_relevance_score
+loop it replaced in BotEngine.process_recent_posts.
+
+Bots and posts are synthetic, in-memory objects, so no database is needed:
+
+    python benchmarks/bench_interest_matching.py --bots 1000 --posts 10000
+
+The per-pair loop is timed on a --sample-bots x --sample-posts corner and
+extrapolated, since running it on the full grid takes minutes. Every
+sampled pair's score is also checked against the matcher's.
+"""
+
+import argparse
+import random
+import sys
+import os
+import time
+from types import SimpleNamespace
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.bot_matching import InterestMatcher
+from app.services.bot_service import BotEngine
+
+TOPICS = ["technology", "sports", "music", "politics", "science", "travel", "food", "gaming",
+          "fashion", "health", "finance", "movies", "books", "art", "education", "ai", "climate"]
+WORDS = ["new", "update", "review", "love", "launch", "match", "album", "vote", "study", "trip",
+         "recipe", "release", "score", "market", "trailer", "novel", "painting", "course", "model"]
+
+
+def make_bots(count: int, rng: random.Random):
+    bots = []
+    for i in range(count):
+        if rng.random() < 0.02:
+            interests = "universal"
+        else:
+            interests = ",".join(rng.sample(TOPICS + WORDS, rng.randint(1, 6)))
+        profile = SimpleNamespace(interests=interests)
+        bots.append(SimpleNamespace(id=i, name=f"bot{i}", profile=profile, is_active=True))
+    return bots
+
+
+def make_posts(count: int, rng: random.Random):
+    return [
+        SimpleNamespace(
+            id=i,
+            topic=rng.choice(TOPICS) if rng.random() < 0.9 else None,
+            keywords=",".join(rng.sample(WORDS, rng.randint(0, 4))) or None,
+            content=" ".join(rng.choice(WORDS + TOPICS) for _ in range(rng.randint(5, 40)))
+        )
+        for i in range(count)
+    ]
+
+
+def per_pair_scores(engine: BotEngine, bots, posts):
+    return [
+        [1.0 if engine.is_universal_bot(bot) else engine.calculate_relevance_score(bot, post) for bot in bots]
+        for post in posts
+    ]
+
+
+def main(args):
+    rng = random.Random(args.seed)
+    bots = make_bots(args.bots, rng)
+    posts = make_posts(args.posts, rng)
+    engine = BotEngine(None)
+
+    print(f"{len(bots)} bots x {len(posts)} posts")
+    started = time.perf_counter()
+    scores = InterestMatcher(bots, engine.is_universal_bot).score_posts(posts)
+    matcher_seconds = time.perf_counter() - started
+    print(f"  InterestMatcher   {matcher_seconds:8.2f}s")
+
+    sample_bots = bots[:args.sample_bots]
+    sample_posts = posts[:args.sample_posts]
+    started = time.perf_counter()
+    reference = per_pair_scores(engine, sample_bots, sample_posts)
+    sample_seconds = time.perf_counter() - started
+    estimate = sample_seconds * (len(bots) * len(posts)) / (len(sample_bots) * len(sample_posts))
+    print(f"  per-pair loop     {estimate:8.2f}s  (extrapolated from {len(sample_bots)} x {len(sample_posts)} "
+          f"in {sample_seconds:.2f}s)")
+    print(f"  speedup           {estimate / matcher_seconds:8.1f}x")
+
+    mismatches = sum(
+        reference[p][b] != scores[p, b]
+        for p in range(len(sample_posts))
+        for b in range(len(sample_bots))
+    )
+    print(f"  mismatches        {mismatches:8d}  of {len(sample_bots) * len(sample_posts)} sampled pairs")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark vectorized bot/post relevance scoring")
+    parser.add_argument("--bots", type=int, default=1000)
+    parser.add_argument("--posts", type=int, default=10000)
+    parser.add_argument("--sample-bots", type=int, default=200)
+    parser.add_argument("--sample-posts", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=42)
+    main(parser.parse_args())
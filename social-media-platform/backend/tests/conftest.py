@@ -0,0 +1,10 @@
+import os
+import sys
+import tempfile
+
+# Point the app at a throwaway database before anything imports it
+_db_dir = tempfile.mkdtemp(prefix="social-media-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'test.db')}"
+
+# Add backend directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,62 @@
+"""
+The feeds must cost a constant number of SQL statements whatever the page
+size: counts are columns on the post, and users, media and comments are
+loaded per page with one query each, never one per post.
+"""
+
+from typing import Tuple
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from app.database import SessionLocal, engine
+from app.main import app
+from app.models import Comment, Media, Post, Reaction, User
+from app.models.post import MediaType
+
+PAGE_SIZES = [1, 20, 100]
+
+
+@pytest.fixture(scope="module")
+def client():
+    db = SessionLocal()
+    users = [User(username=f"user{i}", email=f"user{i}@example.com", hashed_password="x") for i in range(5)]
+    db.add_all(users)
+    db.flush()
+    for i in range(120):
+        post = Post(user_id=users[i % 5].id, content=f"post {i}", topic="technology",
+                    like_count=1, comment_count=2)
+        db.add(post)
+        db.flush()
+        db.add(Media(post_id=post.id, media_type=MediaType.IMAGE, url=f"/uploads/{i}.png"))
+        db.add(Reaction(post_id=post.id, user_id=users[0].id, is_like=True))
+        db.add_all([Comment(post_id=post.id, user_id=users[1].id, content=f"comment {j}") for j in range(2)])
+    db.commit()
+    db.close()
+    # Not used as a context manager, so the bot workers don't start
+    return TestClient(app)
+
+
+def count_statements(client: TestClient, url: str) -> Tuple[int, int]:
+    """(SQL statements run, items returned) for one GET"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        response = client.get(url)
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+    assert response.status_code == 200
+    return len(statements), len(response.json())
+
+
+@pytest.mark.parametrize("path", ["/posts/", "/public/posts"])
+def test_feed_statement_count_is_constant(client, path):
+    counts = {}
+    for limit in PAGE_SIZES:
+        statements, returned = count_statements(client, f"{path}?limit={limit}")
+        assert returned == limit
+        counts[limit] = statements
+    assert len(set(counts.values())) == 1, counts
@@ -192,7 +192,7 @@ const BotCreator = () => {
       const data = response.data;
       setMessage({ 
         type: 'success', 
-        text: `🚀 Processed ${data.posts_processed} posts with ${data.bots_active} bots. ${data.interactions} interactions created!` 
+        text: `🚀 Processed ${data.posts_processed} posts with ${data.bots_active} bots. ${data.interactions_scheduled} interactions scheduled!` 
       });
       fetchBots();
     } catch (error) {